@@ -84,11 +84,13 @@ def create_scrape_task():
             options=scrape_request.options
         )
         
+        # 所有URL都命中结果缓存时任务已直接完成
+        task_status = TaskStatus(redis_client.get_task(task_id)['status'])
         response = TaskResponse(
             task_id=task_id,
-            status=TaskStatus.PENDING,
+            status=task_status,
             created_at=datetime.now(),
-            message="任务创建成功，正在排队处理"
+            message="任务结果已全部命中缓存" if task_status == TaskStatus.COMPLETED else "任务创建成功，正在排队处理"
         )
         
         logger.info(f"创建爬取任务: {task_id}, URLs: {len(scrape_request.urls)}, 类型: {scrape_request.scraper_type.value}")
@@ -21,6 +21,9 @@ class Config:
     TASK_EXPIRE_HOURS = 24
     RESULT_EXPIRE_HOURS = 24
     
+    # URL结果缓存配置（跨任务复用已爬取的结果）
+    URL_CACHE_ENABLED = os.getenv('URL_CACHE_ENABLED', 'true').lower() == 'true'
+    
     # 支持的爬虫类型（包含竞速模式）
     SUPPORTED_SCRAPERS = [
         'requests', 'newspaper', 'readability', 'trafilatura', 'race'
@@ -16,6 +16,11 @@ class ScraperType(str, Enum):
     TRAFILATURA = "trafilatura"
     RACE = "race"  # 竞速模式 - 多个爬虫同时尝试
 
+class ParseMode(str, Enum):
+    FULL = "full"      # 完整解析页面
+    HEAD = "head"      # 只解析<head>：标题、描述、Open Graph、JSON-LD
+    REGION = "region"  # 只提取候选正文区域
+
 class ScrapeRequest(BaseModel):
     urls: List[str] = Field(..., min_items=1, max_items=100, description="要爬取的URL列表")
     scraper_type: ScraperType = Field(default=ScraperType.REQUESTS, description="爬虫类型")
@@ -28,6 +33,14 @@ class ScrapeRequest(BaseModel):
                 raise ValueError(f'Invalid URL: {url}')
         return v
     
+    @validator('options')
+    def validate_options(cls, v):
+        if v and 'parse_mode' in v:
+            modes = [mode.value for mode in ParseMode]
+            if v['parse_mode'] not in modes:
+                raise ValueError(f"Invalid parse_mode: {v['parse_mode']}, expected one of {modes}")
+        return v
+    
     class Config:
         json_encoders = {
             datetime: lambda v: v.isoformat()
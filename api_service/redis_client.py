@@ -1,14 +1,31 @@
 import json
 import redis
+import hashlib
 from datetime import datetime, timedelta
 from typing import Optional, Dict, List, Any
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
 from config import Config
-from models import TaskStatus, ScraperType
+from models import TaskStatus, ScraperType, ParseMode
 import uuid
 import logging
 
 logger = logging.getLogger(__name__)
 
+def normalize_url(url: str) -> str:
+    """规范化URL，用作结果缓存的键（需与worker_service保持一致）"""
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+    if parts.port and parts.port != {'http': 80, 'https': 443}.get(scheme):
+        host = f"{host}:{parts.port}"
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((scheme, host, parts.path or '/', query, ''))
+
+def url_cache_key(url: str, scraper_type: str) -> str:
+    """URL结果缓存键"""
+    digest = hashlib.sha1(normalize_url(url).encode('utf-8')).hexdigest()
+    return f'url_cache:{scraper_type}:{digest}'
+
 class RedisClient:
     def __init__(self):
         self.redis_client = redis.Redis(
@@ -27,32 +44,68 @@ class RedisClient:
             logger.error(f"Redis连接失败: {e}")
             raise
     
+    def get_cached_results(self, urls: List[str], scraper_type: str) -> Dict[int, Dict[str, Any]]:
+        """批量查询URL结果缓存，返回 {URL下标: 结果}"""
+        keys = [url_cache_key(url, scraper_type) for url in urls]
+        cached = {}
+        for index, value in enumerate(self.redis_client.mget(keys)):
+            if value:
+                result = json.loads(value)
+                result['url'] = urls[index]
+                result['cached'] = True
+                cached[index] = result
+        return cached
+    
     def create_task(self, urls: List[str], scraper_type: ScraperType, options: Optional[Dict[str, Any]] = None) -> str:
-        """创建新任务"""
+        """创建新任务，已缓存的URL直接使用缓存结果，只把未命中的URL交给worker"""
         task_id = str(uuid.uuid4())
         now = datetime.now()
+        options = options or {}
+        
+        # 只解析部分页面的结果与完整结果分开缓存
+        cache_scraper_type = scraper_type.value
+        parse_mode = options.get('parse_mode', ParseMode.FULL.value)
+        if parse_mode != ParseMode.FULL.value:
+            cache_scraper_type = f"{cache_scraper_type}:{parse_mode}"
+        
+        cached = {}
+        if Config.URL_CACHE_ENABLED and options.get('use_cache', True):
+            cached = self.get_cached_results(urls, cache_scraper_type)
+        pending_urls = [url for i, url in enumerate(urls) if i not in cached]
+        
+        self.redis_client.hincrby('url_cache:stats', 'hits', len(cached))
+        self.redis_client.hincrby('url_cache:stats', 'misses', len(pending_urls))
         
         task_data = {
             'task_id': task_id,
             'urls': json.dumps(urls),
             'scraper_type': scraper_type.value,
+            'cache_scraper_type': cache_scraper_type,  # 竞速模式会改写scraper_type，缓存键使用原始类型
             'status': TaskStatus.PENDING.value,
             'progress': 0,
             'created_at': now.isoformat(),
             'updated_at': now.isoformat(),
-            'options': json.dumps(options) if options else json.dumps({})
+            'options': json.dumps(options),
+            'pending_urls': json.dumps(pending_urls),
+            'cached_results': json.dumps({str(i): result for i, result in cached.items()})
         }
         
         # 存储任务详情
         self.redis_client.hset(f'task:{task_id}', mapping=task_data)
         
-        # 添加到任务队列
-        self.redis_client.lpush('scrape_queue', task_id)
-        
         # 设置过期时间
         self.redis_client.expire(f'task:{task_id}', Config.TASK_EXPIRE_HOURS * 3600)
         
-        logger.info(f"创建任务成功: {task_id}")
+        if pending_urls:
+            # 添加到任务队列
+            self.redis_client.lpush('scrape_queue', task_id)
+            logger.info(f"创建任务成功: {task_id}, 缓存命中{len(cached)}个, 待爬取{len(pending_urls)}个")
+        else:
+            # 全部命中缓存，直接完成任务
+            self.store_results(task_id, [cached[i] for i in range(len(urls))])
+            self.update_task_status(task_id, TaskStatus.COMPLETED, progress=100)
+            logger.info(f"创建任务成功: {task_id}, 全部{len(urls)}个URL命中缓存")
+        
         return task_id
     
     def get_task(self, task_id: str) -> Optional[Dict[str, Any]]:
@@ -133,16 +186,29 @@ class RedisClient:
         """获取队列长度"""
         return self.redis_client.llen('scrape_queue')
     
-    def get_task_stats(self) -> Dict[str, int]:
+    def get_rate_limit_stats(self) -> Dict[str, Dict[str, float]]:
+        """获取worker写入的各域名限速统计（请求数、被延迟次数、累计等待秒数）"""
+        domains = {}
+        for field, value in self.redis_client.hgetall('ratelimit:stats').items():
+            domain, metric = field.rsplit(':', 1)
+            domains.setdefault(domain, {})[metric] = float(value) if metric == 'wait_seconds' else int(value)
+        return domains
+    
+    def get_task_stats(self) -> Dict[str, Any]:
         """获取任务统计"""
+        cache_stats = self.redis_client.hgetall('url_cache:stats')
         stats = {
             'pending': 0,
             'processing': 0,
             'completed': 0,
             'failed': 0,
-            'queue_length': self.get_queue_length()
+            'queue_length': self.get_queue_length(),
+            'url_cache_hits': int(cache_stats.get('hits', 0)),
+            'url_cache_misses': int(cache_stats.get('misses', 0))
         }
         
+        stats['rate_limit'] = self.get_rate_limit_stats()
+        
         # 扫描所有任务
         for key in self.redis_client.scan_iter(match='task:*'):
             status = self.redis_client.hget(key, 'status')
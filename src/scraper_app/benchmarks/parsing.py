@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+解析后端基准测试 - 在已保存的文章语料上比较各解析后端的吞吐量（页/秒）和提取结果一致性
+
+用法:
+    python -m scraper_app.benchmarks.parsing --corpus data/output --rounds 3
+"""
+
+import sys
+import json
+import html
+import time
+import argparse
+from pathlib import Path
+from typing import Dict, List
+
+# 添加src目录到Python路径
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from scraper_app.scrapers.requests_scraper import RequestsExtractor
+from scraper_app.utils.config import Config
+from scraper_app.utils.parsing import available_backends
+
+def render_article(article: Dict) -> bytes:
+    """把保存的文章结果还原成带导航、脚本和页脚的典型新闻页面"""
+    title = html.escape(article.get('title') or '')
+    description = html.escape(article.get('description') or '', quote=True)
+    sentences = [s for s in (article.get('content') or '').replace('。', '。\n').replace('. ', '.\n').split('\n') if s.strip()]
+    paragraphs = ''.join(f'<p>{html.escape(s.strip())}</p>\n' for s in sentences)
+    nav = ''.join(f'<li><a href="/section/{i}">栏目{i}</a></li>' for i in range(30))
+    return f'''<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{title}</title>
+<meta name="description" content="{description}">
+<script>window.__STATE__ = {json.dumps({'id': article.get('url')})};</script>
+<style>body {{ font-family: sans-serif; }}</style>
+</head><body>
+<header><nav><ul>{nav}</ul></nav></header>
+<div class="layout"><main><article><h1>{title}</h1>
+{paragraphs}</article></main>
+<aside><ul>{nav}</ul></aside></div>
+<footer><p>Copyright</p><script>track();</script></footer>
+</body></html>'''.encode('utf-8')
+
+def load_corpus(corpus_dir: Path, cache_dir: Path) -> List[bytes]:
+    """加载语料：HTTP缓存中的原始页面，以及由文章JSON还原的页面"""
+    pages = [path.read_bytes() for path in sorted(cache_dir.glob('*.body'))] if cache_dir.exists() else []
+    for path in sorted(corpus_dir.glob('*/articles/*.json')):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                article = json.load(f)
+        except (OSError, ValueError):
+            continue
+        if article.get('content'):
+            pages.append(render_article(article))
+    return pages
+
+def run(pages: List[bytes], backends: List[str], rounds: int) -> Dict[str, Dict]:
+    """逐个后端解析全部语料，返回吞吐量和提取结果"""
+    extractor = RequestsExtractor('requests')
+    report = {}
+    for backend in backends:
+        extractor.parser_backend = backend
+        outputs = [extractor.extract_page(page) for page in pages]  # 预热并记录结果
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for page in pages:
+                extractor.extract_page(page)
+        elapsed = time.perf_counter() - start
+        report[backend] = {
+            'pages_per_second': len(pages) * rounds / elapsed if elapsed else 0.0,
+            'outputs': outputs
+        }
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description='HTML解析后端基准测试')
+    parser.add_argument('--corpus', default='data/output', help='文章语料目录 (默认: data/output)')
+    parser.add_argument('--cache', default=str(Config.HTTP_CACHE_DIR), help='HTTP缓存目录，存在时一并使用其中的原始页面')
+    parser.add_argument('--rounds', type=int, default=3, help='每个后端重复解析的轮数 (默认: 3)')
+    args = parser.parse_args()
+
+    pages = load_corpus(Path(args.corpus), Path(args.cache))
+    if not pages:
+        print(f"语料为空: {args.corpus}")
+        return 1
+
+    backends = available_backends()
+    report = run(pages, backends, args.rounds)
+
+    baseline = report[backends[0]]['outputs']
+    print(f"语料: {len(pages)}个页面, {sum(len(p) for p in pages) / 1024:.0f}KB, 每个后端{args.rounds}轮")
+    print(f"{'后端':<14}{'页/秒':>10}{'相对速度':>10}{'结果一致':>12}")
+    for backend in backends:
+        stats = report[backend]
+        same = sum(1 for a, b in zip(baseline, stats['outputs']) if a == b)
+        speedup = stats['pages_per_second'] / report[backends[0]]['pages_per_second']
+        print(f"{backend:<14}{stats['pages_per_second']:>10.1f}{speedup:>9.2f}x{same:>8}/{len(pages)}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+选择器级联基准测试 - 比较逐个 select_one 的循环与一次遍历的 SelectorPlan
+
+用法:
+    python -m scraper_app.benchmarks.selectors --corpus data/output --rounds 5
+"""
+
+import sys
+import time
+import argparse
+from pathlib import Path
+
+# 添加src目录到Python路径
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from scraper_app.benchmarks.parsing import load_corpus
+from scraper_app.scrapers.government_scraper import GovernmentExtractor
+from scraper_app.scrapers.requests_scraper import RequestsExtractor
+from scraper_app.scrapers.selenium_scraper import SeleniumScraper
+from scraper_app.scrapers.wechat_scraper import WeChatScraper
+from scraper_app.utils.config import Config
+from scraper_app.utils.parsing import make_soup
+
+PLANS = {
+    'requests': RequestsExtractor.CONTENT_SELECTORS,
+    'government': GovernmentExtractor.CONTENT_SELECTORS,
+    'selenium': SeleniumScraper.CONTENT_SELECTORS,
+    'wechat': WeChatScraper.CONTENT_SELECTORS,
+}
+
+def main():
+    parser = argparse.ArgumentParser(description='选择器级联基准测试')
+    parser.add_argument('--corpus', default='data/output', help='文章语料目录 (默认: data/output)')
+    parser.add_argument('--cache', default=str(Config.HTTP_CACHE_DIR), help='HTTP缓存目录，存在时一并使用其中的原始页面')
+    parser.add_argument('--backend', default=Config.PARSER_BACKEND, help='解析后端 (默认: PARSER_BACKEND)')
+    parser.add_argument('--rounds', type=int, default=5, help='重复轮数 (默认: 5)')
+    args = parser.parse_args()
+
+    pages = load_corpus(Path(args.corpus), Path(args.cache))
+    if not pages:
+        print(f"语料为空: {args.corpus}")
+        return 1
+    soups = [make_soup(page, args.backend) for page in pages]
+
+    print(f"语料: {len(soups)}个页面, 解析后端 {args.backend}, {args.rounds}轮")
+    print(f"{'选择器组':<12}{'选择器数':>8}{'逐个select_one':>16}{'SelectorPlan':>14}{'加速':>8}{'结果一致':>10}")
+    for name, plan in PLANS.items():
+        start = time.perf_counter()
+        for _ in range(args.rounds):
+            loop_results = [[soup.select_one(selector) for selector in plan.selectors] for soup in soups]
+        loop_elapsed = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for _ in range(args.rounds):
+            plan_results = [plan.match(soup) for soup in soups]
+        plan_elapsed = time.perf_counter() - start
+
+        same = sum(
+            all(a is b for a, b in zip(loop_result, plan_result))
+            for loop_result, plan_result in zip(loop_results, plan_results)
+        )
+        print(f"{name:<12}{len(plan.selectors):>8}{loop_elapsed * 1000:>14.1f}ms{plan_elapsed * 1000:>12.1f}ms"
+              f"{loop_elapsed / plan_elapsed:>7.1f}x{same:>6}/{len(soups)}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
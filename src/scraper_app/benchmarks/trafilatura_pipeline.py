@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Trafilatura流水线基准测试 - 比较每次调用都重新解析页面的旧流程与只解析一次的 TrafilaturaExtractor.extract
+
+用法:
+    python -m scraper_app.benchmarks.trafilatura_pipeline --corpus data/output --rounds 3
+"""
+
+import sys
+import time
+import argparse
+from pathlib import Path
+from typing import Dict
+
+# 添加src目录到Python路径
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+import trafilatura
+
+from scraper_app.benchmarks.parsing import load_corpus
+from scraper_app.scrapers.trafilatura_scraper import TrafilaturaExtractor
+from scraper_app.utils.config import Config
+from scraper_app.utils.extraction_pool import FetchedPage
+
+BENCHMARK_URL = 'https://news.example.cn/article'
+
+def extract_reparsing(content: bytes, url: str) -> Dict:
+    """旧流程：严格提取、宽松提取和元数据提取各自解析一遍页面"""
+    result = trafilatura.extract(content, url=url, target_language='zh', include_comments=False, include_tables=False, include_images=False)
+    if not result:
+        return {'content': '', 'metadata': None}
+    metadata = trafilatura.extract_metadata(content)
+    lines = result.split('\n')
+    content_text = '\n'.join(lines[1:]).strip()
+    if len(content_text) < 100:
+        loose_result = trafilatura.extract(content, url=url, include_comments=True, include_tables=True)
+        if loose_result and len(loose_result) > len(content_text):
+            content_text = loose_result
+    return {
+        'content': content_text,
+        'metadata': (metadata.author, metadata.date, metadata.sitename, metadata.title) if metadata else None,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Trafilatura流水线基准测试')
+    parser.add_argument('--corpus', default='data/output', help='文章语料目录 (默认: data/output)')
+    parser.add_argument('--cache', default=str(Config.HTTP_CACHE_DIR), help='HTTP缓存目录，存在时一并使用其中的原始页面')
+    parser.add_argument('--rounds', type=int, default=3, help='重复轮数 (默认: 3)')
+    args = parser.parse_args()
+
+    pages = load_corpus(Path(args.corpus), Path(args.cache))
+    if not pages:
+        print(f"语料为空: {args.corpus}")
+        return 1
+    extractor = TrafilaturaExtractor('trafilatura')
+    fetched = [FetchedPage(BENCHMARK_URL, page, 'utf-8', 200) for page in pages]
+
+    start = time.perf_counter()
+    for _ in range(args.rounds):
+        old_results = [extract_reparsing(page, BENCHMARK_URL) for page in pages]
+    old_elapsed = time.perf_counter() - start
+
+    stages: Dict[str, float] = {}
+    start = time.perf_counter()
+    for _ in range(args.rounds):
+        new_results = [extractor.extract(page) for page in fetched]
+        for result in new_results:
+            for stage, seconds in result.get('timings', {}).items():
+                stages[stage] = stages.get(stage, 0.0) + seconds
+    new_elapsed = time.perf_counter() - start
+
+    same = 0
+    for old, new in zip(old_results, new_results):
+        metadata = new.get('metadata')
+        new_metadata = (metadata['author'], metadata['date'], metadata['sitename'], metadata['title_meta']) if metadata else None
+        same += old['content'] == new.get('content', '') and old['metadata'] == new_metadata
+
+    count = len(pages) * args.rounds
+    print(f"语料: {len(pages)}个页面, {args.rounds}轮")
+    print(f"重复解析: {old_elapsed:.2f}秒 ({count / old_elapsed:.1f}页/秒)")
+    print(f"单次解析: {new_elapsed:.2f}秒 ({count / new_elapsed:.1f}页/秒), 加速 {old_elapsed / new_elapsed:.1f}x")
+    print("单次解析各阶段耗时:")
+    for stage, seconds in stages.items():
+        print(f"  {stage:<10}{seconds:>8.2f}秒 ({seconds / new_elapsed:>5.1%})")
+    print(f"结果一致: {same}/{len(pages)}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
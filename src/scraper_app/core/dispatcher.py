@@ -18,6 +18,10 @@ from scraper_app.scrapers.trafilatura_scraper import TrafilaturaScraper
 from scraper_app.scrapers.wechat_scraper import WeChatScraper
 from scraper_app.reporting.generator import ReportGenerator
 from scraper_app.utils.logger import get_logger
+from scraper_app.utils.http_cache import get_http_cache
+from scraper_app.utils.transport import get_transport
+from scraper_app.utils.extraction_pool import get_extraction_pool
+from scraper_app.utils.extraction_cache import get_extraction_cache
 
 class ScraperDispatcher:
     """爬虫调度器"""
@@ -57,8 +61,9 @@ class ScraperDispatcher:
             self.logger.error(f"加载URL失败: {e}")
             raise
     
-    def run(self, scraper_type: str, input_file: str, output_dir: str, workers: int = 5) -> Dict:
-        """运行爬虫任务"""
+    def run(self, scraper_type: str, input_file: str, output_dir: str, workers: int = 5,
+            options: Optional[Dict] = None) -> Dict:
+        """运行爬虫任务，options 为本次运行的提取选项（如 include_html）"""
         self.logger.info(f"开始执行爬虫任务: {scraper_type}")
         
         # 加载URL
@@ -71,6 +76,7 @@ class ScraperDispatcher:
         scraper = self.scrapers.get(scraper_type)
         if not scraper:
             raise ValueError(f"不支持的爬虫类型: {scraper_type}")
+        scraper.extract_options = dict(options or {})
         
         # 执行爬取
         start_time = datetime.datetime.now()
@@ -79,6 +85,21 @@ class ScraperDispatcher:
         
         duration = (end_time - start_time).total_seconds()
         
+        cache_stats = get_http_cache().get_stats()
+        self.logger.info(f"HTTP缓存统计: 304命中{cache_stats['revalidated']}次, 未命中{cache_stats['misses']}次, 条目{cache_stats['entries']}个")
+        transport_stats = get_transport().get_stats()
+        self.logger.info(f"连接池统计: 复用{transport_stats['pool_hits']}次, 新建{transport_stats['pool_misses']}次")
+        extraction_pool = get_extraction_pool()
+        extraction_stats = extraction_pool.get_stats()
+        self.logger.info(f"解析进程池统计: 进程池提取{extraction_stats['submitted']}次, 本线程提取{extraction_stats['inline']}次, 进程池重建{extraction_stats['broken']}次")
+        extraction_pool.shutdown()
+        extraction_cache_stats = get_extraction_cache().get_stats()
+        self.logger.info(f"提取缓存统计: 本地命中{extraction_cache_stats['local_hits']}次, Redis命中{extraction_cache_stats['redis_hits']}次, 未命中{extraction_cache_stats['misses']}次, 命中率{extraction_cache_stats['hit_rate']:.1%}")
+        if scraper.templates:
+            scraper.templates.save()
+            template_stats = scraper.templates.get_stats()
+            self.logger.info(f"提取模板统计: 模板命中{template_stats['template_hits']}次, 未命中{template_stats['template_misses']}次, 新学习{template_stats['learned']}个, 失效{template_stats['invalidated']}个")
+        
         # 保存结果
         self._save_results(results, output_dir)
         
@@ -110,7 +131,7 @@ class ScraperDispatcher:
         """生成爬取报告"""
         report_path = Path(output_dir) / "crawling_report.json"
         
-        report_data = self.report_generator.generate_report(results, duration)
+        report_data = self.report_generator.generate_report(results, duration, get_extraction_cache().get_stats())
         
         try:
             with open(report_path, 'w', encoding='utf-8') as f:
@@ -27,6 +27,8 @@ def main():
                        help='输出目录路径 (默认: data/output/当前时间戳)')
     parser.add_argument('--workers', '-w', type=int, default=5,
                        help='工作线程数 (默认: 5)')
+    parser.add_argument('--readability-html', action='store_true', default=Config.READABILITY_INCLUDE_HTML,
+                       help='Readability结果中保留正文HTML (默认: READABILITY_INCLUDE_HTML)')
     
     args = parser.parse_args()
     
@@ -53,7 +55,8 @@ def main():
     
     # 运行爬虫
     try:
-        results = dispatcher.run(args.scraper, args.input, args.output, args.workers)
+        options = {'include_html': True} if args.readability_html else {}
+        results = dispatcher.run(args.scraper, args.input, args.output, args.workers, options)
         logger.info("爬虫执行完成")
         return 0
     except Exception as e:
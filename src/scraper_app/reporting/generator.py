@@ -6,7 +6,7 @@
 import json
 import datetime
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Optional
 
 from scraper_app.utils.logger import get_logger
 
@@ -16,7 +16,7 @@ class ReportGenerator:
     def __init__(self):
         self.logger = get_logger(__name__)
     
-    def generate_report(self, results: Dict, duration: float) -> Dict:
+    def generate_report(self, results: Dict, duration: float, extraction_cache_stats: Optional[Dict] = None) -> Dict:
         """生成详细报告"""
         self.logger.info("开始生成爬取报告")
         
@@ -45,6 +45,10 @@ class ReportGenerator:
         
         report['summary']['website_types'] = type_stats
         
+        # 提取缓存命中情况
+        if extraction_cache_stats is not None:
+            report['summary']['extraction_cache'] = extraction_cache_stats
+        
         # 详细结果
         for url, result in results.items():
             detailed_result = {
@@ -90,6 +94,17 @@ class ReportGenerator:
             success_rate = (stats['success'] / stats['total'] * 100) if stats['total'] > 0 else 0
             content += f"- **{wtype}**: {stats['success']}/{stats['total']} ({success_rate:.1f}%)\n"
         
+        cache_stats = summary.get('extraction_cache')
+        if cache_stats:
+            content += f"""
+## 提取缓存
+
+- **命中率**: {cache_stats['hit_rate']*100:.1f}%
+- **本地命中**: {cache_stats['local_hits']}
+- **Redis命中**: {cache_stats['redis_hits']}
+- **未命中**: {cache_stats['misses']}
+"""
+        
         content += f"""
 ## 详细结果
 
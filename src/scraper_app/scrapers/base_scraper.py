@@ -3,14 +3,94 @@
 爬虫基类 - 定义所有爬虫的通用接口
 """
 
+import json
 from abc import ABC, abstractmethod
 from typing import Dict, List
+from urllib.parse import urlparse
+
+from scraper_app.utils.config import Config
+from scraper_app.utils.host_scheduler import get_host_scheduler
+from scraper_app.utils.extraction_pool import FetchedPage, extract_in_worker, get_extraction_pool
+from scraper_app.utils.extraction_cache import get_extraction_cache
+from scraper_app.utils.templates import get_template_store
+
+def detect_website_type(url: str) -> str:
+    """按域名检测网站类型"""
+    domain = urlparse(url).netloc.lower()
+    
+    if 'weixin.qq.com' in domain or 'mp.weixin.qq.com' in domain:
+        return 'wechat'
+    elif 'gov.cn' in domain:
+        return 'government'
+    elif 'ieee.org' in domain:
+        return 'academic'
+    elif 'jos.org.cn' in domain:
+        return 'journal'
+    elif 'baijiahao.baidu.com' in domain:
+        return 'baidu_baijiahao'
+    elif 'thepaper.cn' in domain:
+        return 'thepaper'
+    elif 'sohu.com' in domain:
+        return 'sohu'
+    elif 'news.cctv.com' in domain:
+        return 'cctv'
+    elif 'bjnews.com.cn' in domain:
+        return 'bjnews'
+    else:
+        return 'general'
+
+class BaseExtractor(ABC):
+    """静态提取器 - 只依赖下载好的页面和配置，不做任何I/O初始化，可以在解析进程中直接创建"""
+    
+    # 提取逻辑变化时递增，使旧的提取缓存失效
+    EXTRACTOR_VERSION = '1'
+    
+    def __init__(self, name: str):
+        self.name = name
+        # HTML解析后端，可按爬虫单独配置
+        self.parser_backend = Config.parser_backend(name)
+    
+    @abstractmethod
+    def extract(self, page: FetchedPage) -> Dict:
+        """从已下载的页面中提取内容（在解析进程中执行，只能依赖page和配置）
+        
+        Args:
+            page: 已下载的页面
+            
+        Returns:
+            Dict: 爬取结果，必须包含success字段
+        """
+        pass
+    
+    def cache_version(self, url: str) -> str:
+        """提取缓存使用的版本号；提取结果还依赖URL其他部分的提取器需要重写"""
+        return f"{self.EXTRACTOR_VERSION}:{self.parser_backend}"
+    
+    def detect_website_type(self, url: str) -> str:
+        """检测网站类型"""
+        return detect_website_type(url)
 
 class BaseScraper(ABC):
     """爬虫基类"""
     
+    # 能够从已下载页面中静态提取的爬虫指定提取器类，run_extraction 使用该提取器
+    EXTRACTOR = None
+    
+    # 是否按域名学习内容选择器模板（结果中需要返回 content_selector）
+    LEARNS_TEMPLATES = False
+    
     def __init__(self, name: str):
         self.name = name
+        # 所有爬虫共享主机调度器，按主机限制并发和请求间隔
+        self.host_scheduler = get_host_scheduler()
+        # HTML解析后端，可按爬虫单独配置
+        self.parser_backend = Config.parser_backend(name)
+        # 静态提取器，进程池关闭时在当前线程使用
+        self.extractor = self.EXTRACTOR(name) if self.EXTRACTOR else None
+        # 按域名学习的提取模板
+        self.templates = get_template_store() if self.LEARNS_TEMPLATES and Config.TEMPLATES_ENABLED else None
+        # 本次运行的提取选项，随页面一起传给解析进程
+        self.extract_options: Dict = {}
     
     @abstractmethod
     def scrape_url(self, url: str) -> Dict:
@@ -24,6 +104,41 @@ class BaseScraper(ABC):
         """
         pass
     
+    def run_extraction(self, url: str, response) -> Dict:
+        """把下载好的响应交给解析进程池提取，进程池关闭时在当前线程提取
+        
+        页面内容未变化时直接返回提取缓存中的成功结果；只能由指定了 EXTRACTOR 的爬虫调用。
+        """
+        cache = get_extraction_cache()
+        version = self.extractor.cache_version(url)
+        if self.extract_options:
+            version += ':' + json.dumps(self.extract_options, sort_keys=True)
+        key = cache.make_key(response.content, self.name, version)
+        result = cache.get(key)
+        if result is not None:
+            self.logger.debug(f"提取缓存命中: {url}")
+            result.update({'url': url, 'website_type': self.detect_website_type(url)})
+            return result
+        
+        template = self.templates.lookup(self.name, url) if self.templates else None
+        page = FetchedPage.from_response(url, response, template, self.extract_options)
+        pool = get_extraction_pool()
+        if not pool.enabled:
+            result = self.extractor.extract(page)
+        else:
+            result = pool.run(extract_in_worker, self.name, page)
+        # 只缓存成功的结果，一次失败的提取不会在之后的运行中被重复返回
+        if result.get('success'):
+            cache.put(key, result)
+        
+        if self.templates and self.should_record_template(result):
+            self.templates.record(self.name, url, template, result.get('content_selector'), result.get('success', False))
+        return result
+    
+    def should_record_template(self, result: Dict) -> bool:
+        """提取结果是否计入域名模板的学习和命中率"""
+        return True
+    
     @abstractmethod
     def scrape_all_urls(self, urls: List[str], workers: int = 5) -> Dict[str, Dict]:
         """批量爬取多个URL
@@ -46,27 +161,4 @@ class BaseScraper(ABC):
         Returns:
             str: 网站类型
         """
-        from urllib.parse import urlparse
-        
-        domain = urlparse(url).netloc.lower()
-        
-        if 'weixin.qq.com' in domain or 'mp.weixin.qq.com' in domain:
-            return 'wechat'
-        elif 'gov.cn' in domain:
-            return 'government'
-        elif 'ieee.org' in domain:
-            return 'academic'
-        elif 'jos.org.cn' in domain:
-            return 'journal'
-        elif 'baijiahao.baidu.com' in domain:
-            return 'baidu_baijiahao'
-        elif 'thepaper.cn' in domain:
-            return 'thepaper'
-        elif 'sohu.com' in domain:
-            return 'sohu'
-        elif 'news.cctv.com' in domain:
-            return 'cctv'
-        elif 'bjnews.com.cn' in domain:
-            return 'bjnews'
-        else:
-            return 'general'
\ No newline at end of file
+        return detect_website_type(url)
\ No newline at end of file
@@ -9,20 +9,70 @@ import json
 import time
 import datetime
 from newspaper import Article
-from concurrent.futures import ThreadPoolExecutor, as_completed
 import threading
 from typing import Dict, List
 from urllib.parse import urlparse
 
-from scraper_app.scrapers.base_scraper import BaseScraper
+from scraper_app.scrapers.base_scraper import BaseExtractor, BaseScraper
 from scraper_app.utils.logger import get_logger
+from scraper_app.utils.http_cache import get_http_cache
+from scraper_app.utils.transport import get_transport
+from scraper_app.utils.extraction_pool import FetchedPage
+
+class NewspaperExtractor(BaseExtractor):
+    """Newspaper3k爬虫的静态提取"""
+    
+    def cache_version(self, url: str) -> str:
+        """提取语言由URL决定，不同语言的结果分开缓存"""
+        language = 'zh' if 'cn' in url else 'en'
+        return f"{super().cache_version(url)}:{language}"
+    
+    def extract(self, page: FetchedPage) -> Dict:
+        """从已下载的页面中提取内容
+
+        与Newspaper3k自己下载时相同：响应头声明了字符集时按声明解码，否则把页面字节交给
+        Newspaper3k根据<meta charset>和内容探测，避免未声明编码的页面被按ISO-8859-1解码。
+        """
+        article = Article(page.url, language='zh' if 'cn' in page.url else 'en')
+        article.download(input_html=page.text if page.declared_encoding else page.content)
+        article.parse()
+        
+        # 如果文章没有标题或正文，标记为失败
+        if not article.title and not article.text:
+            return {
+                'url': page.url,
+                'website_type': self.detect_website_type(page.url),
+                'error': 'No meaningful content extracted',
+                'method': 'newspaper3k',
+                'success': False
+            }
+        
+        return {
+            'url': page.url,
+            'title': article.title or '',
+            'description': article.meta_description or '',
+            'content': article.text or '',
+            'website_type': self.detect_website_type(page.url),
+            'method': 'newspaper3k',
+            'authors': article.authors or [],
+            'publish_date': article.publish_date.isoformat() if article.publish_date else None,
+            'top_image': article.top_image or '',
+            'movies': article.movies or [],
+            'success': bool(article.text and len(article.text) > 100)
+        }
 
 class NewspaperScraper(BaseScraper):
     """Newspaper3k爬虫"""
     
+    # 静态提取器，可在解析进程中独立创建
+    EXTRACTOR = NewspaperExtractor
+    
     def __init__(self):
         super().__init__("newspaper")
         self.logger = get_logger(__name__)
+        self.transport = get_transport()
+        self.session = self.transport.create_session()
+        self.http_cache = get_http_cache()
         self.lock = threading.Lock()
         self.scraped_count = 0
     
@@ -35,33 +85,12 @@ class NewspaperScraper(BaseScraper):
         try:
             self.logger.debug(f"开始使用Newspaper3k爬取: {url}")
             
-            article = Article(url, language='zh' if 'cn' in url else 'en')
-            article.download()
-            article.parse()
-            
-            # 如果文章没有标题或正文，标记为失败
-            if not article.title and not article.text:
-                return {
-                    'url': url,
-                    'website_type': self.detect_website_type(url),
-                    'error': 'No meaningful content extracted',
-                    'method': 'newspaper3k',
-                    'success': False
-                }
+            # 下载页面内容（经过共享HTTP缓存），再交给Newspaper3k解析
+            response = self.http_cache.fetch(self.session, url, timeout=self.transport.timeout)
+            response.raise_for_status()
             
-            result = {
-                'url': url,
-                'title': article.title or '',
-                'description': article.meta_description or '',
-                'content': article.text or '',
-                'website_type': self.detect_website_type(url),
-                'method': 'newspaper3k',
-                'authors': article.authors or [],
-                'publish_date': article.publish_date.isoformat() if article.publish_date else None,
-                'top_image': article.top_image or '',
-                'movies': article.movies or [],
-                'success': bool(article.text and len(article.text) > 100)
-            }
+            # 解析在进程池中进行，下载线程只等待结果
+            result = self.run_extraction(url, response)
             
             self.logger.debug(f"Newspaper3k爬取完成: {url} - {'成功' if result['success'] else '失败'}")
             return result
@@ -110,28 +139,21 @@ class NewspaperScraper(BaseScraper):
         # 准备URL数据（带索引）
         url_data = [(url, i+1, len(urls)) for i, url in enumerate(urls)]
         
-        with ThreadPoolExecutor(max_workers=workers) as executor:
-            # 提交所有任务
-            future_to_url = {
-                executor.submit(self.scrape_url_with_thread, data): data[0] 
-                for data in url_data
-            }
-            
-            # 处理完成的任务
-            for future in as_completed(future_to_url):
-                url = future_to_url[future]
-                try:
-                    url, result = future.result()
-                    all_results[url] = result
-                except Exception as e:
-                    self.logger.error(f"处理 {url} 异常: {e}")
-                    all_results[url] = {
-                        'url': url,
-                        'website_type': 'unknown',
-                        'error': str(e),
-                        'method': 'newspaper3k',
-                        'success': False
-                    }
+        # 按主机调度：限制单个主机的并发和请求间隔，主机之间轮询
+        for data, future in self.host_scheduler.run(url_data, workers, self.scrape_url_with_thread):
+            url = data[0]
+            try:
+                url, result = future.result()
+                all_results[url] = result
+            except Exception as e:
+                self.logger.error(f"处理 {url} 异常: {e}")
+                all_results[url] = {
+                    'url': url,
+                    'website_type': 'unknown',
+                    'error': str(e),
+                    'method': 'newspaper3k',
+                    'success': False
+                }
         
         self.logger.info(f"Newspaper3k爬取完成，共处理{len(all_results)}个URL")
         return all_results
\ No newline at end of file
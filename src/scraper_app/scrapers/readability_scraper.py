@@ -8,37 +8,123 @@ import os
 import json
 import time
 import datetime
-import requests
+from lxml import etree
 from readability import Document
-import html2text
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from readability.encoding import fix_charset
 import threading
 from typing import Dict, List
 from urllib.parse import urlparse
 
-from scraper_app.scrapers.base_scraper import BaseScraper
+from scraper_app.scrapers.base_scraper import BaseExtractor, BaseScraper
+from scraper_app.utils.config import Config
 from scraper_app.utils.logger import get_logger
+from scraper_app.utils.http_cache import get_http_cache
+from scraper_app.utils.transport import get_transport
+from scraper_app.utils.extraction_pool import FetchedPage
+
+# 前后需要断开文本的块级元素
+BLOCK_TAGS = frozenset([
+    'address', 'article', 'aside', 'blockquote', 'br', 'dd', 'div', 'dl', 'dt',
+    'figcaption', 'figure', 'footer', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'header',
+    'hr', 'li', 'main', 'ol', 'p', 'pre', 'section', 'table', 'td', 'th', 'tr', 'ul'
+])
+
+def tree_text(root) -> str:
+    """按文档顺序取出lxml树中的文本，块级元素之间用空格分隔，并合并连续空白"""
+    parts = []
+    for event, element in etree.iterwalk(root, events=('start', 'end')):
+        is_tag = isinstance(element.tag, str)
+        if event == 'start':
+            if is_tag:
+                if element.tag in BLOCK_TAGS:
+                    parts.append(' ')
+                if element.text:
+                    parts.append(element.text)
+        else:
+            if is_tag and element.tag in BLOCK_TAGS:
+                parts.append(' ')
+            if element.tail and element is not root:
+                parts.append(element.tail)
+    return ' '.join(''.join(parts).split())
+
+class SummaryDocument(Document):
+    """保留Readability最终清理后的文章树，只在 serialize_html 为True时序列化HTML"""
+    
+    summary_tree = None
+    
+    def __init__(self, input, serialize_html: bool = True, **options):
+        super().__init__(input, **options)
+        self.serialize_html = serialize_html
+    
+    def get_clean_html(self):
+        # sanitize()在序列化前把清理后的文章节点设为self.html，每轮重试都会更新
+        self.summary_tree = self._html()
+        if self.serialize_html:
+            return super().get_clean_html()
+        # 不需要HTML时直接返回文章文本；summary()按返回值长度（retry_length）判断是否放宽规则重试
+        return tree_text(self.summary_tree)
+
+class ReadabilityExtractor(BaseExtractor):
+    """Readability爬虫的静态提取"""
+    
+    def extract(self, page: FetchedPage) -> Dict:
+        """从已下载的页面中提取内容
+        
+        页面字节直接交给Readability：响应头声明了字符集时按声明解码，否则由Readability根据
+        <meta charset>判断，不再使用requests对整个正文的编码探测。
+        正文直接从Readability清理后的文章树中取出，不再经过 summary HTML -> html2text 的转换；
+        只有 include_html 选项打开时才序列化文章HTML并在结果中保留 content_html。
+        """
+        include_html = page.options.get('include_html', Config.READABILITY_INCLUDE_HTML)
+        
+        if page.declared_encoding:
+            markup = page.content.decode(fix_charset(page.declared_encoding), 'replace')
+        else:
+            markup = page.content
+        
+        # 使用Readability解析文档，只有需要content_html时才序列化文章HTML
+        doc = SummaryDocument(markup, serialize_html=include_html)
+        
+        # 提取标题
+        title = doc.title()
+        
+        # 提取主要内容：include_html 时为HTML，否则直接是清理空白后的纯文本
+        summary = doc.summary()
+        
+        if include_html:
+            # 从文章树提取纯文本并清理空白
+            content_text = tree_text(doc.summary_tree) if doc.summary_tree is not None else ''
+        else:
+            content_text = summary
+        
+        result = {
+            'url': page.url,
+            'title': title or '',
+            'description': '',  # Readability不直接提供meta描述
+            'content': content_text,
+            'website_type': self.detect_website_type(page.url),
+            'method': 'readability',
+            'status_code': page.status_code,
+            'success': bool(content_text and len(content_text) > 100)
+        }
+        if include_html:
+            result['content_html'] = summary  # 保留HTML版本
+        return result
 
 class ReadabilityScraper(BaseScraper):
     """Readability爬虫"""
     
+    # 静态提取器，可在解析进程中独立创建
+    EXTRACTOR = ReadabilityExtractor
+    
     def __init__(self):
         super().__init__("readability")
         self.logger = get_logger(__name__)
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5',
-            'Accept-Encoding': 'gzip, deflate',
-            'Connection': 'keep-alive',
-        })
+        self.transport = get_transport()
+        self.session = self.transport.create_session()
+        self.http_cache = get_http_cache()
         self.lock = threading.Lock()
         self.scraped_count = 0
-        self.html2text = html2text.HTML2Text()
-        self.html2text.ignore_links = True
-        self.html2text.ignore_images = True
-        self.html2text.ignore_tables = True
     
     def scrape_url(self, url: str) -> Dict:
         """爬取单个URL"""
@@ -49,35 +135,11 @@ class ReadabilityScraper(BaseScraper):
         try:
             self.logger.debug(f"开始使用Readability爬取: {url}")
             
-            response = self.session.get(url, timeout=30)
+            response = self.http_cache.fetch(self.session, url, timeout=self.transport.timeout)
             response.raise_for_status()
             
-            # 使用Readability解析文档
-            doc = Document(response.text)
-            
-            # 提取标题
-            title = doc.title()
-            
-            # 提取主要内容（HTML格式）
-            content_html = doc.summary()
-            
-            # 转换为纯文本
-            content_text = self.html2text.handle(content_html)
-            
-            # 清理文本
-            content_text = ' '.join(content_text.split())
-            
-            result = {
-                'url': url,
-                'title': title or '',
-                'description': '',  # Readability不直接提供meta描述
-                'content': content_text,
-                'website_type': self.detect_website_type(url),
-                'method': 'readability',
-                'content_html': content_html,  # 保留HTML版本
-                'status_code': response.status_code,
-                'success': bool(content_text and len(content_text) > 100)
-            }
+            # 解析在进程池中进行，下载线程只等待结果
+            result = self.run_extraction(url, response)
             
             self.logger.debug(f"Readability爬取完成: {url} - {'成功' if result['success'] else '失败'}")
             return result
@@ -126,28 +188,21 @@ class ReadabilityScraper(BaseScraper):
         # 准备URL数据（带索引）
         url_data = [(url, i+1, len(urls)) for i, url in enumerate(urls)]
         
-        with ThreadPoolExecutor(max_workers=workers) as executor:
-            # 提交所有任务
-            future_to_url = {
-                executor.submit(self.scrape_url_with_thread, data): data[0] 
-                for data in url_data
-            }
-            
-            # 处理完成的任务
-            for future in as_completed(future_to_url):
-                url = future_to_url[future]
-                try:
-                    url, result = future.result()
-                    all_results[url] = result
-                except Exception as e:
-                    self.logger.error(f"处理 {url} 异常: {e}")
-                    all_results[url] = {
-                        'url': url,
-                        'website_type': 'unknown',
-                        'error': str(e),
-                        'method': 'readability',
-                        'success': False
-                    }
+        # 按主机调度：限制单个主机的并发和请求间隔，主机之间轮询
+        for data, future in self.host_scheduler.run(url_data, workers, self.scrape_url_with_thread):
+            url = data[0]
+            try:
+                url, result = future.result()
+                all_results[url] = result
+            except Exception as e:
+                self.logger.error(f"处理 {url} 异常: {e}")
+                all_results[url] = {
+                    'url': url,
+                    'website_type': 'unknown',
+                    'error': str(e),
+                    'method': 'readability',
+                    'success': False
+                }
         
         self.logger.info(f"Readability爬取完成，共处理{len(all_results)}个URL")
         return all_results
\ No newline at end of file
@@ -9,30 +9,86 @@ import re
 import json
 import time
 import datetime
-import requests
 import threading
 from urllib.parse import urlparse
-from bs4 import BeautifulSoup
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import Dict, List
+from typing import Dict, List, Optional
 
-from scraper_app.scrapers.base_scraper import BaseScraper
+from scraper_app.scrapers.base_scraper import BaseExtractor, BaseScraper
 from scraper_app.utils.logger import get_logger
+from scraper_app.utils.parsing import make_soup, extract_main_text, SelectorPlan
+from scraper_app.utils.http_cache import get_http_cache
+from scraper_app.utils.transport import get_transport
+from scraper_app.utils.extraction_pool import FetchedPage
+
+class RequestsExtractor(BaseExtractor):
+    """Requests + BeautifulSoup爬虫的静态提取"""
+    
+    # 常见的内容选择器（按优先级）
+    CONTENT_SELECTORS = SelectorPlan([
+        'article', 'main', '.content', '.article-content',
+        '.post-content', '.entry-content', '#content',
+        '.news-content', '.text-content', '.entry-body',
+        '.post-body', '.article-body', '.main-content',
+        '#main-content', '.story-content', '.post-text'
+    ])
+    
+    def extract_page(self, html, template: Optional[str] = None) -> Dict[str, str]:
+        """从页面HTML中提取标题、描述和正文，content_selector 为正文采用的选择器"""
+        soup = make_soup(html, self.parser_backend)
+        
+        # 移除脚本和样式元素
+        for script in soup(["script", "style"]):
+            script.decompose()
+        
+        # 提取标题
+        title = soup.find('title')
+        title_text = title.get_text().strip() if title else ""
+        
+        # 提取meta描述
+        description = ""
+        meta_desc = soup.find('meta', attrs={'name': 'description'})
+        if meta_desc:
+            description = meta_desc.get('content', '')
+        
+        # 提取主要内容
+        # 一次遍历匹配全部内容选择器，按优先级取第一个内容充足（>200字符）的区域；
+        # 该域名已学习到模板时先只匹配模板选择器
+        selector, content = extract_main_text(soup, self.CONTENT_SELECTORS, 200, template)
+        
+        return {'title': title_text, 'description': description, 'content': content, 'content_selector': selector}
+    
+    def extract(self, page: FetchedPage) -> Dict:
+        """从已下载的页面中提取内容"""
+        extracted = self.extract_page(page.content, page.template)
+        content = extracted['content']
+        
+        return {
+            'url': page.url,
+            'title': extracted['title'],
+            'description': extracted['description'],
+            'content': content,
+            'website_type': self.detect_website_type(page.url),
+            'method': 'requests_beautifulsoup',
+            'status_code': page.status_code,
+            'content_selector': extracted['content_selector'],
+            'success': bool(content and len(content) > 100)
+        }
 
 class RequestsScraper(BaseScraper):
     """Requests + BeautifulSoup爬虫"""
     
+    # 静态提取器，可在解析进程中独立创建
+    EXTRACTOR = RequestsExtractor
+    
+    # 按域名学习内容选择器模板
+    LEARNS_TEMPLATES = True
+    
     def __init__(self):
         super().__init__("requests")
         self.logger = get_logger(__name__)
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5',
-            'Accept-Encoding': 'gzip, deflate',
-            'Connection': 'keep-alive',
-        })
+        self.transport = get_transport()
+        self.session = self.transport.create_session()
+        self.http_cache = get_http_cache()
         self.lock = threading.Lock()
         self.scraped_count = 0
     
@@ -45,70 +101,11 @@ class RequestsScraper(BaseScraper):
         try:
             self.logger.debug(f"开始爬取: {url}")
             
-            response = self.session.get(url, timeout=30)
+            response = self.http_cache.fetch(self.session, url, timeout=self.transport.timeout)
             response.raise_for_status()
             
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # 移除脚本和样式元素
-            for script in soup(["script", "style"]):
-                script.decompose()
-            
-            # 提取标题
-            title = soup.find('title')
-            title_text = title.get_text().strip() if title else ""
-            
-            # 提取meta描述
-            description = ""
-            meta_desc = soup.find('meta', attrs={'name': 'description'})
-            if meta_desc:
-                description = meta_desc.get('content', '')
-            
-            # 提取主要内容
-            content = ""
-            
-            # 尝试常见的内容选择器
-            content_selectors = [
-                'article', 'main', '.content', '.article-content', 
-                '.post-content', '.entry-content', '#content',
-                '.news-content', '.text-content', '.entry-body',
-                '.post-body', '.article-body', '.main-content',
-                '#main-content', '.story-content', '.post-text'
-            ]
-            
-            for selector in content_selectors:
-                element = soup.select_one(selector)
-                if element:
-                    # 移除不需要的元素
-                    for unwanted in element.find_all(['script', 'style', 'nav', 'header', 'footer', 'aside']):
-                        unwanted.decompose()
-                    content = element.get_text(separator=' ', strip=True)
-                    if len(content) > 200:  # 只接受内容充足的
-                        break
-            
-            # 如果没有找到具体内容，尝试body但进行清理
-            if not content or len(content) < 200:
-                body = soup.find('body')
-                if body:
-                    # 复制body避免修改原始内容
-                    body_copy = BeautifulSoup(str(body), 'html.parser')
-                    # 移除不需要的元素
-                    for unwanted in body_copy.find_all(['script', 'style', 'nav', 'header', 'footer', 'aside', 'menu']):
-                        unwanted.decompose()
-                    body_content = body_copy.get_text(separator=' ', strip=True)
-                    if len(body_content) > len(content):
-                        content = body_content
-            
-            result = {
-                'url': url,
-                'title': title_text,
-                'description': description,
-                'content': content,
-                'website_type': self.detect_website_type(url),
-                'method': 'requests_beautifulsoup',
-                'status_code': response.status_code,
-                'success': bool(content and len(content) > 100)
-            }
+            # 解析在进程池中进行，下载线程只等待结果
+            result = self.run_extraction(url, response)
             
             self.logger.debug(f"爬取完成: {url} - {'成功' if result['success'] else '失败'}")
             return result
@@ -157,28 +154,21 @@ class RequestsScraper(BaseScraper):
         # 准备URL数据（带索引）
         url_data = [(url, i+1, len(urls)) for i, url in enumerate(urls)]
         
-        with ThreadPoolExecutor(max_workers=workers) as executor:
-            # 提交所有任务
-            future_to_url = {
-                executor.submit(self.scrape_url_with_thread, data): data[0] 
-                for data in url_data
-            }
-            
-            # 处理完成的任务
-            for future in as_completed(future_to_url):
-                url = future_to_url[future]
-                try:
-                    url, result = future.result()
-                    all_results[url] = result
-                except Exception as e:
-                    self.logger.error(f"处理 {url} 异常: {e}")
-                    all_results[url] = {
-                        'url': url,
-                        'website_type': 'unknown',
-                        'error': str(e),
-                        'method': 'requests_beautifulsoup',
-                        'success': False
-                    }
+        # 按主机调度：限制单个主机的并发和请求间隔，主机之间轮询
+        for data, future in self.host_scheduler.run(url_data, workers, self.scrape_url_with_thread):
+            url = data[0]
+            try:
+                url, result = future.result()
+                all_results[url] = result
+            except Exception as e:
+                self.logger.error(f"处理 {url} 异常: {e}")
+                all_results[url] = {
+                    'url': url,
+                    'website_type': 'unknown',
+                    'error': str(e),
+                    'method': 'requests_beautifulsoup',
+                    'success': False
+                }
         
         self.logger.info(f"爬取完成，共处理{len(all_results)}个URL")
         return all_results
\ No newline at end of file
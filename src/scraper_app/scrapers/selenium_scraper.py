@@ -4,202 +4,178 @@ Selenium Web Scraper
 基于Selenium浏览器的爬虫实现，适用于JavaScript渲染的页面
 """
 
-import os
 import json
-import time
+import random
+import itertools
 import datetime
-import requests
 from urllib.parse import urlparse
-from bs4 import BeautifulSoup
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.common.exceptions import WebDriverException
 from fake_useragent import UserAgent
-from concurrent.futures import ThreadPoolExecutor, as_completed
 import threading
 from typing import Dict, List
 
-from scraper_app.scrapers.base_scraper import BaseScraper
+from scraper_app.scrapers.base_scraper import BaseExtractor, BaseScraper
 from scraper_app.utils.logger import get_logger
+from scraper_app.utils.parsing import make_soup, get_text_excluding, extract_main_text, SelectorPlan, NOISE_TAGS, BOILERPLATE_TAGS, BODY_SELECTOR
+from scraper_app.utils.transport import get_transport
+from scraper_app.utils.http_cache import get_http_cache
+from scraper_app.utils.extraction_pool import FetchedPage
+from scraper_app.utils.render_check import RenderDecisionStats, detect_js_shell
+from scraper_app.utils.config import Config
+from scraper_app.utils.driver_pool import DriverUnavailableError
+from scraper_app.utils.chrome_driver import create_driver_pool
+from scraper_app.utils.readiness import ReadinessPolicy, wait_until_ready
+from scraper_app.utils.resource_blocking import collect_network_stats
+
+class SeleniumExtractor(BaseExtractor):
+    """Selenium爬虫混合模式的静态提取"""
+    
+    # Selenium友好的内容选择器（按优先级）
+    CONTENT_SELECTORS = SelectorPlan([
+        'article', 'main', '.content', '.article-content',
+        '.post-content', '.entry-content', '#content',
+        '.news-content', '.text-content', '.entry-body',
+        '.post-body', '.article-body', '.main-content',
+        '#main-content', '.story-content', '.post-text',
+        '.dynamic-content', '.rendered-content'  # 针对动态内容
+    ])
+    
+    def extract(self, page: FetchedPage) -> Dict:
+        """混合模式的静态提取：从HTTP获取的页面中提取内容，并判断是否需要浏览器渲染（render_reason）"""
+        soup = make_soup(page.content, self.parser_backend)
+        
+        # 移除脚本和样式元素
+        for script in soup(["script", "style"]):
+            script.decompose()
+        
+        # 提取标题
+        title = soup.find('title')
+        title_text = title.get_text().strip() if title else ""
+        
+        # 提取meta描述
+        description = ""
+        meta_desc = soup.find('meta', attrs={'name': 'description'})
+        if meta_desc:
+            description = meta_desc.get('content', '')
+        
+        selector, content = extract_main_text(soup, self.CONTENT_SELECTORS, 200, page.template)
+        success = bool(content and len(content) > 100)
+        
+        # 页面是JS外壳，或静态提取不到正文时需要渲染
+        render_reason = detect_js_shell(soup, content, Config.SELENIUM_HYBRID_MIN_TEXT)
+        if render_reason is None and not success:
+            render_reason = 'static_failed'
+        
+        return {
+            'url': page.url,
+            'title': title_text,
+            'description': description,
+            'content': content,
+            'website_type': self.detect_website_type(page.url),
+            'method': 'selenium_static',
+            'status_code': page.status_code,
+            'content_selector': selector,
+            'render_reason': render_reason,
+            'success': success
+        }
 
 class SeleniumScraper(BaseScraper):
     """Selenium爬虫"""
     
+    # 混合模式的静态提取器，可在解析进程中独立创建
+    EXTRACTOR = SeleniumExtractor
+    
+    # 按域名学习内容选择器模板，每个候选选择器都要向浏览器查询一次，命中模板时节省最多
+    LEARNS_TEMPLATES = True
+    
+    # Selenium友好的内容选择器（按优先级），与静态提取共用
+    CONTENT_SELECTORS = SeleniumExtractor.CONTENT_SELECTORS
+    
+    # 任一内容区域已有足够文本即可提取，否则等到网络空闲且DOM稳定
+    READINESS = ReadinessPolicy(selectors=CONTENT_SELECTORS.selectors, min_text_length=200)
+    
     def __init__(self):
         super().__init__("selenium")
         self.logger = get_logger(__name__)
         self.ua = UserAgent()
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': self.ua.random,
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5',
-            'Accept-Encoding': 'gzip, deflate',
-            'Connection': 'keep-alive',
-        })
+        self.transport = get_transport()
+        self.session = self.transport.create_session({'User-Agent': self.ua.random})
         self.lock = threading.Lock()
         self.scraped_count = 0
         
         # Selenium配置
         self.html2text = None  # 将在需要时导入
-    
-    def get_selenium_driver(self):
-        """创建并返回Selenium Chrome/Chromium驱动"""
-        try:
-            chrome_options = Options()
-            chrome_options.add_argument('--headless')
-            chrome_options.add_argument('--no-sandbox')
-            chrome_options.add_argument('--disable-dev-shm-usage')
-            chrome_options.add_argument('--disable-gpu')
-            chrome_options.add_argument('--disable-extensions')
-            chrome_options.add_argument('--disable-images')  # 禁用图片以加快加载速度
-            chrome_options.add_argument('--disable-javascript')  # 先尝试禁用JS
-            chrome_options.add_argument(f'user-agent={self.ua.random}')
-            
-            # 尝试不同的Chrome/Chromium二进制文件位置
-            chromium_paths = [
-                '/usr/bin/chromium',
-                '/usr/bin/chromium-browser',
-                '/usr/bin/google-chrome',
-                '/usr/bin/google-chrome-stable'
-            ]
-            
-            for path in chromium_paths:
-                if os.path.exists(path):
-                    chrome_options.binary_location = path
-                    break
-            
-            # 创建驱动
-            driver = webdriver.Chrome(options=chrome_options)
-            return driver
-            
-        except Exception as e:
-            self.logger.error(f"创建Selenium驱动失败: {e}")
-            return None
+        
+        # 混合模式：先用HTTP获取静态页面，只有JS外壳页面才交给浏览器渲染
+        self.hybrid = Config.SELENIUM_HYBRID_ENABLED
+        self.http_cache = get_http_cache()
+        self.render_stats = RenderDecisionStats()
+        
+        # 每个URL租用浏览器中的一个标签页，少量浏览器同时渲染多个URL，用完重置后留给下一个URL
+        self.driver_pool = create_driver_pool(self.name, lambda: self.ua.random)
     
     def scrape_url(self, url: str) -> Dict:
         """爬取单个URL"""
+        if self.hybrid:
+            return self.scrape_hybrid(url)
         return self.scrape_with_selenium(url)
     
+    def should_record_template(self, result: Dict) -> bool:
+        """需要渲染的页面以浏览器的提取结果计入模板命中率"""
+        return not result.get('render_reason')
+    
+    def scrape_hybrid(self, url: str) -> Dict:
+        """先静态获取，JS外壳页面再用浏览器渲染；按抽样比例渲染留在静态的页面，评估判断是否正确"""
+        try:
+            response = self.http_cache.fetch(self.session, url, timeout=self.transport.timeout)
+            response.raise_for_status()
+            static = self.run_extraction(url, response)
+        except Exception as e:
+            self.logger.debug(f"静态获取失败，使用浏览器: {url} - {e}")
+            rendered = self.scrape_with_selenium(url)
+            self.render_stats.record('browser', 'fetch_failed', None, rendered)
+            rendered.update({'render_decision': 'browser', 'render_reason': 'fetch_failed', 'render_correct': None})
+            return rendered
+        
+        reason = static.get('render_reason')
+        if reason:
+            self.logger.debug(f"需要浏览器渲染({reason}): {url}")
+            rendered = self.scrape_with_selenium(url)
+            correct = self.render_stats.record('browser', reason, static, rendered)
+            rendered.update({'render_decision': 'browser', 'render_reason': reason, 'render_correct': correct})
+            return rendered
+        
+        rendered = None
+        if random.random() < Config.SELENIUM_HYBRID_AUDIT_RATE:
+            rendered = self.scrape_with_selenium(url)
+        correct = self.render_stats.record('static', None, static, rendered)
+        if correct is False:
+            # 抽样发现静态结果缺少内容，使用浏览器结果
+            self.logger.info(f"静态判断有误，页面需要渲染: {url}")
+            rendered.update({'render_decision': 'browser', 'render_reason': 'audit', 'render_correct': False})
+            return rendered
+        
+        result = dict(static)
+        result.update({'render_decision': 'static', 'render_correct': correct})
+        return result
+    
     def scrape_with_selenium(self, url: str) -> Dict:
         """使用Selenium进行页面爬取"""
-        driver = None
         try:
             self.logger.debug(f"开始使用Selenium爬取: {url}")
             
-            driver = self.get_selenium_driver()
-            if not driver:
-                return {
-                    'url': url,
-                    'website_type': self.detect_website_type(url),
-                    'error': 'Failed to create Selenium driver',
-                    'method': 'selenium',
-                    'success': False
-                }
-            
-            # 导航到页面
-            driver.get(url)
-            
-            # 等待页面加载
-            try:
-                WebDriverWait(driver, 10).until(
-                    EC.presence_of_element_located((By.TAG_NAME, "body"))
-                )
-            except TimeoutException:
-                self.logger.warning(f"页面加载超时: {url}")
-            
-            # 等待额外时间让动态内容加载
-            time.sleep(2)
-            
-            # 获取页面源代码
-            page_source = driver.page_source
-            
-            # 使用BeautifulSoup解析
-            soup = BeautifulSoup(page_source, 'html.parser')
-            
-            # 移除脚本和样式元素
-            for script in soup(["script", "style"]):
-                script.decompose()
-            
-            # 提取标题
-            title = soup.find('title')
-            title_text = title.get_text().strip() if title else ""
+            with self.driver_pool.lease() as driver:
+                return self.scrape_page(driver, url)
             
-            # 提取meta描述
-            description = ""
-            meta_desc = soup.find('meta', attrs={'name': 'description'})
-            if meta_desc:
-                description = meta_desc.get('content', '')
-            
-            # 提取主要内容 - 使用多种选择器策略
-            content = ""
-            
-            # Selenium友好的内容选择器
-            content_selectors = [
-                'article', 'main', '.content', '.article-content', 
-                '.post-content', '.entry-content', '#content',
-                '.news-content', '.text-content', '.entry-body',
-                '.post-body', '.article-body', '.main-content',
-                '#main-content', '.story-content', '.post-text',
-                '.dynamic-content', '.rendered-content'  # 针对动态内容
-            ]
-            
-            for selector in content_selectors:
-                try:
-                    # 尝试使用Selenium的find_element
-                    elements = driver.find_elements(By.CSS_SELECTOR, selector)
-                    if elements:
-                        element = elements[0]  # 取第一个匹配的元素
-                        content = element.text
-                        if len(content) > 200:
-                            break
-                except:
-                    # 如果Selenium方法失败，回退到BeautifulSoup
-                    element = soup.select_one(selector)
-                    if element:
-                        # 移除不需要的元素
-                        for unwanted in element.find_all(['script', 'style', 'nav', 'header', 'footer', 'aside']):
-                            unwanted.decompose()
-                        content = element.get_text(separator=' ', strip=True)
-                        if len(content) > 200:
-                            break
-            
-            # 如果还是没有找到内容，尝试body
-            if not content or len(content) < 200:
-                try:
-                    # 先尝试Selenium获取body文本
-                    body_element = driver.find_element(By.TAG_NAME, 'body')
-                    body_content = body_element.text
-                    if len(body_content) > len(content):
-                        content = body_content
-                except:
-                    # 回退到BeautifulSoup
-                    body = soup.find('body')
-                    if body:
-                        body_copy = BeautifulSoup(str(body), 'html.parser')
-                        for unwanted in body_copy.find_all(['script', 'style', 'nav', 'header', 'footer', 'aside', 'menu']):
-                            unwanted.decompose()
-                        body_content = body_copy.get_text(separator=' ', strip=True)
-                        if len(body_content) > len(content):
-                            content = body_content
-            
-            result = {
+        except DriverUnavailableError as e:
+            return {
                 'url': url,
-                'title': title_text,
-                'description': description,
-                'content': content,
                 'website_type': self.detect_website_type(url),
-                'method': 'selenium_webdriver',
-                'status_code': 200,  # Selenium不返回HTTP状态码
-                'success': bool(content and len(content) > 100)
+                'error': str(e),
+                'method': 'selenium',
+                'success': False
             }
-            
-            self.logger.debug(f"Selenium爬取完成: {url} - {'成功' if result['success'] else '失败'}")
-            return result
-            
         except Exception as e:
             self.logger.error(f"Selenium爬取失败 {url}: {e}")
             return {
@@ -209,12 +185,117 @@ class SeleniumScraper(BaseScraper):
                 'method': 'selenium_webdriver',
                 'success': False
             }
-        finally:
-            if driver:
-                try:
-                    driver.quit()
-                except:
-                    pass
+    
+    def wait_for_page(self, driver, url: str):
+        """等待页面就绪，返回 (就绪原因, 等待秒数)；轮询失败时直接提取当前页面"""
+        try:
+            ready_by, ready_wait = wait_until_ready(driver, self.READINESS)
+        except WebDriverException as e:
+            self.logger.warning(f"页面就绪检查失败，直接提取: {url} - {e}")
+            return 'error', 0.0
+        if ready_by == 'timeout':
+            self.logger.warning(f"页面加载超时: {url}")
+        return ready_by, ready_wait
+    
+    def scrape_page(self, driver, url: str) -> Dict:
+        """用租到的标签页打开页面并提取内容"""
+        # 清空上一个页面留下的网络日志，只统计本页面的请求
+        collect_network_stats(driver)
+        
+        # 导航到页面
+        driver.get(url)
+        
+        # 等待页面就绪：内容已出现时立即提取，不再固定等待
+        ready_by, ready_wait = self.wait_for_page(driver, url)
+        network = collect_network_stats(driver)
+        
+        # 获取页面源代码
+        page_source = driver.page_source
+        
+        # 使用BeautifulSoup解析
+        soup = make_soup(page_source, self.parser_backend)
+        
+        # 移除脚本和样式元素
+        for script in soup(["script", "style"]):
+            script.decompose()
+        
+        # 提取标题
+        title = soup.find('title')
+        title_text = title.get_text().strip() if title else ""
+        
+        # 提取meta描述
+        description = ""
+        meta_desc = soup.find('meta', attrs={'name': 'description'})
+        if meta_desc:
+            description = meta_desc.get('content', '')
+        
+        # 提取主要内容 - 使用多种选择器策略
+        content = ""
+        content_selector = None
+        
+        # 先在页面源码上一次遍历匹配全部选择器，只对匹配到的选择器向浏览器查询渲染后的文本；
+        # 该域名已学习到模板时先只查询模板选择器，模板是<body>时直接取body文本
+        template = self.templates.lookup(self.name, url) if self.templates else None
+        candidates = []
+        if template in self.CONTENT_SELECTORS.selectors:
+            element = soup.select_one(template)
+            if element is not None:
+                candidates.append((template, element))
+        if template != BODY_SELECTOR:
+            candidates = itertools.chain(candidates, self.CONTENT_SELECTORS.iter_matches(soup))
+        
+        tried = set()
+        for selector, element in candidates:
+            if selector in tried:
+                continue
+            tried.add(selector)
+            try:
+                elements = driver.find_elements(By.CSS_SELECTOR, selector)
+                content = elements[0].text if elements else get_text_excluding(element, NOISE_TAGS)
+            except Exception:
+                # 如果Selenium方法失败，回退到BeautifulSoup
+                content = get_text_excluding(element, NOISE_TAGS)
+            content_selector = selector
+            if len(content) > 200:
+                break
+        
+        # 如果还是没有找到内容，尝试body
+        if not content or len(content) < 200:
+            try:
+                # 先尝试Selenium获取body文本
+                body_element = driver.find_element(By.TAG_NAME, 'body')
+                body_content = body_element.text
+                if len(body_content) > len(content):
+                    content, content_selector = body_content, BODY_SELECTOR
+            except:
+                # 回退到BeautifulSoup
+                body = soup.find('body')
+                if body:
+                    body_content = get_text_excluding(body, BOILERPLATE_TAGS)
+                    if len(body_content) > len(content):
+                        content, content_selector = body_content, BODY_SELECTOR
+        
+        result = {
+            'url': url,
+            'title': title_text,
+            'description': description,
+            'content': content,
+            'website_type': self.detect_website_type(url),
+            'method': 'selenium_webdriver',
+            'status_code': 200,  # Selenium不返回HTTP状态码
+            'content_selector': content_selector,
+            'ready_by': ready_by,
+            'ready_wait': round(ready_wait, 2),
+            'blocked_requests': network['blocked'] if network else None,
+            'network': network,
+            'success': bool(content and len(content) > 100)
+        }
+        
+        if self.templates:
+            self.templates.record(self.name, url, template, content_selector, result['success'])
+        
+        self.logger.debug(f"Selenium爬取完成: {url} - {'成功' if result['success'] else '失败'}")
+        return result
     
     def scrape_url_with_thread(self, url_data):
         """在线程中爬取单个URL"""
@@ -222,7 +303,7 @@ class SeleniumScraper(BaseScraper):
         
         try:
             self.logger.info(f"线程 {threading.current_thread().name}: 处理URL {index}/{total} - {url}")
-            result = self.scrape_with_selenium(url)
+            result = self.scrape_url(url)
             
             with self.lock:
                 self.scraped_count += 1
@@ -250,28 +331,29 @@ class SeleniumScraper(BaseScraper):
         # 准备URL数据（带索引）
         url_data = [(url, i+1, len(urls)) for i, url in enumerate(urls)]
         
-        with ThreadPoolExecutor(max_workers=workers) as executor:
-            # 提交所有任务
-            future_to_url = {
-                executor.submit(self.scrape_url_with_thread, data): data[0] 
-                for data in url_data
-            }
-            
-            # 处理完成的任务
-            for future in as_completed(future_to_url):
-                url = future_to_url[future]
-                try:
-                    url, result = future.result()
-                    all_results[url] = result
-                except Exception as e:
-                    self.logger.error(f"处理 {url} 异常: {e}")
-                    all_results[url] = {
-                        'url': url,
-                        'website_type': 'unknown',
-                        'error': str(e),
-                        'method': 'selenium_webdriver',
-                        'success': False
-                    }
+        # 按主机调度：限制单个主机的并发和请求间隔，主机之间轮询
+        for data, future in self.host_scheduler.run(url_data, workers, self.scrape_url_with_thread):
+            url = data[0]
+            try:
+                url, result = future.result()
+                all_results[url] = result
+            except Exception as e:
+                self.logger.error(f"处理 {url} 异常: {e}")
+                all_results[url] = {
+                    'url': url,
+                    'website_type': 'unknown',
+                    'error': str(e),
+                    'method': 'selenium_webdriver',
+                    'success': False
+                }
+        
+        pool_stats = self.driver_pool.get_stats()
+        self.logger.info(f"浏览器池统计: 租用{pool_stats['leases']}次, 启动{pool_stats['created']}次, 复用{pool_stats['reused']}次, 新开标签页{pool_stats['tabs_opened']}个, 同时渲染最多{pool_stats['peak_tabs']}个, 按页面数回收{pool_stats['recycled_pages']}次, 按内存回收{pool_stats['recycled_memory']}次, 重置失败丢弃{pool_stats['discarded']}次")
+        self.driver_pool.shutdown()
+        
+        if self.hybrid:
+            render_stats = self.render_stats.get_stats()
+            self.logger.info(f"渲染判断统计: 静态{render_stats['static']}个, 浏览器{render_stats['browser']}个, 原因{render_stats['reasons']}, 抽样渲染{render_stats['audited']}个, 已评估{render_stats['judged']}个, 准确率{render_stats['accuracy']:.1%}, 多余渲染{render_stats['unnecessary_renders']}个, 漏判{render_stats['missed_renders']}个")
         
         self.logger.info(f"Selenium爬取完成，共处理{len(all_results)}个URL")
         return all_results
\ No newline at end of file
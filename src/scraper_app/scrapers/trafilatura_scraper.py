@@ -8,21 +8,124 @@ import os
 import json
 import time
 import datetime
+import copy
+import requests
 import trafilatura
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from trafilatura.utils import load_html
 import threading
 from typing import Dict, List
 from urllib.parse import urlparse
 
-from scraper_app.scrapers.base_scraper import BaseScraper
+from scraper_app.scrapers.base_scraper import BaseExtractor, BaseScraper
 from scraper_app.utils.logger import get_logger
+from scraper_app.utils.http_cache import get_http_cache
+from scraper_app.utils.transport import get_transport
+from scraper_app.utils.extraction_pool import FetchedPage
+
+class TrafilaturaExtractor(BaseExtractor):
+    """Trafilatura爬虫的静态提取"""
+    
+    def cache_version(self, url: str) -> str:
+        """提取语言由URL决定，不同语言的结果分开缓存"""
+        language = 'zh' if 'zh' in url or 'cn' in url else 'en'
+        return f"{super().cache_version(url)}:{language}"
+    
+    def extract(self, page: FetchedPage) -> Dict:
+        """从已下载的页面中提取内容
+        
+        页面只解析一次：严格提取和宽松提取各使用树的副本（提取过程会清理树），
+        元数据最后在原树上提取。timings 记录各阶段耗时（秒）。
+        """
+        timings = {}
+        
+        # 解析页面（包括编码探测），只做一次
+        started = time.perf_counter()
+        tree = load_html(page.content)
+        timings['parse'] = time.perf_counter() - started
+        
+        # 使用Trafilatura提取内容
+        started = time.perf_counter()
+        result = None
+        if tree is not None:
+            # 中文内容按中文提取，其余按英文提取
+            target_language = 'zh' if 'zh' in page.url or 'cn' in page.url else 'en'
+            result = trafilatura.extract(copy.deepcopy(tree), url=page.url, target_language=target_language, include_comments=False, include_tables=False, include_images=False)
+        timings['strict'] = time.perf_counter() - started
+        
+        if not result:
+            return {
+                'url': page.url,
+                'website_type': self.detect_website_type(page.url),
+                'error': 'No meaningful content extracted',
+                'method': 'trafilatura',
+                'timings': self._round_timings(timings),
+                'success': False
+            }
+        
+        # 解析提取的内容
+        title = ""
+        description = ""
+        content = ""
+        
+        if result:
+            lines = result.split('\n')
+            if lines:
+                title = lines[0].strip() if lines[0].strip() else ""
+                if len(lines) > 1:
+                    # 假设第二行可能是简短描述
+                    potential_desc = lines[1].strip()
+                    if len(potential_desc) < 200 and len(potential_desc) > 10:
+                        description = potential_desc
+                # 剩余内容作为正文
+                content = '\n'.join(lines[1:]).strip()
+        
+        # 如果内容太短，尝试其他提取方法
+        if len(content) < 100:
+            # 使用更宽松的提取参数
+            started = time.perf_counter()
+            loose_result = trafilatura.extract(copy.deepcopy(tree), url=page.url, include_comments=True, include_tables=True)
+            timings['loose'] = time.perf_counter() - started
+            if loose_result and len(loose_result) > len(content):
+                content = loose_result
+        
+        # 使用Trafilatura提取元数据（同一棵树，不再重新解析）
+        started = time.perf_counter()
+        metadata = trafilatura.extract_metadata(tree)
+        timings['metadata'] = time.perf_counter() - started
+        
+        return {
+            'url': page.url,
+            'title': title,
+            'description': description,
+            'content': content,
+            'website_type': self.detect_website_type(page.url),
+            'method': 'trafilatura',
+            'metadata': {
+                'author': metadata.author if metadata else None,
+                'date': metadata.date if metadata else None,
+                'sitename': metadata.sitename if metadata else None,
+                'title_meta': metadata.title if metadata else None,
+            },
+            'timings': self._round_timings(timings),
+            'success': bool(content and len(content) > 100)
+        }
+    
+    @staticmethod
+    def _round_timings(timings: Dict[str, float]) -> Dict[str, float]:
+        return {stage: round(seconds, 4) for stage, seconds in timings.items()}
 
 class TrafilaturaScraper(BaseScraper):
     """Trafilatura爬虫"""
     
+    # 静态提取器，可在解析进程中独立创建
+    EXTRACTOR = TrafilaturaExtractor
+    
     def __init__(self):
         super().__init__("trafilatura")
         self.logger = get_logger(__name__)
+        self.transport = get_transport()
+        self.session = self.transport.create_session()
+        self.http_cache = get_http_cache()
         self.lock = threading.Lock()
         self.scraped_count = 0
     
@@ -35,8 +138,14 @@ class TrafilaturaScraper(BaseScraper):
         try:
             self.logger.debug(f"开始使用Trafilatura爬取: {url}")
             
-            # 下载页面内容
-            downloaded = trafilatura.fetch_url(url)
+            # 下载页面内容（经过共享HTTP缓存）
+            try:
+                response = self.http_cache.fetch(self.session, url, timeout=self.transport.timeout)
+                response.raise_for_status()
+                downloaded = response.content
+            except requests.RequestException as e:
+                self.logger.debug(f"下载失败 {url}: {e}")
+                downloaded = None
             if not downloaded:
                 return {
                     'url': url,
@@ -46,65 +155,8 @@ class TrafilaturaScraper(BaseScraper):
                     'success': False
                 }
             
-            # 使用Trafilatura提取内容
-            if 'zh' in url or 'cn' in url:
-                # 中文内容
-                result = trafilatura.extract(downloaded, url=url, target_language='zh', include_comments=False, include_tables=False, include_images=False)
-            else:
-                # 英文内容
-                result = trafilatura.extract(downloaded, url=url, target_language='en', include_comments=False, include_tables=False, include_images=False)
-            
-            if not result:
-                return {
-                    'url': url,
-                    'website_type': self.detect_website_type(url),
-                    'error': 'No meaningful content extracted',
-                    'method': 'trafilatura',
-                    'success': False
-                }
-            
-            # 使用Trafilatura提取元数据
-            metadata = trafilatura.extract_metadata(downloaded)
-            
-            # 解析提取的内容
-            title = ""
-            description = ""
-            content = ""
-            
-            if result:
-                lines = result.split('\n')
-                if lines:
-                    title = lines[0].strip() if lines[0].strip() else ""
-                    if len(lines) > 1:
-                        # 假设第二行可能是简短描述
-                        potential_desc = lines[1].strip()
-                        if len(potential_desc) < 200 and len(potential_desc) > 10:
-                            description = potential_desc
-                    # 剩余内容作为正文
-                    content = '\n'.join(lines[1:]).strip()
-            
-            # 如果内容太短，尝试其他提取方法
-            if len(content) < 100:
-                # 使用更宽松的提取参数
-                loose_result = trafilatura.extract(downloaded, url=url, include_comments=True, include_tables=True)
-                if loose_result and len(loose_result) > len(content):
-                    content = loose_result
-            
-            final_result = {
-                'url': url,
-                'title': title,
-                'description': description,
-                'content': content,
-                'website_type': self.detect_website_type(url),
-                'method': 'trafilatura',
-                'metadata': {
-                    'author': metadata.author if metadata else None,
-                    'date': metadata.date if metadata else None,
-                    'sitename': metadata.sitename if metadata else None,
-                    'title_meta': metadata.title if metadata else None,
-                },
-                'success': bool(content and len(content) > 100)
-            }
+            # 解析在进程池中进行，下载线程只等待结果
+            final_result = self.run_extraction(url, response)
             
             self.logger.debug(f"Trafilatura爬取完成: {url} - {'成功' if final_result['success'] else '失败'}")
             return final_result
@@ -153,28 +205,21 @@ class TrafilaturaScraper(BaseScraper):
         # 准备URL数据（带索引）
         url_data = [(url, i+1, len(urls)) for i, url in enumerate(urls)]
         
-        with ThreadPoolExecutor(max_workers=workers) as executor:
-            # 提交所有任务
-            future_to_url = {
-                executor.submit(self.scrape_url_with_thread, data): data[0] 
-                for data in url_data
-            }
-            
-            # 处理完成的任务
-            for future in as_completed(future_to_url):
-                url = future_to_url[future]
-                try:
-                    url, result = future.result()
-                    all_results[url] = result
-                except Exception as e:
-                    self.logger.error(f"处理 {url} 异常: {e}")
-                    all_results[url] = {
-                        'url': url,
-                        'website_type': 'unknown',
-                        'error': str(e),
-                        'method': 'trafilatura',
-                        'success': False
-                    }
+        # 按主机调度：限制单个主机的并发和请求间隔，主机之间轮询
+        for data, future in self.host_scheduler.run(url_data, workers, self.scrape_url_with_thread):
+            url = data[0]
+            try:
+                url, result = future.result()
+                all_results[url] = result
+            except Exception as e:
+                self.logger.error(f"处理 {url} 异常: {e}")
+                all_results[url] = {
+                    'url': url,
+                    'website_type': 'unknown',
+                    'error': str(e),
+                    'method': 'trafilatura',
+                    'success': False
+                }
         
         self.logger.info(f"Trafilatura爬取完成，共处理{len(all_results)}个URL")
         return all_results
\ No newline at end of file
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Chrome驱动创建 - 浏览器类爬虫共用的启动选项、标签页设置和驱动池
+
+启动选项、资源拦截和多标签页设置按爬虫名读取配置（BLOCK_RESOURCE_TYPES_<爬虫名> 等）。
+"""
+
+import os
+from typing import Callable
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+
+from scraper_app.utils.config import Config
+from scraper_app.utils.driver_pool import DriverPool
+from scraper_app.utils.logger import get_logger
+from scraper_app.utils.readiness import install_readiness_hooks
+from scraper_app.utils.resource_blocking import blocked_url_patterns, configure_blocking_options, enable_resource_blocking
+
+logger = get_logger(__name__)
+
+# 尝试不同的Chrome/Chromium二进制文件位置
+CHROMIUM_PATHS = [
+    '/usr/bin/chromium',
+    '/usr/bin/chromium-browser',
+    '/usr/bin/google-chrome',
+    '/usr/bin/google-chrome-stable'
+]
+
+def create_chrome_driver(scraper_name: str, user_agent: str):
+    """创建并返回Selenium Chrome/Chromium驱动，创建失败时返回None"""
+    try:
+        chrome_options = Options()
+        chrome_options.add_argument('--headless')
+        chrome_options.add_argument('--no-sandbox')
+        chrome_options.add_argument('--disable-dev-shm-usage')
+        chrome_options.add_argument('--disable-gpu')
+        chrome_options.add_argument('--disable-extensions')
+        chrome_options.add_argument(f'user-agent={user_agent}')
+
+        # Chrome已不支持 --disable-images 等参数，图片、字体、媒体和统计/广告域名改由CDP拦截
+        configure_blocking_options(chrome_options, Config.blocked_resource_types(scraper_name))
+
+        # 同一浏览器中同时渲染多个标签页：导航不等待加载完成（由就绪检查等待），后台标签页不降频
+        if Config.SELENIUM_TABS_PER_BROWSER > 1:
+            chrome_options.page_load_strategy = 'none'
+            chrome_options.add_argument('--disable-background-timer-throttling')
+            chrome_options.add_argument('--disable-backgrounding-occluded-windows')
+            chrome_options.add_argument('--disable-renderer-backgrounding')
+
+        for path in CHROMIUM_PATHS:
+            if os.path.exists(path):
+                chrome_options.binary_location = path
+                break
+
+        driver = webdriver.Chrome(options=chrome_options)
+        setup_tab(driver, scraper_name)
+        return driver
+
+    except Exception as e:
+        logger.error(f"[{scraper_name}] 创建Selenium驱动失败: {e}")
+        return None
+
+def setup_tab(driver, scraper_name: str):
+    """为当前标签页安装就绪统计脚本并启用资源拦截（这些CDP设置只对所在标签页生效）"""
+    install_readiness_hooks(driver)
+    patterns = blocked_url_patterns(Config.blocked_resource_types(scraper_name), Config.blocked_domains(scraper_name))
+    if not enable_resource_blocking(driver, patterns):
+        logger.warning(f"[{scraper_name}] 浏览器不支持CDP，无法拦截资源")
+
+def create_driver_pool(scraper_name: str, user_agent: Callable[[], str]) -> DriverPool:
+    """按Selenium池配置创建驱动池；每个新浏览器使用 user_agent() 返回的User-Agent"""
+    return DriverPool(
+        factory=lambda: create_chrome_driver(scraper_name, user_agent()),
+        size=Config.SELENIUM_POOL_SIZE,
+        max_pages=Config.SELENIUM_MAX_PAGES_PER_DRIVER,
+        max_rss_mb=Config.SELENIUM_MAX_RSS_MB,
+        lease_timeout=Config.SELENIUM_LEASE_TIMEOUT,
+        tabs_per_browser=Config.SELENIUM_TABS_PER_BROWSER,
+        tab_setup=lambda driver: setup_tab(driver, scraper_name)
+    )
@@ -28,12 +28,105 @@ class Config:
     DEFAULT_WORKERS = int(os.getenv("DEFAULT_WORKERS", "5"))
     DEFAULT_TIMEOUT = int(os.getenv("DEFAULT_TIMEOUT", "30"))
     
+    # 主机调度配置（礼貌爬取）
+    HOST_MAX_CONCURRENCY = int(os.getenv("HOST_MAX_CONCURRENCY", "2"))
+    HOST_MIN_DELAY = float(os.getenv("HOST_MIN_DELAY", "0.5"))
+    
+    # 传输层配置（所有爬虫共享连接池）
+    TRANSPORT_POOL_MAXSIZE = int(os.getenv("TRANSPORT_POOL_MAXSIZE", str(DEFAULT_WORKERS)))  # 每个主机的连接数
+    TRANSPORT_POOL_HOSTS = int(os.getenv("TRANSPORT_POOL_HOSTS", "100"))  # 缓存连接池的主机数
+    TRANSPORT_RETRIES = int(os.getenv("TRANSPORT_RETRIES", "2"))
+    TRANSPORT_MAX_RETRY_AFTER = float(os.getenv("TRANSPORT_MAX_RETRY_AFTER", "5"))  # 按Retry-After等待的上限（秒）
+    CONNECT_TIMEOUT = float(os.getenv("CONNECT_TIMEOUT", "10"))
+    READ_TIMEOUT = float(os.getenv("READ_TIMEOUT", str(DEFAULT_TIMEOUT)))
+    DNS_CACHE_TTL = float(os.getenv("DNS_CACHE_TTL", "300"))  # 0表示不缓存
+    DNS_CACHE_MAX_ENTRIES = int(os.getenv("DNS_CACHE_MAX_ENTRIES", "1000"))  # 缓存的主机数上限，超过时淘汰最久未用的
+    
+    # 下载限制配置（流式读取，超过上限即停止）
+    MAX_CONTENT_BYTES = int(os.getenv("MAX_CONTENT_BYTES", str(5 * 1024 * 1024)))
+    DOWNLOAD_CHUNK_SIZE = int(os.getenv("DOWNLOAD_CHUNK_SIZE", str(64 * 1024)))
+    ALLOWED_CONTENT_TYPES = [
+        t.strip().lower() for t in
+        os.getenv("ALLOWED_CONTENT_TYPES", "text/html,application/xhtml+xml,text/plain").split(",") if t.strip()
+    ]
+    
+    # 解析进程池配置（下载线程只负责I/O，HTML提取在独立进程中执行）
+    EXTRACT_PROCESSES = int(os.getenv("EXTRACT_PROCESSES", str(os.cpu_count() or 1)))  # 0表示在下载线程中直接提取
+    EXTRACT_QUEUE_SIZE = int(os.getenv("EXTRACT_QUEUE_SIZE", str(EXTRACT_PROCESSES * 2 or 1)))  # 排队任务上限，超过时下载线程等待
+    EXTRACT_START_METHOD = os.getenv("EXTRACT_START_METHOD", "spawn")
+    
+    # 提取结果缓存配置（按页面内容哈希缓存，本地LRU + 可选Redis）
+    EXTRACTION_CACHE_MAX_ENTRIES = int(os.getenv("EXTRACTION_CACHE_MAX_ENTRIES", "2000"))  # 0表示不使用本地缓存
+    EXTRACTION_CACHE_REDIS_URL = os.getenv("EXTRACTION_CACHE_REDIS_URL", "")  # 例如 redis://localhost:6379/0，为空时不使用Redis
+    EXTRACTION_CACHE_TTL = int(os.getenv("EXTRACTION_CACHE_TTL", str(7 * 24 * 3600)))  # Redis条目保留时间（秒）
+    
+    # HTML解析后端（默认html.parser，lxml需显式开启），可用 PARSER_BACKEND_<爬虫名> 单独指定
+    PARSER_BACKEND = os.getenv("PARSER_BACKEND", "html.parser")
+    
+    # 域名提取模板配置（记录各域名被采用的内容选择器，后续页面先尝试该选择器）
+    TEMPLATES_ENABLED = os.getenv("TEMPLATES_ENABLED", "true").lower() == "true"
+    TEMPLATE_FILE = Path(os.getenv("TEMPLATE_FILE", str(DATA_DIR / "templates" / "selector_templates.json")))
+    TEMPLATE_WINDOW = int(os.getenv("TEMPLATE_WINDOW", "20"))  # 计算命中率的最近使用次数
+    TEMPLATE_MIN_SAMPLES = int(os.getenv("TEMPLATE_MIN_SAMPLES", "5"))
+    TEMPLATE_MIN_SUCCESS_RATE = float(os.getenv("TEMPLATE_MIN_SUCCESS_RATE", "0.7"))  # 低于该命中率时模板失效
+    
+    # Selenium驱动池配置（复用已启动的浏览器，每个URL使用其中一个标签页，按页面数或内存回收）
+    SELENIUM_POOL_SIZE = int(os.getenv("SELENIUM_POOL_SIZE", "3"))  # 同时存在的浏览器上限
+    SELENIUM_TABS_PER_BROWSER = int(os.getenv("SELENIUM_TABS_PER_BROWSER", "4"))  # 每个浏览器同时渲染的标签页上限
+    SELENIUM_MAX_PAGES_PER_DRIVER = int(os.getenv("SELENIUM_MAX_PAGES_PER_DRIVER", "50"))  # 0表示不按页面数回收
+    SELENIUM_MAX_RSS_MB = int(os.getenv("SELENIUM_MAX_RSS_MB", "1024"))  # 浏览器进程树内存上限，0表示不检查
+    SELENIUM_LEASE_TIMEOUT = float(os.getenv("SELENIUM_LEASE_TIMEOUT", "120"))  # 等待空闲浏览器的最长时间（秒）
+    
+    # Selenium混合模式（先静态获取，只有JS外壳页面才用浏览器渲染）
+    SELENIUM_HYBRID_ENABLED = os.getenv("SELENIUM_HYBRID_ENABLED", "true").lower() == "true"
+    SELENIUM_HYBRID_MIN_TEXT = int(os.getenv("SELENIUM_HYBRID_MIN_TEXT", "200"))  # 静态页面文本少于该长度时需要渲染
+    SELENIUM_HYBRID_AUDIT_RATE = float(os.getenv("SELENIUM_HYBRID_AUDIT_RATE", "0.05"))  # 留在静态的页面再渲染评估的比例
+    
+    # 浏览器页面就绪等待配置（内容选择器出现，或网络空闲且DOM稳定时立即返回）
+    READINESS_TIMEOUT = float(os.getenv("READINESS_TIMEOUT", "10"))  # 最长等待时间（秒）
+    READINESS_QUIET_MS = int(os.getenv("READINESS_QUIET_MS", "500"))  # DOM无变化的时长
+    READINESS_NETWORK_IDLE_MS = int(os.getenv("READINESS_NETWORK_IDLE_MS", "500"))  # 无网络请求的时长
+    READINESS_POLL_INTERVAL = float(os.getenv("READINESS_POLL_INTERVAL", "0.1"))
+    
+    # 浏览器资源拦截配置（通过CDP拦截，可用 BLOCK_RESOURCE_TYPES_<爬虫名> / BLOCK_DOMAINS_<爬虫名> 单独指定）
+    BLOCK_RESOURCE_TYPES = os.getenv("BLOCK_RESOURCE_TYPES", "image,font,media")  # 可选 image / font / media / stylesheet
+    BLOCK_DOMAINS = os.getenv("BLOCK_DOMAINS", ",".join([
+        "google-analytics.com", "googletagmanager.com", "googlesyndication.com", "doubleclick.net",
+        "googleadservices.com", "facebook.net", "hm.baidu.com", "cnzz.com", "51.la", "umeng.com",
+        "growingio.com", "sensorsdata.cn", "hotjar.com", "scorecardresearch.com",
+    ]))  # 统计和广告域名，包括其子域名
+    
+    # Readability配置：结果中是否保留正文HTML（content_html），可用 --readability-html 单次打开
+    READABILITY_INCLUDE_HTML = os.getenv("READABILITY_INCLUDE_HTML", "false").lower() == "true"
+    
+    # HTTP响应缓存配置
+    HTTP_CACHE_ENABLED = os.getenv("HTTP_CACHE_ENABLED", "true").lower() == "true"
+    HTTP_CACHE_DIR = Path(os.getenv("HTTP_CACHE_DIR", str(DATA_DIR / "cache" / "http")))
+    HTTP_CACHE_MAX_MB = int(os.getenv("HTTP_CACHE_MAX_MB", "512"))
+    
     # User Agent
     DEFAULT_USER_AGENT = (
         "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
         "(KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
     )
     
+    @classmethod
+    def parser_backend(cls, scraper_name: str) -> str:
+        """获取指定爬虫使用的HTML解析后端"""
+        return os.getenv(f"PARSER_BACKEND_{scraper_name.upper()}", cls.PARSER_BACKEND)
+    
+    @classmethod
+    def blocked_resource_types(cls, scraper_name: str) -> list:
+        """获取指定爬虫在浏览器中拦截的资源类型"""
+        value = os.getenv(f"BLOCK_RESOURCE_TYPES_{scraper_name.upper()}", cls.BLOCK_RESOURCE_TYPES)
+        return [t.strip().lower() for t in value.split(",") if t.strip()]
+    
+    @classmethod
+    def blocked_domains(cls, scraper_name: str) -> list:
+        """获取指定爬虫在浏览器中拦截的域名"""
+        value = os.getenv(f"BLOCK_DOMAINS_{scraper_name.upper()}", cls.BLOCK_DOMAINS)
+        return [d.strip().lower() for d in value.split(",") if d.strip()]
+    
     @classmethod
     def ensure_directories(cls):
         """确保必要的目录存在"""
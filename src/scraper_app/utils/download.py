@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+流式下载 - 读取正文前检查内容类型，按字节上限截断，限制每个线程的内存占用
+"""
+
+from typing import Optional
+
+import requests
+
+from scraper_app.utils.config import Config
+from scraper_app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+class ContentRejectedError(requests.RequestException):
+    """响应不是可提取的页面（如PDF、视频），在读取正文前放弃"""
+
+def check_content_type(response: requests.Response):
+    """根据Content-Type决定是否读取正文，未声明类型时放行"""
+    mime = response.headers.get('Content-Type', '').split(';', 1)[0].strip().lower()
+    if mime and mime not in Config.ALLOWED_CONTENT_TYPES:
+        raise ContentRejectedError(f"不支持的内容类型: {mime}", response=response)
+
+def declared_charset(response: requests.Response) -> Optional[str]:
+    """返回Content-Type头中声明的字符集；未声明时返回None（不使用requests按类型推断的默认值）"""
+    for param in response.headers.get('Content-Type', '').split(';')[1:]:
+        name, _, value = param.strip().partition('=')
+        if name.strip().lower() == 'charset' and value.strip(' "\''):
+            return value.strip(' "\'')
+    return None
+
+def read_limited(url: str, response: requests.Response) -> requests.Response:
+    """读取以stream=True发出的响应正文，最多读取 MAX_CONTENT_BYTES 字节
+
+    读取后连接即关闭，response.content 为（可能被截断的）正文，
+    被截断时 response.truncated 为True。
+    """
+    try:
+        if response.ok:
+            check_content_type(response)
+
+        buffer = bytearray()
+        truncated = False
+        for chunk in response.iter_content(chunk_size=Config.DOWNLOAD_CHUNK_SIZE):
+            remaining = Config.MAX_CONTENT_BYTES - len(buffer)
+            buffer.extend(chunk[:remaining])
+            if len(buffer) >= Config.MAX_CONTENT_BYTES:
+                truncated = True
+                logger.warning(f"页面超过{Config.MAX_CONTENT_BYTES}字节，已截断: {url}")
+                break
+    finally:
+        response.close()
+
+    response._content = bytes(buffer)
+    response.truncated = truncated
+    return response
@@ -0,0 +1,398 @@
+#!/usr/bin/env python3
+"""
+WebDriver池 - 复用已启动的浏览器，每个URL租用其中一个标签页，用完重置后归还
+
+一个浏览器进程可以同时打开多个标签页渲染不同的URL，比每个并发URL启动一个浏览器节省大量内存。
+"""
+
+import os
+import json
+import time
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional
+
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.remote.webelement import WebElement
+
+from scraper_app.utils.logger import get_logger
+
+# 清空当前页面所在源的 localStorage / sessionStorage
+CLEAR_STORAGE_SCRIPT = (
+    "try { window.localStorage.clear(); } catch (e) {}"
+    "try { window.sessionStorage.clear(); } catch (e) {}"
+)
+
+class DriverUnavailableError(Exception):
+    """无法在限定时间内租到标签页，或浏览器创建失败"""
+
+def process_tree_rss(pid: int) -> int:
+    """从/proc读取进程及其全部子孙进程的常驻内存（字节），不支持/proc的系统返回0"""
+    children: Dict[int, List[int]] = {}
+    try:
+        entries = os.listdir('/proc')
+    except OSError:
+        return 0
+    for entry in entries:
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat', 'rb') as f:
+                # 第2个字段（进程名）可能含空格，从最后一个')'之后开始解析
+                fields = f.read().rsplit(b')', 1)[1].split()
+            children.setdefault(int(fields[1]), []).append(int(entry))
+        except (OSError, IndexError, ValueError):
+            continue
+
+    total, stack = 0, [pid]
+    while stack:
+        current = stack.pop()
+        stack.extend(children.get(current, ()))
+        try:
+            with open(f'/proc/{current}/status', 'r') as f:
+                for line in f:
+                    if line.startswith('VmRSS:'):
+                        total += int(line.split()[1]) * 1024
+                        break
+        except (OSError, ValueError):
+            continue
+    return total
+
+class PooledDriver:
+    """池中的浏览器及其标签页"""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.pages = 0
+        self.active = 0  # 使用中的标签页数
+        self.retiring = False  # 需要回收，不再分配新标签页
+        self.current = driver.current_window_handle  # 会话当前操作的窗口
+        self.tabs = {self.current}  # 池创建的全部标签页
+        self.idle_tabs: List[str] = [self.current]
+        self.network_log: Dict[str, List[Dict]] = {}  # 按标签页分拣的性能日志
+        self.lock = threading.RLock()  # 同一浏览器上的WebDriver命令逐个执行
+
+    @property
+    def pid(self) -> Optional[int]:
+        """chromedriver进程号，浏览器进程是它的子进程"""
+        service = getattr(self.driver, 'service', None)
+        process = getattr(service, 'process', None)
+        return getattr(process, 'pid', None)
+
+def _webview_of(entry: Dict) -> Optional[str]:
+    """性能日志条目所属的标签页（DevTools目标ID）"""
+    try:
+        return json.loads(entry['message']).get('webview')
+    except (KeyError, TypeError, ValueError):
+        return None
+
+def _target_id(handle: str) -> str:
+    """窗口句柄对应的DevTools目标ID（旧版chromedriver的句柄带 CDwindow- 前缀）"""
+    return handle[len('CDwindow-'):] if handle.startswith('CDwindow-') else handle
+
+def _tab_attr(tab: 'TabDriver', target, name: str):
+    """在浏览器锁内切换到标签页后读取 target 的属性；方法在调用时同样先切换"""
+    with tab._pooled.lock:
+        tab._activate()
+        value = getattr(target, name)
+    if not callable(value):
+        return tab._wrap(value)
+
+    def command(*args, **kwargs):
+        args = [arg._element if isinstance(arg, _TabElement) else arg for arg in args]
+        with tab._pooled.lock:
+            tab._activate()
+            return tab._wrap(value(*args, **kwargs))
+    return command
+
+class _TabElement:
+    """标签页中的元素，读取属性和调用方法前先切换到所在标签页"""
+
+    def __init__(self, tab: 'TabDriver', element: WebElement):
+        self._tab = tab
+        self._element = element
+
+    def __getattr__(self, name):
+        return _tab_attr(self._tab, self._element, name)
+
+class TabDriver:
+    """浏览器中一个标签页的驱动视图，用法与WebDriver相同（不要在其上切换窗口）
+
+    WebDriver会话同一时间只能操作一个窗口，因此每个命令都在浏览器锁内先切换到本标签页再执行，
+    返回的元素同样如此。命令本身是串行的，页面加载、脚本执行和等待在各标签页中并行进行。
+    """
+
+    def __init__(self, pooled: PooledDriver, handle: str):
+        self._pooled = pooled
+        self._handle = handle
+
+    @property
+    def window_handle(self) -> str:
+        return self._handle
+
+    def _activate(self):
+        if self._pooled.current != self._handle:
+            self._pooled.driver.switch_to.window(self._handle)
+            self._pooled.current = self._handle
+
+    def _wrap(self, value):
+        if isinstance(value, WebElement):
+            return _TabElement(self, value)
+        if isinstance(value, list) and value and all(isinstance(item, WebElement) for item in value):
+            return [_TabElement(self, item) for item in value]
+        return value
+
+    def __getattr__(self, name):
+        return _tab_attr(self, self._pooled.driver, name)
+
+    def get_log(self, log_type: str):
+        """读取日志；性能日志由浏览器的所有标签页共用，读出后按标签页分拣，只返回本标签页的条目"""
+        if log_type != 'performance':
+            return _tab_attr(self, self._pooled.driver, 'get_log')(log_type)
+        with self._pooled.lock:
+            for entry in self._pooled.driver.get_log('performance'):
+                self._pooled.network_log.setdefault(_webview_of(entry), []).append(entry)
+            return self._pooled.network_log.pop(_target_id(self._handle), [])
+
+class DriverPool:
+    """有界、线程安全的浏览器池，按标签页租用
+
+    - 同时存在的浏览器最多 size 个，每个浏览器同时最多 tabs_per_browser 个标签页；租用时选择
+      仍有空位且使用中标签页最少的浏览器，都满时才启动新浏览器，全部占满时等待 lease_timeout 秒
+    - 浏览器启动时的第一个标签页之外，每个标签页都在独立的浏览器上下文（CDP Target.createBrowserContext）中，
+      Cookie和存储互不共享；浏览器不支持时每个浏览器只使用一个标签页，不让并发的页面共享Cookie
+    - 新标签页创建后调用 tab_setup(driver)，用于安装按标签页生效的CDP设置
+    - 归还时清空该标签页所在上下文的Cookie和当前源的存储并回到 about:blank，标签页留给下一个URL；
+      浏览器上没有其他使用中的标签页时再关闭页面自行打开的窗口
+    - 浏览器服务满 max_pages 个页面，或进程树内存超过 max_rss_mb 时不再分配标签页，最后一个标签页
+      归还后退出；重置失败（如浏览器已崩溃）的浏览器同样退出
+    """
+
+    def __init__(self, factory: Callable[[], Optional[object]], size: int, max_pages: int,
+                 max_rss_mb: int, lease_timeout: float, tabs_per_browser: int = 1,
+                 tab_setup: Optional[Callable[[object], None]] = None):
+        self.logger = get_logger(__name__)
+        self.factory = factory
+        self.size = max(1, size)
+        self.tabs_per_browser = max(1, tabs_per_browser)
+        self.tab_cap = self.tabs_per_browser  # 不支持独立上下文时降为1
+        self.tab_setup = tab_setup
+        self.max_pages = max_pages
+        self.max_rss_bytes = max_rss_mb * 1024 * 1024
+        self.lease_timeout = lease_timeout
+        self._browsers: List[PooledDriver] = []
+        self._creating = 0
+        self.lock = threading.Lock()
+        self.cond = threading.Condition(self.lock)
+        self.stats = {'leases': 0, 'created': 0, 'reused': 0, 'tabs_opened': 0, 'peak_tabs': 0,
+                      'recycled_pages': 0, 'recycled_memory': 0, 'discarded': 0, 'create_failures': 0}
+
+    def _count(self, key: str):
+        with self.lock:
+            self.stats[key] += 1
+
+    def _create(self) -> PooledDriver:
+        start_time = time.time()
+        driver = self.factory()
+        if driver is None:
+            self._count('create_failures')
+            raise DriverUnavailableError('Failed to create Selenium driver')
+        try:
+            pooled = PooledDriver(driver)
+        except WebDriverException as e:
+            self._count('create_failures')
+            self._quit_driver(driver)
+            raise DriverUnavailableError(f'Failed to create Selenium driver: {e}')
+        self._count('created')
+        self.logger.debug(f"浏览器已启动，耗时{time.time() - start_time:.2f}秒")
+        return pooled
+
+    def _pick(self) -> Optional[PooledDriver]:
+        """有空位且使用中标签页最少的浏览器"""
+        candidates = [b for b in self._browsers if not b.retiring and b.active < self.tab_cap]
+        return min(candidates, key=lambda b: b.active) if candidates else None
+
+    def _assign(self, pooled: PooledDriver):
+        pooled.active += 1
+        pooled.pages += 1
+        self.stats['leases'] += 1
+        self.stats['peak_tabs'] = max(self.stats['peak_tabs'], sum(b.active for b in self._browsers))
+
+    def _acquire(self) -> PooledDriver:
+        """占用一个浏览器中的标签页名额，必要时启动新浏览器"""
+        deadline = time.monotonic() + self.lease_timeout
+        with self.cond:
+            while True:
+                pooled = self._pick()
+                if pooled is not None:
+                    self.stats['reused'] += 1
+                    self._assign(pooled)
+                    return pooled
+                if len(self._browsers) + self._creating < self.size:
+                    self._creating += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise DriverUnavailableError(f"{self.lease_timeout}秒内没有空闲的浏览器标签页")
+                self.cond.wait(remaining)
+
+        try:
+            pooled = self._create()
+        finally:
+            with self.cond:
+                self._creating -= 1
+                self.cond.notify_all()
+        with self.cond:
+            self._browsers.append(pooled)
+            self._assign(pooled)
+            self.cond.notify_all()
+        return pooled
+
+    def _open_tab(self, pooled: PooledDriver) -> Optional[TabDriver]:
+        """取浏览器中空闲的标签页，没有时新开一个；不支持独立上下文时返回None"""
+        with pooled.lock:
+            if pooled.idle_tabs:
+                return TabDriver(pooled, pooled.idle_tabs.pop())
+            driver = pooled.driver
+            try:
+                handle = self.open_isolated_tab(driver)
+            except (AttributeError, KeyError, TypeError, WebDriverException) as e:
+                self._disable_tabs(e)
+                return None
+            pooled.current = handle
+            pooled.tabs.add(handle)
+            if self.tab_setup:
+                self.tab_setup(driver)
+        self._count('tabs_opened')
+        return TabDriver(pooled, handle)
+
+    @staticmethod
+    def open_isolated_tab(driver) -> str:
+        """在新的浏览器上下文中打开空白标签页并切换过去，返回窗口句柄（即DevTools目标ID）"""
+        context = driver.execute_cdp_cmd('Target.createBrowserContext', {})['browserContextId']
+        target = driver.execute_cdp_cmd('Target.createTarget', {'url': 'about:blank', 'browserContextId': context})
+        driver.switch_to.window(target['targetId'])
+        return target['targetId']
+
+    def _disable_tabs(self, error: Exception):
+        """浏览器不支持独立上下文时，之后每个浏览器只使用一个标签页"""
+        with self.lock:
+            if self.tab_cap == 1:
+                return
+            self.tab_cap = 1
+        self.logger.warning(f"无法为标签页创建独立的浏览器上下文，改为每个浏览器一个标签页: {error}")
+
+    @contextmanager
+    def lease(self) -> Iterator[TabDriver]:
+        """租用一个标签页，with块结束时重置并归还"""
+        while True:
+            pooled = self._acquire()
+            try:
+                tab = self._open_tab(pooled)
+            except BaseException:
+                self._release(pooled, None)
+                raise
+            if tab is not None:
+                break
+            # 该浏览器无法再开独立的标签页（每个浏览器已降为一个标签页），重新选择浏览器
+            self._unassign(pooled)
+
+        try:
+            yield tab
+        finally:
+            self._release(pooled, tab)
+
+    def _unassign(self, pooled: PooledDriver):
+        with self.cond:
+            pooled.active -= 1
+            pooled.pages -= 1
+            self.cond.notify_all()
+
+    def _release(self, pooled: PooledDriver, tab: Optional[TabDriver]):
+        """重置标签页后放回浏览器；浏览器需要回收且没有使用中的标签页时退出"""
+        healthy = tab is not None
+        if tab is not None:
+            try:
+                with pooled.lock:
+                    self.reset(tab)
+                    with self.lock:
+                        last = pooled.active == 1
+                    if last:
+                        self.reset_browser(pooled, tab.window_handle)
+                    pooled.idle_tabs.append(tab.window_handle)
+            except Exception as e:
+                healthy = False
+                self.logger.warning(f"重置浏览器失败，丢弃: {e}")
+
+        rss = 0
+        if healthy and not pooled.retiring and self.max_rss_bytes and pooled.pid:
+            rss = process_tree_rss(pooled.pid)
+
+        with self.cond:
+            pooled.active -= 1
+            if not pooled.retiring:
+                if not healthy:
+                    pooled.retiring = True
+                    self.stats['discarded'] += 1
+                elif self.max_pages and pooled.pages >= self.max_pages:
+                    pooled.retiring = True
+                    self.stats['recycled_pages'] += 1
+                    self.logger.debug(f"浏览器已服务{pooled.pages}个页面，回收")
+                elif rss > self.max_rss_bytes:
+                    pooled.retiring = True
+                    self.stats['recycled_memory'] += 1
+                    self.logger.info(f"浏览器内存{rss / 1024 / 1024:.0f}MB超过上限，回收")
+            retire = pooled.retiring and pooled.active == 0
+            if retire:
+                self._browsers.remove(pooled)
+            self.cond.notify_all()
+
+        if retire:
+            self._quit_driver(pooled.driver)
+
+    @staticmethod
+    def reset(tab: TabDriver):
+        """清空标签页所在上下文的Cookie和当前源的存储、丢弃未读取的网络日志并回到空白页"""
+        try:
+            # CDP可以清空所在上下文中所有域名的Cookie，delete_all_cookies 只清当前域名
+            tab.execute_cdp_cmd('Network.clearBrowserCookies', {})
+        except (AttributeError, WebDriverException):
+            tab.delete_all_cookies()
+        tab.execute_script(CLEAR_STORAGE_SCRIPT)
+        tab.get('about:blank')
+        tab._pooled.network_log.pop(_target_id(tab.window_handle), None)
+
+    @staticmethod
+    def reset_browser(pooled: PooledDriver, handle: str):
+        """浏览器上没有其他使用中的标签页时：关闭页面自行打开的窗口"""
+        driver = pooled.driver
+        for other in driver.window_handles:
+            if other not in pooled.tabs:
+                driver.switch_to.window(other)
+                driver.close()
+        driver.switch_to.window(handle)
+        pooled.current = handle
+        pooled.network_log.clear()
+
+    def _quit_driver(self, driver):
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def shutdown(self):
+        """退出所有没有使用中标签页的浏览器；之后再租用时重新创建"""
+        with self.lock:
+            idle = [b for b in self._browsers if b.active == 0]
+            self._browsers = [b for b in self._browsers if b.active > 0]
+        for pooled in idle:
+            self._quit_driver(pooled.driver)
+
+    def get_stats(self) -> Dict[str, int]:
+        """获取浏览器池统计"""
+        with self.lock:
+            stats = dict(self.stats)
+            stats['browsers'] = len(self._browsers)
+            stats['idle'] = sum(1 for b in self._browsers if b.active == 0)
+            stats['tabs_in_use'] = sum(b.active for b in self._browsers)
+            return stats
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+提取结果缓存 - 按 (页面内容哈希, 提取器, 提取器版本) 缓存提取结果，内容未变化的页面不再重复解析
+"""
+
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from scraper_app.utils.config import Config
+from scraper_app.utils.logger import get_logger
+
+class ExtractionCache:
+    """两级提取结果缓存
+
+    - 本地LRU：进程内，最多 max_entries 条
+    - Redis：可选（配置 EXTRACTION_CACHE_REDIS_URL 且安装了redis时启用），多次运行之间共享，条目按TTL过期
+    """
+
+    def __init__(self, max_entries: int, redis_url: str = '', ttl: int = 0):
+        self.logger = get_logger(__name__)
+        self.max_entries = max_entries
+        self.redis_url = redis_url
+        self.ttl = ttl
+        self.entries: OrderedDict = OrderedDict()
+        self.lock = threading.Lock()
+        self.stats = {'local_hits': 0, 'redis_hits': 0, 'misses': 0, 'stores': 0}
+        self._redis = None
+        self._unavailable_until = 0.0
+
+    @staticmethod
+    def make_key(content: bytes, extractor: str, version: str) -> str:
+        """缓存键：提取器名称、版本和页面内容的sha256"""
+        return f"{extractor}:{version}:{hashlib.sha256(content).hexdigest()}"
+
+    def _get_redis(self):
+        """延迟创建Redis连接；未配置、未安装或连接失败时只使用本地缓存"""
+        if not self.redis_url:
+            return None
+        if self._redis is not None:
+            return self._redis
+        if time.time() < self._unavailable_until:
+            return None
+        with self.lock:
+            if self._redis is None:
+                try:
+                    import redis
+                except ImportError:
+                    self.logger.warning("未安装redis，提取缓存只使用本地缓存")
+                    self.redis_url = ''
+                    return None
+                try:
+                    client = redis.Redis.from_url(self.redis_url, decode_responses=True)
+                    client.ping()
+                    self._redis = client
+                except redis.RedisError as e:
+                    self.logger.warning(f"提取缓存Redis不可用，只使用本地缓存: {e}")
+                    self._unavailable_until = time.time() + 60
+                    return None
+        return self._redis
+
+    def _count(self, key: str):
+        with self.lock:
+            self.stats[key] += 1
+
+    def _put_local(self, key: str, result: Dict):
+        with self.lock:
+            self.entries[key] = result
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def get(self, key: str) -> Optional[Dict]:
+        """查找缓存，Redis命中的条目会放入本地LRU"""
+        if self.max_entries > 0:
+            with self.lock:
+                result = self.entries.get(key)
+                if result is not None:
+                    self.entries.move_to_end(key)
+                    self.stats['local_hits'] += 1
+                    return dict(result)
+
+        client = self._get_redis()
+        if client is not None:
+            try:
+                cached = client.get(f'extract:{key}')
+            except Exception as e:
+                self.logger.debug(f"读取提取缓存失败: {e}")
+                cached = None
+            if cached:
+                result = json.loads(cached)
+                if self.max_entries > 0:
+                    self._put_local(key, result)
+                self._count('redis_hits')
+                return dict(result)
+
+        self._count('misses')
+        return None
+
+    def put(self, key: str, result: Dict):
+        """写入缓存"""
+        if self.max_entries > 0:
+            self._put_local(key, dict(result))
+
+        client = self._get_redis()
+        if client is not None:
+            try:
+                client.set(f'extract:{key}', json.dumps(result, ensure_ascii=False), ex=self.ttl or None)
+            except Exception as e:
+                self.logger.debug(f"写入提取缓存失败: {e}")
+        self._count('stores')
+
+    def get_stats(self) -> Dict:
+        """获取缓存统计，hit_rate = 命中次数 / 查找次数"""
+        with self.lock:
+            stats = dict(self.stats)
+            stats['entries'] = len(self.entries)
+        lookups = stats['local_hits'] + stats['redis_hits'] + stats['misses']
+        stats['hit_rate'] = round((stats['local_hits'] + stats['redis_hits']) / lookups, 4) if lookups else 0.0
+        return stats
+
+_extraction_cache = None
+_extraction_cache_lock = threading.Lock()
+
+def get_extraction_cache() -> ExtractionCache:
+    """获取全局共享的提取缓存"""
+    global _extraction_cache
+    with _extraction_cache_lock:
+        if _extraction_cache is None:
+            _extraction_cache = ExtractionCache(
+                max_entries=Config.EXTRACTION_CACHE_MAX_ENTRIES,
+                redis_url=Config.EXTRACTION_CACHE_REDIS_URL,
+                ttl=Config.EXTRACTION_CACHE_TTL
+            )
+        return _extraction_cache
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+解析进程池 - 下载在I/O线程中进行，CPU密集的HTML提取交给多进程执行，绕开GIL
+"""
+
+import importlib
+import threading
+import multiprocessing
+from dataclasses import dataclass, field
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional
+
+import requests
+
+from scraper_app.utils.config import Config
+from scraper_app.utils.download import declared_charset
+from scraper_app.utils.logger import get_logger
+
+@dataclass
+class FetchedPage:
+    """下载完成的页面，可以pickle后传给解析进程"""
+    url: str
+    content: bytes
+    encoding: Optional[str]
+    status_code: int
+    template: Optional[str] = None  # 该域名学习到的内容选择器
+    declared_encoding: Optional[str] = None  # Content-Type头中声明的字符集
+    options: Dict[str, Any] = field(default_factory=dict)  # 本次运行的提取选项
+
+    @classmethod
+    def from_response(cls, url: str, response: requests.Response, template: Optional[str] = None,
+                      options: Optional[Dict[str, Any]] = None) -> 'FetchedPage':
+        return cls(url, response.content, response.encoding, response.status_code, template,
+                   declared_charset(response), dict(options or {}))
+
+    @property
+    def text(self) -> str:
+        """与 response.text 相同的解码结果（未声明编码时按内容探测）"""
+        response = requests.Response()
+        response._content = self.content
+        response.encoding = self.encoding
+        return response.text
+
+# 可在解析进程中运行的静态提取器：爬虫名称 -> "模块:提取器类"
+# 提取器只依赖页面和配置，子进程中创建时不会建立会话、驱动池或缓存目录
+EXTRACTORS = {
+    'requests': 'scraper_app.scrapers.requests_scraper:RequestsExtractor',
+    'government': 'scraper_app.scrapers.government_scraper:GovernmentExtractor',
+    'newspaper': 'scraper_app.scrapers.newspaper_scraper:NewspaperExtractor',
+    'readability': 'scraper_app.scrapers.readability_scraper:ReadabilityExtractor',
+    'trafilatura': 'scraper_app.scrapers.trafilatura_scraper:TrafilaturaExtractor',
+    'selenium': 'scraper_app.scrapers.selenium_scraper:SeleniumExtractor',  # 混合模式的静态提取
+}
+
+# 解析进程内的提取器实例，每个进程每种提取器只创建一次
+_extractors: Dict[str, Any] = {}
+
+def extract_in_worker(scraper_name: str, page: FetchedPage) -> Dict:
+    """在解析进程中调用对应提取器的 extract(page)"""
+    extractor = _extractors.get(scraper_name)
+    if extractor is None:
+        module_name, class_name = EXTRACTORS[scraper_name].split(':')
+        extractor = getattr(importlib.import_module(module_name), class_name)(scraper_name)
+        _extractors[scraper_name] = extractor
+    return extractor.extract(page)
+
+class ExtractionPool:
+    """有界的提取进程池
+
+    - 进程数默认等于CPU核数，EXTRACT_PROCESSES=0 时在调用线程中直接提取
+    - 同时排队/执行的提取任务最多 queue_size 个，超过时下载线程阻塞等待，形成背压
+    - 子进程使用spawn启动，避免在多线程的进程中fork
+    """
+
+    def __init__(self, processes: int, queue_size: int, start_method: str):
+        self.logger = get_logger(__name__)
+        self.processes = processes
+        self.queue_size = max(1, queue_size)
+        self.start_method = start_method
+        self.enabled = processes > 0
+        self._slots = threading.BoundedSemaphore(self.queue_size)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self.lock = threading.Lock()
+        self.stats = {'submitted': 0, 'inline': 0, 'broken': 0}
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self.lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.processes,
+                    mp_context=multiprocessing.get_context(self.start_method)
+                )
+                self.logger.info(f"解析进程池已启动: {self.processes}个进程, 队列上限{self.queue_size}")
+            return self._executor
+
+    def _count(self, key: str):
+        with self.lock:
+            self.stats[key] += 1
+
+    def _run_inline(self, fn: Callable, *args) -> Future:
+        self._count('inline')
+        future = Future()
+        try:
+            future.set_result(fn(*args))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def submit(self, fn: Callable, *args) -> Future:
+        """提交提取任务，队列已满时阻塞；fn和参数必须可以pickle"""
+        if not self.enabled:
+            return self._run_inline(fn, *args)
+
+        self._slots.acquire()
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except (BrokenProcessPool, RuntimeError) as e:
+            # 子进程异常退出后进程池不可再用，重建进程池，本次在当前线程提取
+            self._slots.release()
+            self._count('broken')
+            self.logger.error(f"解析进程池不可用，重建进程池: {e}")
+            with self.lock:
+                self._executor = None
+            return self._run_inline(fn, *args)
+
+        self._count('submitted')
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def run(self, fn: Callable, *args) -> Any:
+        """提交提取任务并等待结果（等待期间不占用GIL）"""
+        return self.submit(fn, *args).result()
+
+    def shutdown(self):
+        """关闭进程池"""
+        with self.lock:
+            executor, self._executor = self._executor, None
+        if executor:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def get_stats(self) -> Dict[str, int]:
+        """获取提取统计"""
+        with self.lock:
+            return dict(self.stats)
+
+_extraction_pool = None
+_extraction_pool_lock = threading.Lock()
+
+def get_extraction_pool() -> ExtractionPool:
+    """获取全局共享的解析进程池"""
+    global _extraction_pool
+    with _extraction_pool_lock:
+        if _extraction_pool is None:
+            _extraction_pool = ExtractionPool(
+                processes=Config.EXTRACT_PROCESSES,
+                queue_size=Config.EXTRACT_QUEUE_SIZE,
+                start_method=Config.EXTRACT_START_METHOD
+            )
+        return _extraction_pool
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+主机调度器 - 按主机限制并发和请求间隔，主机之间轮询分发
+"""
+
+import time
+import threading
+from collections import deque, OrderedDict
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, Any
+from urllib.parse import urlparse
+
+from scraper_app.utils.config import Config
+from scraper_app.utils.logger import get_logger
+
+# 主机名额被其他批次占满时，重新检查的间隔（秒）
+CAPPED_POLL_INTERVAL = 0.1
+
+class HostScheduler:
+    """主机感知的调度器
+
+    - 每个主机同时最多 max_per_host 个请求
+    - 同一主机相邻两次请求的开始时间至少间隔 min_delay 秒
+    - 各主机轮流获得空闲的工作线程，避免单一主机独占线程池
+
+    主机状态在所有爬虫之间共享，因此同时运行的多个批次也不会叠加访问同一主机。
+    """
+
+    def __init__(self, max_per_host: int, min_delay: float):
+        self.logger = get_logger(__name__)
+        self.max_per_host = max(1, max_per_host)
+        self.min_delay = max(0.0, min_delay)
+        self.lock = threading.Lock()
+        self.released = threading.Condition(self.lock)  # 任一主机释放名额时通知
+        self.releases = 0
+        self.in_flight: Dict[str, int] = {}
+        self.next_allowed: Dict[str, float] = {}
+
+    @staticmethod
+    def host_of(url: str) -> str:
+        return urlparse(url).netloc.lower()
+
+    def _try_acquire(self, host: str, now: float) -> Tuple[bool, Optional[float]]:
+        """尝试占用主机的一个并发名额，失败时返回该主机最早可用的时间（受并发限制时为None）"""
+        with self.lock:
+            if self.in_flight.get(host, 0) >= self.max_per_host:
+                return False, None
+            ready_at = self.next_allowed.get(host, 0.0)
+            if ready_at > now:
+                return False, ready_at
+            self.in_flight[host] = self.in_flight.get(host, 0) + 1
+            self.next_allowed[host] = now + self.min_delay
+            return True, None
+
+    def _release(self, host: str):
+        with self.lock:
+            self.in_flight[host] -= 1
+            self.releases += 1
+            self.released.notify_all()
+
+    def _wait_for_release(self, since: int, timeout: Optional[float]):
+        """等到 since 之后有主机释放名额，或超时"""
+        with self.released:
+            self.released.wait_for(lambda: self.releases != since, timeout)
+
+    def run(self, items: List[Any], workers: int, fn: Callable[[Any], Any],
+            url_of: Callable[[Any], str] = lambda item: item[0]) -> Iterator[Tuple[Any, Future]]:
+        """按主机调度执行 fn(item)，按完成顺序产出 (item, future)
+
+        只在有空闲工作线程时才提交任务，保证提交时间即开始时间，请求间隔才准确。
+        """
+        queues: "OrderedDict[str, deque]" = OrderedDict()
+        for item in items:
+            queues.setdefault(self.host_of(url_of(item)), deque()).append(item)
+        ring = deque(queues.keys())
+        pending: Dict[Future, Tuple[Any, str]] = {}
+
+        self.logger.info(f"主机调度: {len(items)}个URL分布在{len(ring)}个主机, 每主机并发上限{self.max_per_host}, 最小间隔{self.min_delay}秒")
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            while ring or pending:
+                now = time.time()
+                wake_at = None
+                capped = False  # 有主机的并发名额被占满（可能是其他批次占用）
+                dispatched = False
+                with self.lock:
+                    releases = self.releases
+
+                # 轮询各主机，每个主机每轮最多分发一个URL
+                for _ in range(len(ring)):
+                    if len(pending) >= workers or not ring:
+                        break
+                    host = ring[0]
+                    ring.rotate(-1)
+                    acquired, ready_at = self._try_acquire(host, now)
+                    if not acquired:
+                        if ready_at is not None:
+                            wake_at = ready_at if wake_at is None else min(wake_at, ready_at)
+                        else:
+                            capped = True
+                        continue
+
+                    item = queues[host].popleft()
+                    pending[executor.submit(fn, item)] = (item, host)
+                    dispatched = True
+                    if not queues[host]:
+                        ring.remove(host)
+                        del queues[host]
+
+                if dispatched and ring and len(pending) < workers:
+                    # 还有空闲线程，再轮询一遍以计算各主机的冷却时间
+                    continue
+
+                if not pending:
+                    # 所有主机都在冷却期或名额被其他批次占满：等到冷却结束或有名额释放
+                    self._wait_for_release(releases, None if wake_at is None else max(0.0, wake_at - time.time()))
+                    continue
+
+                # 有主机即将冷却结束且还有空闲线程时，只等到冷却结束；
+                # 其他批次释放名额不会唤醒这里，有主机名额被占满时定期重新检查
+                timeout = None
+                if len(pending) < workers:
+                    if wake_at is not None:
+                        timeout = max(0.0, wake_at - time.time())
+                    if capped:
+                        timeout = min(timeout, CAPPED_POLL_INTERVAL) if timeout is not None else CAPPED_POLL_INTERVAL
+
+                done, _ = wait(list(pending), timeout=timeout, return_when=FIRST_COMPLETED)
+                for future in done:
+                    item, host = pending.pop(future)
+                    self._release(host)
+                    yield item, future
+
+_host_scheduler = None
+_host_scheduler_lock = threading.Lock()
+
+def get_host_scheduler() -> HostScheduler:
+    """获取所有爬虫共享的主机调度器"""
+    global _host_scheduler
+    with _host_scheduler_lock:
+        if _host_scheduler is None:
+            _host_scheduler = HostScheduler(Config.HOST_MAX_CONCURRENCY, Config.HOST_MIN_DELAY)
+        return _host_scheduler
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+HTTP响应缓存 - 所有爬虫共享的磁盘缓存，支持条件请求重新验证
+"""
+
+import os
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from scraper_app.utils.config import Config
+from scraper_app.utils.download import read_limited
+from scraper_app.utils.logger import get_logger
+
+# 缓存条目中保留的响应头（正文已解压，不保留Content-Encoding/Content-Length）
+CACHED_HEADERS = ['Content-Type', 'ETag', 'Last-Modified']
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+def canonicalize_url(url: str) -> str:
+    """规范化URL：小写scheme和主机、去掉默认端口和fragment、查询参数排序"""
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    path = parts.path or '/'
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((scheme, host, path, query, ''))
+
+class HttpCache:
+    """基于磁盘的HTTP响应缓存
+
+    以规范化URL为键，每个条目由元数据文件(.json)和正文文件(.body)组成。
+    命中后通过If-None-Match/If-Modified-Since重新验证，304时直接返回缓存正文。
+    总大小超过上限时按最近使用时间(LRU)淘汰。
+    """
+
+    def __init__(self, cache_dir: Path, max_bytes: int, enabled: bool = True):
+        self.logger = get_logger(__name__)
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self.lock = threading.Lock()
+        self.index: "OrderedDict[str, int]" = OrderedDict()  # key -> 条目字节数，按最近使用排序
+        self.total_bytes = 0
+        self.stats = {'revalidated': 0, 'misses': 0, 'stored': 0, 'evictions': 0, 'invalidated': 0}
+
+        if self.enabled:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            self._load_index()
+
+    def _paths(self, key: str):
+        return self.cache_dir / f"{key}.json", self.cache_dir / f"{key}.body"
+
+    def _load_index(self):
+        """从磁盘重建LRU索引，按修改时间排序"""
+        entries = []
+        for meta_path in self.cache_dir.glob('*.json'):
+            body_path = meta_path.with_suffix('.body')
+            try:
+                size = meta_path.stat().st_size + body_path.stat().st_size
+                entries.append((meta_path.stat().st_mtime, meta_path.stem, size))
+            except FileNotFoundError:
+                continue
+
+        for _, key, size in sorted(entries):
+            self.index[key] = size
+            self.total_bytes += size
+
+        self.logger.info(f"HTTP缓存已加载: {len(self.index)}个条目, {self.total_bytes}字节")
+
+    def _lookup(self, key: str) -> Optional[Dict]:
+        """读取缓存条目，读取失败时视为未命中"""
+        with self.lock:
+            if key not in self.index:
+                return None
+        meta_path, body_path = self._paths(key)
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+            entry['body'] = body_path.read_bytes()
+            return entry
+        except (OSError, ValueError):
+            self._remove(key)
+            return None
+
+    def _touch(self, key: str):
+        """标记条目为最近使用"""
+        with self.lock:
+            if key in self.index:
+                self.index.move_to_end(key)
+        meta_path, _ = self._paths(key)
+        try:
+            os.utime(meta_path)
+        except OSError:
+            pass
+
+    def _remove(self, key: str):
+        with self.lock:
+            size = self.index.pop(key, 0)
+            self.total_bytes -= size
+        for path in self._paths(key):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+    def _store(self, key: str, url: str, response: requests.Response):
+        """写入缓存条目并按需淘汰旧条目"""
+        headers = {name: response.headers[name] for name in CACHED_HEADERS if name in response.headers}
+        meta = {
+            'url': url,
+            'status_code': response.status_code,
+            'headers': headers,
+            'stored_at': time.time()
+        }
+        meta_path, body_path = self._paths(key)
+        body = response.content
+        meta_bytes = json.dumps(meta, ensure_ascii=False).encode('utf-8')
+        size = len(meta_bytes) + len(body)
+        if size > self.max_bytes:
+            return
+
+        try:
+            body_path.write_bytes(body)
+            meta_path.write_bytes(meta_bytes)
+        except OSError as e:
+            self.logger.warning(f"写入HTTP缓存失败 {url}: {e}")
+            return
+
+        evicted = []
+        with self.lock:
+            self.total_bytes += size - self.index.pop(key, 0)
+            self.index[key] = size
+            self.stats['stored'] += 1
+            while self.total_bytes > self.max_bytes and len(self.index) > 1:
+                old_key, old_size = self.index.popitem(last=False)
+                self.total_bytes -= old_size
+                self.stats['evictions'] += 1
+                evicted.append(old_key)
+
+        for old_key in evicted:
+            for path in self._paths(old_key):
+                try:
+                    path.unlink()
+                except FileNotFoundError:
+                    pass
+
+    def _build_response(self, entry: Dict, revalidation: requests.Response) -> requests.Response:
+        """用缓存条目构造一个等价的200响应"""
+        response = requests.Response()
+        response.status_code = entry['status_code']
+        response._content = entry['body']
+        response.headers = CaseInsensitiveDict(entry['headers'])
+        response.url = entry['url']
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        response.request = revalidation.request
+        response.elapsed = revalidation.elapsed
+        response.from_cache = True
+        return response
+
+    def fetch(self, session: requests.Session, url: str, timeout=30) -> requests.Response:
+        """通过缓存获取URL，缓存条目存在时发送条件请求；正文以流式读取并受字节上限约束"""
+        if not self.enabled:
+            return read_limited(url, session.get(url, timeout=timeout, stream=True))
+
+        key = hashlib.sha256(canonicalize_url(url).encode('utf-8')).hexdigest()
+        entry = self._lookup(key)
+
+        headers = {}
+        if entry:
+            if 'ETag' in entry['headers']:
+                headers['If-None-Match'] = entry['headers']['ETag']
+            if 'Last-Modified' in entry['headers']:
+                headers['If-Modified-Since'] = entry['headers']['Last-Modified']
+
+        response = session.get(url, timeout=timeout, headers=headers, stream=True)
+
+        if entry and response.status_code == 304:
+            response.close()
+            self._touch(key)
+            with self.lock:
+                self.stats['revalidated'] += 1
+            self.logger.debug(f"HTTP缓存重新验证命中(304): {url}")
+            return self._build_response(entry, response)
+
+        with self.lock:
+            self.stats['misses'] += 1
+
+        response = read_limited(url, response)
+
+        # 只缓存可以重新验证的完整成功响应
+        if response.status_code == 200:
+            cache_control = response.headers.get('Cache-Control', '').lower()
+            validators = 'ETag' in response.headers or 'Last-Modified' in response.headers
+            if validators and 'no-store' not in cache_control and not response.truncated:
+                self._store(key, url, response)
+            elif entry:
+                # 新响应不可缓存（no-store、没有校验器或被截断），旧条目已过时，不能再用于条件请求
+                self._remove(key)
+                with self.lock:
+                    self.stats['invalidated'] += 1
+                self.logger.debug(f"HTTP缓存条目已失效并删除: {url}")
+
+        return response
+
+    def get_stats(self) -> Dict:
+        """获取缓存统计"""
+        with self.lock:
+            stats = dict(self.stats)
+            stats['entries'] = len(self.index)
+            stats['total_bytes'] = self.total_bytes
+        return stats
+
+_http_cache = None
+_http_cache_lock = threading.Lock()
+
+def get_http_cache() -> HttpCache:
+    """获取全局共享的HTTP缓存实例"""
+    global _http_cache
+    with _http_cache_lock:
+        if _http_cache is None:
+            _http_cache = HttpCache(
+                Config.HTTP_CACHE_DIR,
+                Config.HTTP_CACHE_MAX_MB * 1024 * 1024,
+                enabled=Config.HTTP_CACHE_ENABLED
+            )
+        return _http_cache
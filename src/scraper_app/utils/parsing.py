@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+HTML解析后端 - 统一创建BeautifulSoup树，可按爬虫切换 html.parser / lxml
+"""
+
+import re
+import threading
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from bs4 import BeautifulSoup, FeatureNotFound
+from bs4.element import CData, NavigableString, Tag
+
+from scraper_app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+Markup = Union[str, bytes]
+
+# 后端名称 -> 构造函数；默认html.parser，lxml需通过 PARSER_BACKEND 显式开启（基准测试中整体提速有限）
+PARSER_BACKENDS: Dict[str, Callable[[Markup], BeautifulSoup]] = {
+    'html.parser': lambda markup: BeautifulSoup(markup, 'html.parser'),
+    'lxml': lambda markup: BeautifulSoup(markup, 'lxml'),
+}
+
+DEFAULT_BACKEND = 'html.parser'
+
+_unavailable = set()
+_unavailable_lock = threading.Lock()
+
+def register_backend(name: str, factory: Callable[[Markup], BeautifulSoup]):
+    """注册新的解析后端"""
+    PARSER_BACKENDS[name] = factory
+
+def available_backends() -> List[str]:
+    """返回当前环境中可用的解析后端"""
+    backends = []
+    for name, factory in PARSER_BACKENDS.items():
+        try:
+            factory('<html></html>')
+            backends.append(name)
+        except FeatureNotFound:
+            continue
+    return backends
+
+def make_soup(markup: Markup, backend: str = DEFAULT_BACKEND) -> BeautifulSoup:
+    """使用指定后端解析HTML，后端不可用时退回html.parser"""
+    factory = PARSER_BACKENDS.get(backend)
+    if factory is None:
+        raise ValueError(f"不支持的解析后端: {backend}")
+
+    if backend not in _unavailable:
+        try:
+            return factory(markup)
+        except FeatureNotFound:
+            with _unavailable_lock:
+                _unavailable.add(backend)
+            logger.warning(f"解析后端 {backend} 不可用，退回 {DEFAULT_BACKEND}")
+
+    return PARSER_BACKENDS[DEFAULT_BACKEND](markup)
+
+# 提取内容区域文本时跳过的非正文元素
+NOISE_TAGS = frozenset(['script', 'style', 'nav', 'header', 'footer', 'aside'])
+
+# 回退到<body>时跳过的非正文元素
+BOILERPLATE_TAGS = NOISE_TAGS | {'menu'}
+
+def iter_strings_excluding(node: Tag, exclude_tags: Iterable[str] = BOILERPLATE_TAGS) -> Iterator[str]:
+    """按文档顺序遍历节点下的文本（已去除首尾空白），跳过 exclude_tags 子树，不修改原树"""
+    exclude = frozenset(exclude_tags)
+    types = node.interesting_string_types or (NavigableString, CData)
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        if isinstance(current, Tag):
+            if current is not node and current.name in exclude:
+                continue
+            stack.extend(reversed(current.contents))
+        elif type(current) in types:
+            text = current.strip()
+            if text:
+                yield text
+
+def get_text_excluding(node: Tag, exclude_tags: Iterable[str] = BOILERPLATE_TAGS, separator: str = ' ') -> str:
+    """等价于删除 exclude_tags 后调用 get_text(separator, strip=True)，但无需复制和重新解析"""
+    return separator.join(iter_strings_excluding(node, exclude_tags))
+
+# 只含标签名、#id、.class 的简单选择器，可以在一次遍历中直接匹配
+_SIMPLE_SELECTOR = re.compile(r'^(?P<tag>[a-zA-Z][\w-]*)?(?P<rest>(?:[#.][\w-]+)*)$')
+
+class SelectorPlan:
+    """编译后的选择器级联
+
+    原来的写法对每个候选选择器调用一次 select_one，每次都遍历整棵树。
+    SelectorPlan 把简单选择器（tag、.class、#id 及其组合）按 id/class/标签名建立索引，
+    一次遍历即可找到每个选择器在文档顺序中的第一个匹配，结果与逐个 select_one 相同。
+    含后代、属性等组合的复杂选择器仍交给 soupsieve 单独匹配。
+    """
+
+    def __init__(self, selectors: Iterable[str]):
+        self.selectors = list(selectors)
+        self._index: Dict[Tuple[str, str], List[Tuple[int, Optional[str], Optional[str], frozenset]]] = {}
+        self._complex: List[int] = []
+
+        for position, selector in enumerate(self.selectors):
+            match = _SIMPLE_SELECTOR.match(selector.strip())
+            if not match or not (match.group('tag') or match.group('rest')):
+                self._complex.append(position)
+                continue
+
+            tag = match.group('tag').lower() if match.group('tag') else None
+            ids = re.findall(r'#([\w-]+)', match.group('rest'))
+            classes = frozenset(re.findall(r'\.([\w-]+)', match.group('rest')))
+            if len(ids) > 1:
+                self._complex.append(position)
+                continue
+            element_id = ids[0] if ids else None
+
+            # 按最有区分度的部分建立索引：id > class > 标签名
+            if element_id:
+                key = ('id', element_id)
+            elif classes:
+                key = ('class', min(classes))
+            else:
+                key = ('tag', tag)
+            self._index.setdefault(key, []).append((position, tag, element_id, classes))
+
+        self._simple_count = len(self.selectors) - len(self._complex)
+
+    def match(self, root: Tag) -> List[Optional[Tag]]:
+        """返回每个选择器在 root 下的第一个匹配（按选择器顺序，未匹配为None）"""
+        found: List[Optional[Tag]] = [None] * len(self.selectors)
+        remaining = self._simple_count
+        index = self._index
+
+        if remaining:
+            for element in root.descendants:
+                if not isinstance(element, Tag):
+                    continue
+                candidates = list(index.get(('tag', element.name), ()))
+                element_id = element.get('id')
+                if element_id:
+                    candidates.extend(index.get(('id', element_id), ()))
+                element_classes = element.get('class') or ()
+                for class_name in element_classes:
+                    candidates.extend(index.get(('class', class_name), ()))
+
+                for position, tag, selector_id, classes in candidates:
+                    if found[position] is not None:
+                        continue
+                    if tag and element.name != tag:
+                        continue
+                    if selector_id and element_id != selector_id:
+                        continue
+                    if classes and not classes.issubset(element_classes):
+                        continue
+                    found[position] = element
+                    remaining -= 1
+
+                if remaining == 0:
+                    break
+
+        for position in self._complex:
+            found[position] = root.select_one(self.selectors[position])
+        return found
+
+    def iter_matches(self, root: Tag) -> Iterator[Tuple[str, Tag]]:
+        """按优先级产出 (选择器, 第一个匹配元素)，跳过未匹配的选择器"""
+        for selector, element in zip(self.selectors, self.match(root)):
+            if element is not None:
+                yield selector, element
+
+    def best(self, root: Tag, text_of: Callable[[Tag], str], min_length: int) -> Tuple[Optional[Tag], str]:
+        """返回优先级最高且文本长度超过 min_length 的匹配；都不够长时返回文本最长的匹配"""
+        _, element, text = self.best_match(root, text_of, min_length)
+        return element, text
+    
+    def best_match(self, root: Tag, text_of: Callable[[Tag], str], min_length: int,
+                   preferred: Optional[str] = None) -> Tuple[Optional[str], Optional[Tag], str]:
+        """与 best 相同，另外返回选中的选择器
+        
+        preferred 是为该域名学习到的选择器：先单独匹配它，内容足够长时不再执行整个级联。
+        """
+        if preferred is not None and preferred in self.selectors:
+            element = root.select_one(preferred)
+            if element is not None:
+                text = text_of(element)
+                if len(text) > min_length:
+                    return preferred, element, text
+        
+        best_selector, best_element, best_text = None, None, ''
+        for selector, element in self.iter_matches(root):
+            text = text_of(element)
+            if len(text) > min_length:
+                return selector, element, text
+            if len(text) > len(best_text) or best_element is None:
+                best_selector, best_element, best_text = selector, element, text
+        return best_selector, best_element, best_text
+
+# 正文来自<body>回退时记录的选择器
+BODY_SELECTOR = 'body'
+
+def extract_main_text(soup: BeautifulSoup, plan: SelectorPlan, min_length: int = 200,
+                      template: Optional[str] = None) -> Tuple[Optional[str], str]:
+    """按内容选择器提取正文，返回 (采用的选择器, 正文)
+    
+    按优先级取第一个内容超过 min_length 的区域，都不够长时回退到<body>（跳过非正文元素）。
+    template 为该域名学习到的选择器（可以是 BODY_SELECTOR），会最先尝试。
+    """
+    if template == BODY_SELECTOR:
+        body = soup.find('body')
+        if body:
+            content = get_text_excluding(body, BOILERPLATE_TAGS)
+            if len(content) > min_length:
+                return BODY_SELECTOR, content
+        template = None
+    
+    selector, _, content = plan.best_match(
+        soup, lambda element: get_text_excluding(element, NOISE_TAGS), min_length, preferred=template
+    )
+    
+    # 如果没有找到具体内容，尝试body但进行清理
+    if not content or len(content) < min_length:
+        body = soup.find('body')
+        if body:
+            # 在原树上提取文本，跳过不需要的元素
+            body_content = get_text_excluding(body, BOILERPLATE_TAGS)
+            if len(body_content) > len(content):
+                selector, content = BODY_SELECTOR, body_content
+    
+    return selector, content
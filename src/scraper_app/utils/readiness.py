@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+页面就绪等待 - 按条件等待浏览器中的页面可以提取，取代固定的 time.sleep
+
+就绪条件（满足任一即返回，总等待时间不超过 timeout）：
+- selector: 任一内容选择器已出现且文本长度达到 min_text_length
+- settled: 页面加载完成、没有进行中的fetch/XHR、最后一个资源已完成 network_idle_ms 以上，
+  并且DOM已经 quiet_ms 没有变化
+
+导航不等待页面加载（pageLoadStrategy 为 none）时，新文档提交之前轮询到的是上一个页面（about:blank），
+不算就绪；导航过程中脚本上下文被销毁导致的脚本错误按未就绪处理。
+"""
+
+import time
+from dataclasses import dataclass
+from typing import Sequence, Tuple
+
+from selenium.common.exceptions import JavascriptException, WebDriverException
+
+from scraper_app.utils.config import Config
+
+# 统计进行中的fetch/XHR和最近一次DOM变化的时间；通过CDP在每个新文档的脚本之前注入，
+# 不支持CDP时在第一次轮询时注入（此前已发出的请求统计不到，只能依靠资源计时判断网络空闲）
+INSTRUMENT_SCRIPT = """
+(function () {
+  if (window.__readiness) { return; }
+  var state = window.__readiness = {inflight: 0, lastMutation: performance.now()};
+  var send = XMLHttpRequest.prototype.send;
+  XMLHttpRequest.prototype.send = function () {
+    state.inflight++;
+    this.addEventListener('loadend', function () { state.inflight--; });
+    return send.apply(this, arguments);
+  };
+  if (window.fetch) {
+    var fetch = window.fetch;
+    window.fetch = function () {
+      state.inflight++;
+      return fetch.apply(this, arguments).finally(function () { state.inflight--; });
+    };
+  }
+  new MutationObserver(function () { state.lastMutation = performance.now(); })
+    .observe(document, {childList: true, subtree: true, characterData: true});
+})();
+"""
+
+POLL_SCRIPT = INSTRUMENT_SCRIPT + """
+var state = window.__readiness;
+var selectors = arguments[0], found = null;
+for (var i = 0; i < selectors.length; i++) {
+  var element = document.querySelector(selectors[i]);
+  if (element && (element.textContent || '').trim().length >= arguments[1]) { found = selectors[i]; break; }
+}
+var entries = performance.getEntriesByType('resource'), lastResponse = 0;
+for (var j = 0; j < entries.length; j++) { lastResponse = Math.max(lastResponse, entries[j].responseEnd); }
+return {
+  found: found,
+  blank: location.href === 'about:blank',
+  complete: document.readyState === 'complete',
+  inflight: state.inflight,
+  network_quiet_ms: performance.now() - lastResponse,
+  dom_quiet_ms: performance.now() - state.lastMutation
+};
+"""
+
+@dataclass
+class ReadinessPolicy:
+    """就绪条件和各项上限"""
+    selectors: Sequence[str] = ()
+    min_text_length: int = 0
+    quiet_ms: int = Config.READINESS_QUIET_MS
+    network_idle_ms: int = Config.READINESS_NETWORK_IDLE_MS
+    timeout: float = Config.READINESS_TIMEOUT
+    poll_interval: float = Config.READINESS_POLL_INTERVAL
+
+def install_readiness_hooks(driver) -> bool:
+    """让浏览器在每个新文档的脚本执行前注入统计脚本，驱动不支持CDP时返回False"""
+    try:
+        driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {'source': INSTRUMENT_SCRIPT})
+        return True
+    except (AttributeError, WebDriverException):
+        return False
+
+def wait_until_ready(driver, policy: ReadinessPolicy) -> Tuple[str, float]:
+    """等待页面就绪，返回 (就绪原因, 等待秒数)；原因为 selector / settled / timeout"""
+    start_time = time.monotonic()
+    deadline = start_time + policy.timeout
+    selectors = list(policy.selectors)
+
+    while True:
+        now = time.monotonic()
+        try:
+            state = driver.execute_script(POLL_SCRIPT, selectors, policy.min_text_length)
+        except JavascriptException:
+            state = None
+
+        if state and state['found']:
+            return 'selector', now - start_time
+
+        if state and not state['blank']:
+            network_idle = state['inflight'] <= 0 and state['network_quiet_ms'] >= policy.network_idle_ms
+            if state['complete'] and network_idle and state['dom_quiet_ms'] >= policy.quiet_ms:
+                return 'settled', now - start_time
+
+        if now >= deadline:
+            return 'timeout', now - start_time
+        time.sleep(min(policy.poll_interval, max(0.0, deadline - now)))
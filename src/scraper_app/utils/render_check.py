@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+渲染判断 - 判断静态HTML是否是需要浏览器执行JavaScript才有内容的页面外壳，并统计判断的准确率
+"""
+
+import re
+import threading
+from typing import Dict, Optional
+
+from bs4 import BeautifulSoup
+
+from scraper_app.utils.parsing import get_text_excluding, BOILERPLATE_TAGS
+
+# 前端框架的挂载点：id、标签名、属性
+SPA_ROOT_IDS = frozenset(['root', 'app', '__next', '__nuxt', '___gatsby', 'app-root'])
+SPA_ROOT_TAGS = frozenset(['app-root'])
+SPA_ROOT_ATTRS = ('ng-app', 'ng-version', 'data-reactroot', 'data-v-app')
+
+# <noscript>中提示需要启用JavaScript
+NOSCRIPT_HINT = re.compile(r'javascript|启用.{0,4}脚本|开启.{0,4}脚本', re.IGNORECASE)
+
+# 页面文本之外不计入的标签
+SHELL_EXCLUDED_TAGS = BOILERPLATE_TAGS | {'noscript', 'template'}
+
+# 浏览器结果的正文超过静态结果的这个倍数时，认为需要渲染
+RENDER_GAIN = 2.0
+
+def _is_spa_root(element) -> bool:
+    if element.name in SPA_ROOT_TAGS or element.get('id') in SPA_ROOT_IDS:
+        return True
+    return any(element.has_attr(attr) for attr in SPA_ROOT_ATTRS)
+
+def detect_js_shell(soup: BeautifulSoup, content: str, min_text: int) -> Optional[str]:
+    """判断静态页面是否需要浏览器渲染，返回原因（不需要时返回None）
+
+    - empty_body: <body>中几乎没有文本
+    - spa_root: 存在前端框架挂载点且其中没有文本
+    - noscript: <noscript>提示需要JavaScript，且静态提取的正文不足
+    """
+    body = soup.find('body')
+    if body is None or len(get_text_excluding(body, SHELL_EXCLUDED_TAGS).strip()) < min_text:
+        return 'empty_body'
+
+    for element in body.find_all(_is_spa_root):
+        if len(get_text_excluding(element, SHELL_EXCLUDED_TAGS).strip()) < min_text:
+            return 'spa_root'
+
+    if len(content) < min_text:
+        for noscript in body.find_all('noscript'):
+            if NOSCRIPT_HINT.search(noscript.get_text()):
+                return 'noscript'
+    return None
+
+def render_needed(static: Optional[Dict], rendered: Dict) -> Optional[bool]:
+    """根据同一页面的静态结果和浏览器结果判断是否确实需要渲染；无法判断时返回None"""
+    static_ok = bool(static and static.get('success'))
+    if not rendered.get('success'):
+        return False if static_ok else None
+    if not static_ok:
+        return True
+    return len(rendered.get('content') or '') >= RENDER_GAIN * len(static.get('content') or '')
+
+class RenderDecisionStats:
+    """记录静态/浏览器的判断及其准确率
+
+    升级到浏览器的页面都有两份结果，可以直接评估；留在静态的页面按抽样比例再渲染一次评估。
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.stats = {'static': 0, 'browser': 0, 'audited': 0, 'judged': 0, 'correct': 0,
+                      'unnecessary_renders': 0, 'missed_renders': 0}
+        self.reasons: Dict[str, int] = {}
+
+    def record(self, decision: str, reason: Optional[str], static: Optional[Dict],
+               rendered: Optional[Dict]) -> Optional[bool]:
+        """记录一次判断（decision 为 static / browser），有浏览器结果时返回判断是否正确"""
+        needed = render_needed(static, rendered) if rendered is not None else None
+        correct = None if needed is None else needed == (decision == 'browser')
+        with self.lock:
+            self.stats[decision] += 1
+            if reason:
+                self.reasons[reason] = self.reasons.get(reason, 0) + 1
+            if decision == 'static' and rendered is not None:
+                self.stats['audited'] += 1
+            if correct is not None:
+                self.stats['judged'] += 1
+                if correct:
+                    self.stats['correct'] += 1
+                else:
+                    self.stats['unnecessary_renders' if decision == 'browser' else 'missed_renders'] += 1
+        return correct
+
+    def get_stats(self) -> Dict:
+        """获取判断统计，accuracy 为已评估判断中正确的比例"""
+        with self.lock:
+            stats = dict(self.stats)
+            stats['reasons'] = dict(self.reasons)
+        stats['accuracy'] = stats['correct'] / stats['judged'] if stats['judged'] else 0.0
+        return stats
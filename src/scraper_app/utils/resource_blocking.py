@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+浏览器资源拦截 - 通过DevTools协议（CDP）拦截图片、字体、媒体等资源和统计/广告域名，并统计被拦截的请求
+
+Chrome早已忽略 --disable-images / --disable-javascript 之类的启动参数；这里改用
+Network.setBlockedURLs 按URL模式拦截，被拦截的请求在性能日志中表现为带 blockedReason 的 Network.loadingFailed。
+"""
+
+import json
+from typing import Dict, Iterable, List, Optional
+
+from selenium.common.exceptions import WebDriverException
+
+# 资源类型 -> URL模式（CDP的URL模式只支持 * 通配符，分别匹配不带和带查询参数的URL）
+RESOURCE_TYPE_EXTENSIONS = {
+    'image': ['png', 'jpg', 'jpeg', 'gif', 'webp', 'avif', 'bmp', 'ico', 'svg'],
+    'font': ['woff', 'woff2', 'ttf', 'otf', 'eot'],
+    'media': ['mp4', 'webm', 'ogg', 'mp3', 'wav', 'm4a', 'flv', 'm3u8', 'ts'],
+    'stylesheet': ['css'],
+}
+
+def blocked_url_patterns(resource_types: Iterable[str], domains: Iterable[str]) -> List[str]:
+    """根据资源类型和域名生成 Network.setBlockedURLs 的URL模式"""
+    patterns = []
+    for resource_type in resource_types:
+        for extension in RESOURCE_TYPE_EXTENSIONS.get(resource_type, ()):
+            patterns.extend([f'*.{extension}', f'*.{extension}?*'])
+    for domain in domains:
+        patterns.extend([f'*://{domain}/*', f'*://*.{domain}/*'])
+    return patterns
+
+def configure_blocking_options(chrome_options, resource_types: Iterable[str]):
+    """设置启动选项：用内容设置禁止加载图片，并打开网络性能日志以统计拦截的请求"""
+    if 'image' in resource_types:
+        chrome_options.add_experimental_option('prefs', {'profile.managed_default_content_settings.images': 2})
+    chrome_options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+    chrome_options.add_experimental_option('perfLoggingPrefs', {'enableNetwork': True, 'enablePage': False})
+
+def enable_resource_blocking(driver, patterns: List[str]) -> bool:
+    """在驱动上启用URL拦截，对之后的所有页面生效；驱动不支持CDP时返回False"""
+    if not patterns:
+        return True
+    try:
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': patterns})
+        return True
+    except (AttributeError, WebDriverException):
+        return False
+
+def collect_network_stats(driver) -> Optional[Dict]:
+    """读取并清空性能日志，返回上次读取以来的请求数、被拦截的请求数（按资源类型）和接收字节数
+
+    未打开性能日志的驱动返回None。
+    """
+    try:
+        entries = driver.get_log('performance')
+    except (AttributeError, WebDriverException):
+        return None
+
+    stats = {'requests': 0, 'blocked': 0, 'blocked_by_type': {}, 'bytes_received': 0}
+    for entry in entries:
+        try:
+            message = json.loads(entry['message'])['message']
+        except (KeyError, TypeError, ValueError):
+            continue
+        method, params = message.get('method'), message.get('params', {})
+        if method == 'Network.requestWillBeSent':
+            stats['requests'] += 1
+        elif method == 'Network.loadingFinished':
+            stats['bytes_received'] += int(params.get('encodedDataLength', 0))
+        elif method == 'Network.loadingFailed' and params.get('blockedReason'):
+            stats['blocked'] += 1
+            resource_type = params.get('type', 'Other')
+            stats['blocked_by_type'][resource_type] = stats['blocked_by_type'].get(resource_type, 0) + 1
+    return stats
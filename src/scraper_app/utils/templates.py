@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+域名提取模板 - 按爬虫和域名记录最近被采用的内容选择器，同一域名的后续页面先尝试该选择器
+"""
+
+import os
+import json
+import datetime
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+from scraper_app.utils.config import Config
+from scraper_app.utils.logger import get_logger
+
+class DomainTemplateStore:
+    """按 (爬虫, 域名) 学习的提取模板，保存为JSON文件
+
+    - 页面成功提取且该域名还没有模板时，把采用的选择器记为模板
+    - 每次使用模板都记录是否命中（模板选择器的内容被采用），保留最近 window 次结果
+    - 样本不少于 min_samples 且命中率低于 min_success_rate 时删除模板，之后重新学习
+    """
+
+    def __init__(self, path: Path, window: int, min_samples: int, min_success_rate: float):
+        self.logger = get_logger(__name__)
+        self.path = Path(path)
+        self.window = window
+        self.min_samples = min_samples
+        self.min_success_rate = min_success_rate
+        self.lock = threading.Lock()
+        self.templates: Dict[str, Dict[str, Dict]] = {}
+        self.stats = {'template_hits': 0, 'template_misses': 0, 'learned': 0, 'invalidated': 0}
+        self.dirty = False
+        self._load()
+
+    @staticmethod
+    def domain_of(url: str) -> str:
+        return urlparse(url).netloc.lower()
+
+    def _load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.templates = json.load(f)
+            self.logger.info(f"已加载提取模板: {sum(len(v) for v in self.templates.values())}个")
+        except FileNotFoundError:
+            self.templates = {}
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"提取模板文件无法读取，重新学习: {e}")
+            self.templates = {}
+
+    def lookup(self, scraper_name: str, url: str) -> Optional[str]:
+        """返回该域名的模板选择器"""
+        with self.lock:
+            entry = self.templates.get(scraper_name, {}).get(self.domain_of(url))
+            return entry['selector'] if entry else None
+
+    def record(self, scraper_name: str, url: str, template: Optional[str], selector: Optional[str], success: bool):
+        """记录一次提取结果
+
+        Args:
+            template: 本次提取时使用的模板（没有模板为None）
+            selector: 本次正文采用的选择器
+            success: 页面是否提取成功
+        """
+        domain = self.domain_of(url)
+        with self.lock:
+            entries = self.templates.setdefault(scraper_name, {})
+            entry = entries.get(domain)
+
+            if template is not None and entry is not None and entry['selector'] == template:
+                hit = success and selector == template
+                entry['recent'] = (entry['recent'] + [1 if hit else 0])[-self.window:]
+                entry['uses'] += 1
+                self.stats['template_hits' if hit else 'template_misses'] += 1
+                recent = entry['recent']
+                if len(recent) >= self.min_samples and sum(recent) / len(recent) < self.min_success_rate:
+                    del entries[domain]
+                    self.stats['invalidated'] += 1
+                    self.logger.info(f"提取模板失效: [{scraper_name}] {domain} {template} (最近命中率{sum(recent) / len(recent):.0%})")
+                self.dirty = True
+
+            elif entry is None and success and selector:
+                entries[domain] = {
+                    'selector': selector,
+                    'recent': [],
+                    'uses': 0,
+                    'learned_at': datetime.datetime.now().isoformat()
+                }
+                self.stats['learned'] += 1
+                self.logger.debug(f"学习提取模板: [{scraper_name}] {domain} -> {selector}")
+                self.dirty = True
+
+    def save(self):
+        """写回模板文件（先写临时文件再替换）"""
+        with self.lock:
+            if not self.dirty:
+                return
+            data = json.dumps(self.templates, ensure_ascii=False, indent=2)
+            self.dirty = False
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix('.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(data)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            self.logger.error(f"保存提取模板失败: {e}")
+
+    def get_stats(self) -> Dict[str, int]:
+        """获取模板统计"""
+        with self.lock:
+            stats = dict(self.stats)
+            stats['templates'] = sum(len(v) for v in self.templates.values())
+            return stats
+
+_template_store = None
+_template_store_lock = threading.Lock()
+
+def get_template_store() -> DomainTemplateStore:
+    """获取全局共享的提取模板"""
+    global _template_store
+    with _template_store_lock:
+        if _template_store is None:
+            _template_store = DomainTemplateStore(
+                path=Config.TEMPLATE_FILE,
+                window=Config.TEMPLATE_WINDOW,
+                min_samples=Config.TEMPLATE_MIN_SAMPLES,
+                min_success_rate=Config.TEMPLATE_MIN_SUCCESS_RATE
+            )
+        return _template_store
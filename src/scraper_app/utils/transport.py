@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+共享传输层 - 所有爬虫共用的连接池、重试策略、DNS缓存和超时配置
+"""
+
+import time
+import socket
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import NameResolutionError, NewConnectionError
+from urllib3.util.connection import allowed_gai_family
+from urllib3.util.retry import Retry
+from urllib3.util.ssl_ import is_ipaddress
+
+from scraper_app.utils.config import Config
+from scraper_app.utils.logger import get_logger
+
+DEFAULT_HEADERS = {
+    'User-Agent': Config.DEFAULT_USER_AGENT,
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+    'Accept-Encoding': 'gzip, deflate',
+    'Connection': 'keep-alive',
+}
+
+class CappedRetry(Retry):
+    """按Retry-After等待，但最多等待 max_retry_after 秒
+
+    urllib3按响应头的原值休眠，服务器返回 Retry-After: 3600 会让下载线程阻塞一小时。
+    """
+
+    def __init__(self, *args, max_retry_after: float = Config.TRANSPORT_MAX_RETRY_AFTER, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.max_retry_after = max_retry_after
+
+    def new(self, **kwargs) -> 'CappedRetry':
+        # urllib3每次重试都用new()复制一份，需要带上等待上限
+        retry = super().new(**kwargs)
+        retry.max_retry_after = self.max_retry_after
+        return retry
+
+    def get_retry_after(self, response) -> Optional[float]:
+        retry_after = super().get_retry_after(response)
+        if retry_after is None:
+            return None
+        return min(retry_after, self.max_retry_after)
+
+class PoolStats:
+    """连接池统计：每次取连接记为一次checkout，需要新建连接时记为一次miss"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.checkouts = 0
+        self.new_connections = 0
+
+    def count(self, field: str):
+        with self.lock:
+            setattr(self, field, getattr(self, field) + 1)
+
+    def snapshot(self) -> Dict[str, int]:
+        with self.lock:
+            return {
+                'pool_hits': self.checkouts - self.new_connections,
+                'pool_misses': self.new_connections,
+            }
+
+pool_stats = PoolStats()
+
+class DnsCache:
+    """传输层连接使用的DNS缓存，按TTL过期，最多保留 max_entries 个主机（LRU），只缓存成功的解析结果
+
+    只作用于传输层自己的连接（CachedDnsHTTPConnection / CachedDnsHTTPSConnection），
+    不替换 socket.getaddrinfo，Redis、Selenium等其他库的解析不受影响。
+    """
+
+    def __init__(self, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max(1, max_entries)
+        self.lock = threading.Lock()
+        self.entries: 'OrderedDict[tuple, tuple]' = OrderedDict()  # (主机, 端口) -> (过期时间, 地址列表)
+        self.stats = {'dns_hits': 0, 'dns_misses': 0}
+
+    def install(self):
+        """让传输层的连接使用该缓存解析主机名"""
+        CachedDnsConnectionMixin.dns_cache = self
+
+    def uninstall(self):
+        """传输层的连接恢复为每次解析，并清空缓存"""
+        if CachedDnsConnectionMixin.dns_cache is self:
+            CachedDnsConnectionMixin.dns_cache = None
+        with self.lock:
+            self.entries.clear()
+
+    def resolve(self, host: str, port: int) -> List[str]:
+        """返回主机的地址列表（按解析结果的顺序去重）"""
+        key = (host, port)
+        now = time.time()
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry and entry[0] > now:
+                self.entries.move_to_end(key)
+                self.stats['dns_hits'] += 1
+                return entry[1]
+            self.stats['dns_misses'] += 1
+
+        infos = socket.getaddrinfo(host, port, allowed_gai_family(), socket.SOCK_STREAM)
+        addresses = list(dict.fromkeys(info[4][0] for info in infos))
+        with self.lock:
+            self.entries[key] = (now + self.ttl, addresses)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        return addresses
+
+    def get_stats(self) -> Dict[str, int]:
+        with self.lock:
+            stats = dict(self.stats)
+            stats['dns_entries'] = len(self.entries)
+            return stats
+
+class CachedDnsConnectionMixin:
+    """新建连接时从DNS缓存取地址，依次尝试，直到连接成功"""
+
+    dns_cache: Optional[DnsCache] = None  # 由 DnsCache.install() 设置
+
+    def _new_conn(self):
+        cache = self.dns_cache
+        if cache is None or is_ipaddress(self._dns_host):
+            return super()._new_conn()
+        try:
+            addresses = cache.resolve(self._dns_host, self.port)
+        except socket.gaierror as e:
+            raise NameResolutionError(self.host, self, e) from e
+
+        # 只替换连接使用的地址，TLS的SNI和证书校验仍使用原主机名
+        dns_host = self._dns_host
+        error = None
+        try:
+            for address in addresses:
+                self._dns_host = address
+                try:
+                    return super()._new_conn()
+                except NewConnectionError as e:
+                    error = e
+        finally:
+            self._dns_host = dns_host
+        raise error
+
+class CachedDnsHTTPConnection(CachedDnsConnectionMixin, HTTPConnection):
+    pass
+
+class CachedDnsHTTPSConnection(CachedDnsConnectionMixin, HTTPSConnection):
+    pass
+
+class CountingHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = CachedDnsHTTPConnection
+
+    def _get_conn(self, timeout=None):
+        pool_stats.count('checkouts')
+        return super()._get_conn(timeout)
+
+    def _new_conn(self):
+        pool_stats.count('new_connections')
+        return super()._new_conn()
+
+class CountingHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = CachedDnsHTTPSConnection
+
+    def _get_conn(self, timeout=None):
+        pool_stats.count('checkouts')
+        return super()._get_conn(timeout)
+
+    def _new_conn(self):
+        pool_stats.count('new_connections')
+        return super()._new_conn()
+
+class PooledAdapter(HTTPAdapter):
+    """统计连接复用情况、并使用传输层DNS缓存的HTTPAdapter"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': CountingHTTPConnectionPool,
+            'https': CountingHTTPSConnectionPool,
+        }
+
+class Transport:
+    """所有爬虫共享的HTTP传输层
+
+    - 一个HTTPAdapter挂载到所有会话上，连接池（每主机 pool_maxsize 个连接）在爬虫和任务之间共享，保持keep-alive复用
+    - 连接失败、429和5xx按指数退避重试，Retry-After的等待时间有上限
+    - 连接超时和读取超时分开配置
+    - 传输层的连接使用有上限的DNS缓存
+
+    scraper_app 和 worker_service 共用这一实现，各自按自己的配置创建实例。
+    """
+
+    def __init__(self, pool_maxsize: int, connect_timeout: float, read_timeout: float,
+                 retries: int, dns_ttl: float, pool_hosts: int = Config.TRANSPORT_POOL_HOSTS,
+                 max_retry_after: float = Config.TRANSPORT_MAX_RETRY_AFTER,
+                 dns_max_entries: int = Config.DNS_CACHE_MAX_ENTRIES):
+        self.logger = get_logger(__name__)
+        self.timeout = (connect_timeout, read_timeout)
+        retry = CappedRetry(
+            total=retries,
+            connect=retries,
+            read=1,
+            status=retries,
+            backoff_factor=0.5,
+            status_forcelist=[429, 500, 502, 503, 504],
+            allowed_methods=frozenset(['GET', 'HEAD']),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+            max_retry_after=max_retry_after
+        )
+        self.adapter = PooledAdapter(
+            pool_connections=pool_hosts,
+            pool_maxsize=pool_maxsize,
+            max_retries=retry
+        )
+        self.dns_cache: Optional[DnsCache] = None
+        if dns_ttl > 0:
+            self.dns_cache = DnsCache(dns_ttl, dns_max_entries)
+            self.dns_cache.install()
+
+        self.logger.info(f"传输层已初始化: 每主机连接池{pool_maxsize}, 超时{self.timeout}, 重试{retries}次, DNS缓存{dns_ttl}秒")
+
+    def create_session(self, headers: Optional[Dict[str, str]] = None) -> requests.Session:
+        """创建使用共享连接池的会话，headers会覆盖默认请求头"""
+        session = requests.Session()
+        session.headers.update(DEFAULT_HEADERS)
+        if headers:
+            session.headers.update(headers)
+        session.mount('http://', self.adapter)
+        session.mount('https://', self.adapter)
+        return session
+
+    def close(self):
+        """关闭连接池，并停止使用DNS缓存"""
+        self.adapter.close()
+        if self.dns_cache:
+            self.dns_cache.uninstall()
+
+    def get_stats(self) -> Dict[str, int]:
+        """获取连接池和DNS缓存统计"""
+        stats = pool_stats.snapshot()
+        if self.dns_cache:
+            stats.update(self.dns_cache.get_stats())
+        return stats
+
+_transport = None
+_transport_lock = threading.Lock()
+
+def get_transport() -> Transport:
+    """获取全局共享的传输层实例"""
+    global _transport
+    with _transport_lock:
+        if _transport is None:
+            _transport = Transport(
+                pool_maxsize=Config.TRANSPORT_POOL_MAXSIZE,
+                connect_timeout=Config.CONNECT_TIMEOUT,
+                read_timeout=Config.READ_TIMEOUT,
+                retries=Config.TRANSPORT_RETRIES,
+                dns_ttl=Config.DNS_CACHE_TTL
+            )
+        return _transport
@@ -0,0 +1,133 @@
+"""
+请求合并（single-flight）- 同一URL正在被下载时，后来的请求等待并共享下载到的页面字节
+"""
+
+import time
+import uuid
+import hashlib
+import logging
+import threading
+from typing import Callable, Dict, Optional
+
+import redis
+
+from config import Config
+from redis_client import normalize_url
+
+logger = logging.getLogger(__name__)
+
+# 只释放自己持有的租约，避免删除其他worker在租约过期后重新获取的租约
+RELEASE_LEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+class SingleFlight:
+    """基于Redis租约的跨worker下载合并
+
+    合并发生在下载层，适配器和竞速模式的下载都经过这里。获取到 inflight:{下载方式}:{URL摘要}
+    租约的请求负责下载，并把页面字节写入 inflight_result:{下载方式}:{URL摘要}；其他请求
+    （包括同一worker内的其他线程）轮询等待该结果，再各自提取。租约超时或持有者下载失败时，
+    等待者会重新竞争租约。
+    """
+
+    def __init__(self):
+        self._redis: Optional[redis.Redis] = None
+        self._release_script = None
+        self.lock = threading.Lock()
+        self.stats = {'leader': 0, 'coalesced': 0, 'wait_timeouts': 0}
+
+    def _get_redis(self) -> Optional[redis.Redis]:
+        """延迟创建Redis连接，Redis不可用时退化为直接下载"""
+        if self._redis is None:
+            try:
+                client = redis.Redis(
+                    host=Config.REDIS_HOST,
+                    port=Config.REDIS_PORT,
+                    db=Config.REDIS_DB
+                )
+                client.ping()
+                self._release_script = client.register_script(RELEASE_LEASE_SCRIPT)
+                self._redis = client
+            except redis.RedisError as e:
+                logger.warning(f"请求合并不可用，Redis连接失败: {e}")
+                return None
+        return self._redis
+
+    def _count(self, key: str):
+        with self.lock:
+            self.stats[key] += 1
+
+    def run(self, url: str, kind: str, fetch: Callable[[], bytes]) -> bytes:
+        """合并执行对同一URL的同种下载，kind 区分下载方式（完整页面、只读到</head>等）"""
+        client = self._get_redis() if Config.COALESCE_ENABLED else None
+        if client is None:
+            return fetch()
+
+        digest = hashlib.sha1(normalize_url(url).encode('utf-8')).hexdigest()
+        lease_key = f'inflight:{kind}:{digest}'
+        result_key = f'inflight_result:{kind}:{digest}'
+        deadline = time.time() + Config.COALESCE_WAIT_TIMEOUT
+
+        try:
+            while True:
+                token = str(uuid.uuid4())
+                if client.set(lease_key, token, nx=True, px=Config.COALESCE_LEASE_SECONDS * 1000):
+                    self._count('leader')
+                    try:
+                        content = fetch()
+                        self._publish(client, result_key, content)
+                        return content
+                    finally:
+                        self._release(lease_key, token)
+
+                content = self._wait_for_result(client, lease_key, result_key, deadline)
+                if content is not None:
+                    self._count('coalesced')
+                    logger.info(f"[{kind}] 合并到正在进行的下载: {url}")
+                    return content
+
+                if time.time() >= deadline:
+                    self._count('wait_timeouts')
+                    logger.warning(f"[{kind}] 等待合并下载超时，直接下载: {url}")
+                    return fetch()
+
+        except redis.RedisError as e:
+            logger.warning(f"请求合并出错，直接下载: {url} - {e}")
+            return fetch()
+
+    def _publish(self, client: redis.Redis, result_key: str, content: bytes):
+        """写入共享的页面字节，失败时等待者会在租约释放后自行下载"""
+        try:
+            client.setex(result_key, Config.COALESCE_RESULT_TTL, content)
+        except redis.RedisError as e:
+            logger.warning(f"写入请求合并结果失败: {result_key} - {e}")
+
+    def _release(self, lease_key: str, token: str):
+        """释放租约，失败时等待租约自然过期"""
+        try:
+            self._release_script(keys=[lease_key], args=[token])
+        except redis.RedisError as e:
+            logger.warning(f"释放请求合并租约失败: {lease_key} - {e}")
+
+    def _wait_for_result(self, client: redis.Redis, lease_key: str, result_key: str, deadline: float) -> Optional[bytes]:
+        """等待租约持有者写入页面字节；租约消失或超时时返回None"""
+        while time.time() < deadline:
+            value = client.get(result_key)
+            if value is not None:
+                return value
+            if not client.exists(lease_key):
+                # 租约已释放，最后再确认一次结果是否刚写入
+                return client.get(result_key)
+            time.sleep(Config.COALESCE_POLL_INTERVAL)
+        return None
+
+    def get_stats(self) -> Dict[str, int]:
+        """获取请求合并统计"""
+        with self.lock:
+            return dict(self.stats)
+
+# 创建全局请求合并实例
+single_flight = SingleFlight()
@@ -1,4 +1,5 @@
 import os
+import json
 from enum import Enum
 from dotenv import load_dotenv
 
@@ -21,6 +22,66 @@ class Config:
     MAX_WORKERS = int(os.getenv('MAX_WORKERS', 5))  # 最大并发工作线程数
     POLL_INTERVAL = int(os.getenv('POLL_INTERVAL', 5))  # 秒
     URL_CONCURRENT_LIMIT = int(os.getenv('URL_CONCURRENT_LIMIT', 10))  # URL并发爬取限制
+    RACE_URL_TIMEOUT = int(os.getenv('RACE_URL_TIMEOUT', 45))  # 竞速模式下单个URL的截止时间（秒）
+    
+    # 传输层配置（所有爬虫共享连接池；对冲时同一URL可能有两个请求，连接数按并发的两倍）
+    TRANSPORT_POOL_MAXSIZE = int(os.getenv('TRANSPORT_POOL_MAXSIZE', URL_CONCURRENT_LIMIT * 2))  # 每个主机的连接数
+    TRANSPORT_POOL_HOSTS = int(os.getenv('TRANSPORT_POOL_HOSTS', 100))  # 缓存连接池的主机数
+    TRANSPORT_RETRIES = int(os.getenv('TRANSPORT_RETRIES', 2))
+    TRANSPORT_MAX_RETRY_AFTER = float(os.getenv('TRANSPORT_MAX_RETRY_AFTER', 5))  # 按Retry-After等待的上限（秒）
+    CONNECT_TIMEOUT = float(os.getenv('CONNECT_TIMEOUT', 10))
+    READ_TIMEOUT = float(os.getenv('READ_TIMEOUT', 30))
+    DNS_CACHE_TTL = float(os.getenv('DNS_CACHE_TTL', 300))  # 0表示不缓存
+    DNS_CACHE_MAX_ENTRIES = int(os.getenv('DNS_CACHE_MAX_ENTRIES', 1000))  # 缓存的主机数上限，超过时淘汰最久未用的
+    
+    # 下载限制配置（流式读取，超过上限即停止）
+    MAX_CONTENT_BYTES = int(os.getenv('MAX_CONTENT_BYTES', 5 * 1024 * 1024))
+    DOWNLOAD_CHUNK_SIZE = int(os.getenv('DOWNLOAD_CHUNK_SIZE', 64 * 1024))
+    ALLOWED_CONTENT_TYPES = [
+        t.strip().lower() for t in
+        os.getenv('ALLOWED_CONTENT_TYPES', 'text/html,application/xhtml+xml,text/plain').split(',') if t.strip()
+    ]
+    
+    # 增量解析配置（region模式边下载边解析，最高优先级的正文区域结束后停止下载）
+    STREAM_EXTRACT_ENABLED = os.getenv('STREAM_EXTRACT_ENABLED', 'true').lower() == 'true'
+    
+    # 解析进程池配置（下载在线程中进行，CPU密集的提取交给进程池；0表示在下载线程中直接提取）
+    EXTRACT_PROCESSES = int(os.getenv('EXTRACT_PROCESSES', os.cpu_count() or 1))
+    EXTRACT_QUEUE_SIZE = int(os.getenv('EXTRACT_QUEUE_SIZE', EXTRACT_PROCESSES * 2))  # 排队中的提取任务上限
+    EXTRACT_START_METHOD = os.getenv('EXTRACT_START_METHOD', 'spawn')
+    
+    # 提取结果缓存配置（按页面内容哈希缓存，本地LRU + 可选Redis）
+    EXTRACTION_CACHE_MAX_ENTRIES = int(os.getenv('EXTRACTION_CACHE_MAX_ENTRIES', 2000))  # 0表示不使用本地缓存
+    EXTRACTION_CACHE_REDIS_ENABLED = os.getenv('EXTRACTION_CACHE_REDIS_ENABLED', 'true').lower() == 'true'
+    EXTRACTION_CACHE_TTL = int(os.getenv('EXTRACTION_CACHE_TTL', 7 * 24 * 3600))  # Redis条目保留时间（秒）
+    
+    # HTML解析后端（默认html.parser，lxml需显式开启），可用 PARSER_BACKEND_<爬虫名> 单独指定
+    PARSER_BACKEND = os.getenv('PARSER_BACKEND', 'html.parser')
+    
+    # 对冲请求配置
+    HEDGE_ENABLED = os.getenv('HEDGE_ENABLED', 'true').lower() == 'true'
+    HEDGE_PERCENTILE = float(os.getenv('HEDGE_PERCENTILE', 0.9))  # 超过该域名延迟分位数时启动备用提取器
+    HEDGE_MIN_SAMPLES = int(os.getenv('HEDGE_MIN_SAMPLES', 10))  # 样本不足时使用默认等待时间
+    HEDGE_DEFAULT_DELAY = float(os.getenv('HEDGE_DEFAULT_DELAY', 5))  # 秒
+    HEDGE_BACKUP_SCRAPER = os.getenv('HEDGE_BACKUP_SCRAPER', 'readability')
+    
+    # 请求合并配置（同一URL同时只下载一次）
+    COALESCE_ENABLED = os.getenv('COALESCE_ENABLED', 'true').lower() == 'true'
+    COALESCE_LEASE_SECONDS = int(os.getenv('COALESCE_LEASE_SECONDS', 60))  # 租约时长，需大于单个URL的下载耗时
+    COALESCE_WAIT_TIMEOUT = int(os.getenv('COALESCE_WAIT_TIMEOUT', 60))  # 等待其他请求下载完成的上限（秒）
+    COALESCE_RESULT_TTL = int(os.getenv('COALESCE_RESULT_TTL', 30))  # 共享页面字节的保留时间（秒）
+    COALESCE_POLL_INTERVAL = float(os.getenv('COALESCE_POLL_INTERVAL', 0.2))  # 秒
+    
+    # 域名限速配置（所有worker副本共享的Redis令牌桶）
+    RATE_LIMIT_ENABLED = os.getenv('RATE_LIMIT_ENABLED', 'true').lower() == 'true'
+    RATE_LIMIT_DEFAULT_RATE = float(os.getenv('RATE_LIMIT_DEFAULT_RATE', 5))  # 每秒请求数
+    RATE_LIMIT_DEFAULT_BURST = float(os.getenv('RATE_LIMIT_DEFAULT_BURST', 10))
+    RATE_LIMIT_MAX_WAIT = float(os.getenv('RATE_LIMIT_MAX_WAIT', 30))  # 单次请求最长等待（秒）
+    # 按域名后缀配置，例如 {"sohu.com": {"rate": 1, "burst": 3}}
+    DOMAIN_RATE_LIMITS = json.loads(os.getenv('DOMAIN_RATE_LIMITS', json.dumps({
+        'mp.weixin.qq.com': {'rate': 0.5, 'burst': 2},
+        'sohu.com': {'rate': 1, 'burst': 3},
+    })))
     
     # 日志配置
     LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
@@ -34,6 +95,15 @@ class Config:
     # 结果配置
     RESULT_EXPIRE_HOURS = 24
     
+    # URL结果缓存配置（跨任务复用已爬取的结果）
+    URL_CACHE_ENABLED = os.getenv('URL_CACHE_ENABLED', 'true').lower() == 'true'
+    URL_CACHE_TTL_SECONDS = int(os.getenv('URL_CACHE_TTL_SECONDS', 3600))
+    
     # 错误重试配置
     MAX_RETRY_COUNT = 3
-    RETRY_DELAY_SECONDS = 30
\ No newline at end of file
+    RETRY_DELAY_SECONDS = 30
+    
+    @classmethod
+    def parser_backend(cls, scraper_name: str) -> str:
+        """获取指定爬虫使用的HTML解析后端"""
+        return os.getenv(f'PARSER_BACKEND_{scraper_name.upper()}', cls.PARSER_BACKEND)
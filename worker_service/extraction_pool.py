@@ -0,0 +1,100 @@
+"""
+解析进程池 - 下载在I/O线程中进行，CPU密集的HTML提取交给多进程执行，绕开GIL
+"""
+
+import asyncio
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+class ExtractionPool:
+    """有界的提取进程池
+
+    - 进程数默认等于CPU核数，EXTRACT_PROCESSES=0 时在调用线程中直接提取
+    - 同时排队/执行的提取任务最多 EXTRACT_QUEUE_SIZE 个，超过时下载线程阻塞等待，形成背压
+    - 子进程使用spawn启动，避免在多线程的worker进程中fork
+    """
+
+    def __init__(self, processes: int, queue_size: int):
+        self.processes = processes
+        self.queue_size = max(1, queue_size)
+        self.enabled = processes > 0
+        self._slots = threading.BoundedSemaphore(self.queue_size)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self.lock = threading.Lock()
+        self.stats = {'submitted': 0, 'inline': 0, 'broken': 0}
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self.lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.processes,
+                    mp_context=multiprocessing.get_context(Config.EXTRACT_START_METHOD)
+                )
+                logger.info(f"解析进程池已启动: {self.processes}个进程, 队列上限{self.queue_size}")
+            return self._executor
+
+    def _count(self, key: str):
+        with self.lock:
+            self.stats[key] += 1
+
+    def _run_inline(self, fn: Callable, *args) -> Future:
+        self._count('inline')
+        future = Future()
+        try:
+            future.set_result(fn(*args))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def submit(self, fn: Callable, *args) -> Future:
+        """提交提取任务，队列已满时阻塞；fn和参数必须可以pickle"""
+        if not self.enabled:
+            return self._run_inline(fn, *args)
+
+        self._slots.acquire()
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except (BrokenProcessPool, RuntimeError) as e:
+            # 子进程异常退出后进程池不可再用，重建进程池，本次在当前线程提取
+            self._slots.release()
+            self._count('broken')
+            logger.error(f"解析进程池不可用，重建进程池: {e}")
+            with self.lock:
+                self._executor = None
+            return self._run_inline(fn, *args)
+
+        self._count('submitted')
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def run(self, fn: Callable, *args) -> Any:
+        """提交提取任务并等待结果（等待期间不占用GIL）"""
+        return self.submit(fn, *args).result()
+
+    async def run_async(self, fn: Callable, *args) -> Any:
+        """异步等待提取结果；排队等待放在线程中进行，不阻塞事件循环"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.run, fn, *args)
+
+    def shutdown(self):
+        """关闭进程池"""
+        with self.lock:
+            executor, self._executor = self._executor, None
+        if executor:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def get_stats(self) -> Dict[str, int]:
+        """获取提取统计"""
+        with self.lock:
+            return dict(self.stats)
+
+# 创建全局解析进程池实例
+extraction_pool = ExtractionPool(Config.EXTRACT_PROCESSES, Config.EXTRACT_QUEUE_SIZE)
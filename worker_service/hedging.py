@@ -0,0 +1,152 @@
+"""
+对冲请求策略 - 主爬虫超过域名延迟分位数仍未完成时，启动一个备用提取器
+"""
+
+import time
+import bisect
+import logging
+import threading
+from typing import Dict, Optional, Any
+from urllib.parse import urlparse
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from config import Config
+from simple_scrapers import scrape_with_scraper
+from parsing import PARSE_FULL
+
+logger = logging.getLogger(__name__)
+
+class LatencyHistogram:
+    """固定分桶的延迟直方图（单位：秒）"""
+
+    BUCKETS = [0.1, 0.25, 0.5, 1, 2, 3, 5, 8, 13, 20, 30, 45, 60]
+
+    def __init__(self):
+        self.counts = [0] * (len(self.BUCKETS) + 1)  # 最后一个桶记录超过60秒的请求
+        self.total = 0
+        self.lock = threading.Lock()
+
+    def record(self, seconds: float):
+        """记录一次请求耗时"""
+        index = bisect.bisect_left(self.BUCKETS, seconds)
+        with self.lock:
+            self.counts[index] += 1
+            self.total += 1
+
+    def percentile(self, p: float) -> Optional[float]:
+        """估算第p分位的延迟，返回所在桶的上界；没有样本时返回None"""
+        with self.lock:
+            if self.total == 0:
+                return None
+            target = p * self.total
+            cumulative = 0
+            for index, count in enumerate(self.counts):
+                cumulative += count
+                if cumulative >= target:
+                    return self.BUCKETS[min(index, len(self.BUCKETS) - 1)]
+        return self.BUCKETS[-1]
+
+    def snapshot(self) -> Dict[str, int]:
+        """导出直方图，键为桶上界"""
+        with self.lock:
+            labels = [f"<={b}s" for b in self.BUCKETS] + [f">{self.BUCKETS[-1]}s"]
+            return {label: count for label, count in zip(labels, self.counts) if count}
+
+class HedgingPolicy:
+    """对冲策略：先启动主爬虫，超过域名延迟分位数后再启动一个备用提取器，取先返回的成功结果"""
+
+    def __init__(self):
+        self.percentile = Config.HEDGE_PERCENTILE
+        self.min_samples = Config.HEDGE_MIN_SAMPLES
+        self.default_delay = Config.HEDGE_DEFAULT_DELAY
+        self.backup_scraper = Config.HEDGE_BACKUP_SCRAPER
+        self.histograms: Dict[str, LatencyHistogram] = {}
+        self.lock = threading.Lock()
+        # 所有任务的主请求和备用请求都在这个线程池中执行，按同时处理的任务数 × URL并发的两倍分配线程，
+        # 满负载时也不需要排队
+        self.executor = ThreadPoolExecutor(max_workers=Config.MAX_WORKERS * Config.URL_CONCURRENT_LIMIT * 2)
+        self.stats = {'requests': 0, 'hedged': 0, 'backup_wins': 0}
+
+    @staticmethod
+    def latency_key(url: str, parse_mode: str = PARSE_FULL) -> str:
+        """延迟直方图的键：域名，部分解析的延迟与完整解析分开统计"""
+        domain = urlparse(url).netloc.lower()
+        return domain if parse_mode == PARSE_FULL else f"{domain}:{parse_mode}"
+
+    def _histogram(self, key: str) -> LatencyHistogram:
+        """获取（必要时创建）键对应的直方图"""
+        with self.lock:
+            if key not in self.histograms:
+                self.histograms[key] = LatencyHistogram()
+            return self.histograms[key]
+
+    def hedge_delay(self, key: str) -> float:
+        """计算对冲等待时间，样本不足时使用默认值"""
+        histogram = self._histogram(key)
+        if histogram.total < self.min_samples:
+            return self.default_delay
+        return histogram.percentile(self.percentile)
+
+    def _run_primary(self, url: str, scraper_type: str, key: str, parse_mode: str,
+                     started: threading.Event) -> Dict[str, Any]:
+        """执行主爬虫：开始执行时通知调用方开始计时，只记录成功请求的延迟"""
+        started.set()
+        start_time = time.time()
+        result = scrape_with_scraper(url, scraper_type, parse_mode)
+        if result.get('success', False):
+            self._histogram(key).record(time.time() - start_time)
+        return result
+
+    def _count(self, key: str):
+        with self.lock:
+            self.stats[key] += 1
+
+    def scrape(self, url: str, primary: str, backup: Optional[str] = None, parse_mode: str = PARSE_FULL) -> Dict[str, Any]:
+        """对冲爬取单个URL"""
+        backup = backup or self.backup_scraper
+        key = self.latency_key(url, parse_mode)
+        self._count('requests')
+
+        started = threading.Event()
+        primary_future = self.executor.submit(self._run_primary, url, primary, key, parse_mode, started)
+        if backup == primary:
+            return primary_future.result()
+
+        # 从主爬虫真正开始执行时计时，在线程池中排队的时间不计入对冲等待
+        delay = self.hedge_delay(key)
+        started.wait()
+        done, _ = wait([primary_future], timeout=delay)
+        if done:
+            return primary_future.result()
+
+        logger.info(f"[{primary}] 超过{delay}秒未完成，启动备用提取器[{backup}]: {url}")
+        self._count('hedged')
+        # 备用请求自己重新下载，不合并到主爬虫可能正慢着的下载
+        backup_future = self.executor.submit(scrape_with_scraper, url, backup, parse_mode, False)
+
+        # 取先返回的成功结果；两者都失败时返回主爬虫的结果
+        pending = {primary_future, backup_future}
+        failures = {}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                result = future.result()
+                if result.get('success', False):
+                    if future is backup_future:
+                        self._count('backup_wins')
+                        logger.info(f"🎯 备用提取器[{backup}]率先完成: {url}")
+                    return result
+                failures[future] = result
+
+        return failures.get(primary_future) or failures[backup_future]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取对冲统计和各域名（按解析模式）的主爬虫成功延迟直方图"""
+        with self.lock:
+            stats = dict(self.stats)
+            histograms = list(self.histograms.items())
+        stats['histograms'] = {key: histogram.snapshot() for key, histogram in histograms}
+        return stats
+
+# 创建全局对冲策略实例
+hedging_policy = HedgingPolicy()
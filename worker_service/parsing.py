@@ -0,0 +1,401 @@
+"""
+HTML解析后端 - 统一创建BeautifulSoup树，可按爬虫切换 html.parser / lxml
+"""
+
+import re
+import json
+import logging
+import threading
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from bs4 import BeautifulSoup, FeatureNotFound
+from bs4.element import Tag
+import lxml.html
+from lxml import etree
+
+logger = logging.getLogger(__name__)
+
+Markup = Union[str, bytes]
+
+# 后端名称 -> 构造函数；默认html.parser，lxml需通过 PARSER_BACKEND 显式开启（基准测试中整体提速有限）
+PARSER_BACKENDS: Dict[str, Callable[[Markup], BeautifulSoup]] = {
+    'html.parser': lambda markup: BeautifulSoup(markup, 'html.parser'),
+    'lxml': lambda markup: BeautifulSoup(markup, 'lxml'),
+}
+
+DEFAULT_BACKEND = 'html.parser'
+
+_unavailable = set()
+_unavailable_lock = threading.Lock()
+
+def make_soup(markup: Markup, backend: str = DEFAULT_BACKEND) -> BeautifulSoup:
+    """使用指定后端解析HTML，后端不可用时退回html.parser"""
+    factory = PARSER_BACKENDS.get(backend)
+    if factory is None:
+        raise ValueError(f"不支持的解析后端: {backend}")
+
+    if backend not in _unavailable:
+        try:
+            return factory(markup)
+        except FeatureNotFound:
+            with _unavailable_lock:
+                _unavailable.add(backend)
+            logger.warning(f"解析后端 {backend} 不可用，退回 {DEFAULT_BACKEND}")
+
+    return PARSER_BACKENDS[DEFAULT_BACKEND](markup)
+
+# 只含标签名、#id、.class 的简单选择器，可以在一次遍历中直接匹配
+_SIMPLE_SELECTOR = re.compile(r'^(?P<tag>[a-zA-Z][\w-]*)?(?P<rest>(?:[#.][\w-]+)*)$')
+
+class SelectorPlan:
+    """编译后的选择器级联
+
+    原来的写法对每个候选选择器调用一次 select_one，每次都遍历整棵树。
+    SelectorPlan 把简单选择器（tag、.class、#id 及其组合）按 id/class/标签名建立索引，
+    一次遍历即可找到每个选择器在文档顺序中的第一个匹配，结果与逐个 select_one 相同。
+    含后代、属性等组合的复杂选择器仍交给 soupsieve 单独匹配。
+    """
+
+    def __init__(self, selectors: Iterable[str]):
+        self.selectors = list(selectors)
+        self._index: Dict[Tuple[str, str], List[Tuple[int, Optional[str], Optional[str], frozenset]]] = {}
+        self._complex: List[int] = []
+
+        for position, selector in enumerate(self.selectors):
+            match = _SIMPLE_SELECTOR.match(selector.strip())
+            if not match or not (match.group('tag') or match.group('rest')):
+                self._complex.append(position)
+                continue
+
+            tag = match.group('tag').lower() if match.group('tag') else None
+            ids = re.findall(r'#([\w-]+)', match.group('rest'))
+            classes = frozenset(re.findall(r'\.([\w-]+)', match.group('rest')))
+            if len(ids) > 1:
+                self._complex.append(position)
+                continue
+            element_id = ids[0] if ids else None
+
+            # 按最有区分度的部分建立索引：id > class > 标签名
+            if element_id:
+                key = ('id', element_id)
+            elif classes:
+                key = ('class', min(classes))
+            else:
+                key = ('tag', tag)
+            self._index.setdefault(key, []).append((position, tag, element_id, classes))
+
+        self._simple_count = len(self.selectors) - len(self._complex)
+
+    def match(self, root: Tag) -> List[Optional[Tag]]:
+        """返回每个选择器在 root 下的第一个匹配（按选择器顺序，未匹配为None）"""
+        found: List[Optional[Tag]] = [None] * len(self.selectors)
+        remaining = self._simple_count
+        index = self._index
+
+        if remaining:
+            for element in root.descendants:
+                if not isinstance(element, Tag):
+                    continue
+                candidates = list(index.get(('tag', element.name), ()))
+                element_id = element.get('id')
+                if element_id:
+                    candidates.extend(index.get(('id', element_id), ()))
+                element_classes = element.get('class') or ()
+                for class_name in element_classes:
+                    candidates.extend(index.get(('class', class_name), ()))
+
+                for position, tag, selector_id, classes in candidates:
+                    if found[position] is not None:
+                        continue
+                    if tag and element.name != tag:
+                        continue
+                    if selector_id and element_id != selector_id:
+                        continue
+                    if classes and not classes.issubset(element_classes):
+                        continue
+                    found[position] = element
+                    remaining -= 1
+
+                if remaining == 0:
+                    break
+
+        for position in self._complex:
+            found[position] = root.select_one(self.selectors[position])
+        return found
+
+    def iter_matches(self, root: Tag) -> Iterator[Tuple[str, Tag]]:
+        """按优先级产出 (选择器, 第一个匹配元素)，跳过未匹配的选择器"""
+        for selector, element in zip(self.selectors, self.match(root)):
+            if element is not None:
+                yield selector, element
+
+    def best(self, root: Tag, text_of: Callable[[Tag], str], min_length: int) -> Tuple[Optional[Tag], str]:
+        """返回优先级最高且文本长度超过 min_length 的匹配；都不够长时返回文本最长的匹配"""
+        best_element, best_text = None, ''
+        for _, element in self.iter_matches(root):
+            text = text_of(element)
+            if len(text) > min_length:
+                return element, text
+            if len(text) > len(best_text) or best_element is None:
+                best_element, best_text = element, text
+        return best_element, best_text
+
+# 解析模式（任务选项 parse_mode）：
+# full   - 完整解析整个页面（默认）
+# head   - 只解析 <head>，读到 </head> 即停止，返回标题、描述、Open Graph和JSON-LD
+# region - 用lxml定位候选正文区域，只提取该区域的文本，不构建完整的BeautifulSoup树
+PARSE_FULL = 'full'
+PARSE_HEAD = 'head'
+PARSE_REGION = 'region'
+PARSE_MODES = (PARSE_FULL, PARSE_HEAD, PARSE_REGION)
+
+BODY_SELECTOR = 'body'
+
+# <head> 结束位置：</head> 或 <body（部分页面省略</head>）
+_HEAD_END = re.compile(rb'</head\s*>|<body[\s>]', re.IGNORECASE)
+
+def head_end(content: bytes, start: int = 0) -> Optional[int]:
+    """返回 <head> 结束的字节位置，从 start 开始查找，页面中还没有出现时返回None"""
+    match = _HEAD_END.search(content, start)
+    if not match:
+        return None
+    return match.end() if match.group(0)[1:2] == b'/' else match.start()
+
+def _meta_content(element: Tag) -> str:
+    return (element.get('content') or '').strip()
+
+def parse_head(content: bytes, backend: str = DEFAULT_BACKEND) -> Dict:
+    """只解析 <head> 部分，返回 title/description/open_graph/json_ld"""
+    end = head_end(content)
+    soup = make_soup(content[:end] if end is not None else content, backend)
+    head = soup.find('head') or soup
+
+    title = head.find('title')
+    description = head.find('meta', attrs={'name': re.compile('^description$', re.IGNORECASE)})
+
+    open_graph = {}
+    for meta in head.find_all('meta', attrs={'property': re.compile('^(og|article):')}):
+        open_graph.setdefault(meta['property'], _meta_content(meta))
+
+    json_ld = []
+    for script in head.find_all('script', attrs={'type': 'application/ld+json'}):
+        try:
+            json_ld.append(json.loads(script.string or ''))
+        except ValueError:
+            logger.debug("忽略无法解析的JSON-LD")
+
+    return {
+        'title': title.get_text().strip() if title else '',
+        'description': _meta_content(description) if description else '',
+        'open_graph': open_graph,
+        'json_ld': json_ld,
+    }
+
+def publish_date_of(head: Dict) -> Optional[str]:
+    """从Open Graph或JSON-LD中取发布时间"""
+    published = head['open_graph'].get('article:published_time')
+    if published:
+        return published
+    for item in head['json_ld']:
+        for entry in (item if isinstance(item, list) else [item]):
+            if isinstance(entry, dict) and entry.get('datePublished'):
+                return str(entry['datePublished'])
+    return None
+
+def _selector_parts(selector: str) -> Optional[Tuple[Optional[str], List[str], List[str]]]:
+    """拆分简单选择器（tag、#id、.class 及其组合）为 (标签名, id列表, class列表)，复杂选择器返回None"""
+    match = _SIMPLE_SELECTOR.match(selector.strip())
+    if not match or not (match.group('tag') or match.group('rest')):
+        return None
+    tag = match.group('tag').lower() if match.group('tag') else None
+    return tag, re.findall(r'#([\w-]+)', match.group('rest')), re.findall(r'\.([\w-]+)', match.group('rest'))
+
+def _selector_xpath(selector: str) -> Optional[str]:
+    """把简单选择器转换为XPath，复杂选择器返回None"""
+    parts = _selector_parts(selector)
+    if parts is None:
+        return None
+    tag, ids, classes = parts
+    conditions = [f'@id="{element_id}"' for element_id in ids]
+    conditions += [f'contains(concat(" ", normalize-space(@class), " "), " {class_name} ")' for class_name in classes]
+    return f"//{tag or '*'}" + ''.join(f'[{condition}]' for condition in conditions)
+
+# 未声明编码时用于探测的字节数
+_SNIFF_BYTES = 2048
+_META_CHARSET = re.compile(rb'<meta[^>]+charset\s*=', re.IGNORECASE)
+
+def sniff_encoding(data: bytes, complete: bool = True) -> Optional[str]:
+    """页面中有<meta charset>时返回None交给libxml2识别，否则能按UTF-8解码就返回'utf-8'
+
+    libxml2在没有声明编码时按Latin-1解码，中文页面会变成乱码。complete 为False时
+    data只是页面开头，末尾可能截断了一个多字节字符。
+    """
+    if _META_CHARSET.search(data[:_SNIFF_BYTES]):
+        return None
+    try:
+        data.decode('utf-8')
+    except UnicodeDecodeError as e:
+        if complete or e.start < len(data) - 3:
+            return None
+    return 'utf-8'
+
+def parse_region(content: bytes, selectors: Iterable[str],
+                 drop_tags: Iterable[str] = ('script', 'style')) -> Tuple[Optional[str], str]:
+    """用lxml定位第一个匹配的候选正文区域，返回 (选择器, 区域文本)
+
+    lxml的C解析器只建立轻量的元素树，不创建BeautifulSoup对象；只有命中的区域会被取文本。
+    没有候选区域匹配时使用body。
+    """
+    root = lxml.html.fromstring(content, parser=lxml.html.HTMLParser(encoding=sniff_encoding(content)))
+    region, selector = None, None
+    for candidate in selectors:
+        xpath = _selector_xpath(candidate)
+        found = root.xpath(xpath) if xpath else []
+        if found:
+            region, selector = found[0], candidate
+            break
+    if region is None:
+        body = root.find('body')
+        region, selector = (body if body is not None else root), BODY_SELECTOR
+
+    for element in list(region.iter(*drop_tags)):
+        element.drop_tree()
+    return selector, region.text_content()
+
+def _text_without(element, drop_tags: frozenset) -> str:
+    """lxml元素的文本，跳过 drop_tags 中的标签及注释（保留其后的tail文本）"""
+    parts = []
+
+    def walk(node):
+        if isinstance(node.tag, str) and node.tag not in drop_tags:
+            if node.text:
+                parts.append(node.text)
+            for child in node:
+                walk(child)
+        if node is not element and node.tail:
+            parts.append(node.tail)
+
+    walk(element)
+    return ''.join(parts)
+
+class IncrementalExtractor:
+    """边下载边解析：用lxml的HTMLPullParser逐块喂入字节，元素一结束就检查它是否为候选正文区域
+
+    - 标题、meta描述、Open Graph和JSON-LD在对应元素结束时就已得到
+    - 选择规则与 parse_region 相同：优先级最高的选择器在文档中第一个匹配的元素，没有候选区域时取body
+    - 后面的数据不可能改变结果时（最高优先级的选择器已匹配且区域已结束）done 变为True，调用方可以停止下载；
+      其他情况下更高优先级的区域可能还在后面，要读完整个页面
+    - 未指定编码时先缓存前 _SNIFF_BYTES 字节，再用 sniff_encoding 确定编码
+    """
+
+    def __init__(self, selectors: Iterable[str], drop_tags: Iterable[str] = ('script', 'style'),
+                 encoding: Optional[str] = None):
+        self.selectors = list(selectors)
+        self.drop_tags = frozenset(drop_tags)
+        self.encoding = encoding
+        self.candidates = [
+            (position, parts) for position, parts in
+            ((position, _selector_parts(selector)) for position, selector in enumerate(self.selectors))
+            if parts is not None
+        ]
+        self.claimed: Dict[int, Any] = {}  # 各选择器在文档中第一个匹配的元素
+        self.regions: Dict[int, str] = {}  # 已结束的区域文本
+        self.title = ''
+        self.description = ''
+        self.open_graph: Dict[str, str] = {}
+        self.json_ld: List = []
+        self.bytes_fed = 0
+        self.done = False
+        self.body_text = ''
+        self._parser = None
+        self._pending = bytearray()
+
+    def _create_parser(self, head: bytes):
+        encoding = self.encoding or sniff_encoding(head, complete=False)
+        self._parser = etree.HTMLPullParser(events=('start', 'end'), encoding=encoding)
+
+    def feed(self, chunk: bytes) -> bool:
+        """喂入一个数据块，返回是否已经找到足够的正文"""
+        self.bytes_fed += len(chunk)
+        if self._parser is None:
+            self._pending.extend(chunk)
+            if len(self._pending) < _SNIFF_BYTES:
+                return False
+            self._create_parser(bytes(self._pending))
+            chunk, self._pending = bytes(self._pending), bytearray()
+
+        self._parser.feed(chunk)
+        self._read_events()
+        return self.done
+
+    def close(self):
+        """数据已全部喂入（或提前停止），结束解析"""
+        if self._parser is None:
+            self._create_parser(bytes(self._pending))
+            self._parser.feed(bytes(self._pending))
+        try:
+            self._parser.close()
+        except etree.XMLSyntaxError:
+            logger.debug("增量解析结束时页面不完整")
+        self._read_events()
+
+    def _matches(self, element, parts) -> bool:
+        tag, ids, classes = parts
+        if tag and element.tag != tag:
+            return False
+        if len(ids) > 1 or (ids and element.get('id') != ids[0]):
+            return False
+        if classes:
+            element_classes = (element.get('class') or '').split()
+            if not all(class_name in element_classes for class_name in classes):
+                return False
+        return True
+
+    def _read_events(self):
+        for event, element in self._parser.read_events():
+            tag = element.tag
+            if not isinstance(tag, str):
+                continue
+            if event == 'start':
+                # 开始标签按文档顺序到达，用于确定每个选择器的第一个匹配（嵌套时外层先开始、后结束）
+                for position, parts in self.candidates:
+                    if position not in self.claimed and self._matches(element, parts):
+                        self.claimed[position] = element
+                continue
+            if tag == 'title' and not self.title:
+                self.title = ''.join(element.itertext()).strip()
+            elif tag == 'meta':
+                name, prop = (element.get('name') or '').lower(), element.get('property') or ''
+                if name == 'description' and not self.description:
+                    self.description = (element.get('content') or '').strip()
+                elif prop.startswith(('og:', 'article:')):
+                    self.open_graph.setdefault(prop, (element.get('content') or '').strip())
+            elif tag == 'script' and element.get('type') == 'application/ld+json':
+                try:
+                    self.json_ld.append(json.loads(element.text or ''))
+                except ValueError:
+                    logger.debug("忽略无法解析的JSON-LD")
+            elif tag == 'body':
+                self.body_text = _text_without(element, self.drop_tags)
+
+            for position, claimed in self.claimed.items():
+                if claimed is element and position not in self.regions:
+                    self.regions[position] = _text_without(element, self.drop_tags)
+            if self.candidates and self.candidates[0][0] in self.regions:
+                self.done = True
+
+    def head(self) -> Dict:
+        """已解析到的元数据，格式与 parse_head 相同"""
+        return {
+            'title': self.title,
+            'description': self.description,
+            'open_graph': self.open_graph,
+            'json_ld': self.json_ld,
+        }
+
+    def result(self) -> Tuple[Optional[str], str]:
+        """返回 (选择器, 区域文本)，与 parse_region 相同取优先级最高的匹配"""
+        if self.regions:
+            position = min(self.regions)
+            return self.selectors[position], self.regions[position]
+        return BODY_SELECTOR, self.body_text
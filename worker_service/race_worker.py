@@ -8,12 +8,15 @@ import logging
 import signal
 import sys
 from datetime import datetime
-from typing import Optional, Dict, List, Any
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Optional, Dict, List, Any, Tuple
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeoutError
 
 from config import Config, TaskStatus
 from redis_client import RedisClient
-from simple_scrapers import scrape_with_scraper, SCRAPERS
+from simple_scrapers import fetch_url, submit_extraction, SCRAPERS
+from parsing import PARSE_FULL
+from extraction_pool import extraction_pool
+from extraction_cache import extraction_cache
 
 # 设置日志
 logging.basicConfig(
@@ -59,60 +62,48 @@ class RaceWorker:
                 progress=20
             )
             
-            urls = task_data['urls']
+            urls = task_data['pending_urls']
             options = task_data.get('options', {})
+            parse_mode = options.get('parse_mode', PARSE_FULL)
             
-            logger.info(f"竞速任务详情: {len(urls)}个URL")
-            
-            # 使用线程池让所有爬虫同时竞争
-            first_success = None
-            winner_scraper = None
+            logger.info(f"竞速任务详情: {len(urls)}个URL, 解析模式: {parse_mode}")
             
             # 可用的爬虫类型（排除requests，因为它已经试过了）
             race_scrapers = ['newspaper', 'readability', 'trafilatura']
             
-            with ThreadPoolExecutor(max_workers=len(race_scrapers)) as executor:
-                # 提交所有爬虫任务
-                future_to_scraper = {
-                    executor.submit(self.scrape_with_scraper, urls, scraper_type): scraper_type
-                    for scraper_type in race_scrapers
-                }
-                
-                # 等待第一个成功的结果
-                for future in as_completed(future_to_scraper, timeout=45):  # 45秒超时
-                    scraper_type = future_to_scraper[future]
-                    try:
-                        results = future.result(timeout=5)
-                        
-                        # 检查是否有成功的爬取
-                        success_count = sum(1 for r in results if r.get('success', False))
-                        
-                        logger.info(f"[{scraper_type}] 完成爬取，成功: {success_count}/{len(results)}")
-                        
-                        if success_count > 0:
-                            logger.info(f"🎯 [{scraper_type}] 率先完成，使用其结果!")
-                            first_success = results
-                            winner_scraper = scraper_type
-                            
-                            # 取消其他还在运行的任务
-                            for f in future_to_scraper:
-                                if f != future and not f.done():
-                                    f.cancel()
-                            break
-                        
-                    except Exception as e:
-                        logger.error(f"[{scraper_type}] 爬取异常: {e}")
+            # 按URL竞速：每个URL独立决出胜者，URL之间并发
+            start_time = time.time()
+            results, bytes_downloaded = self.race_urls(urls, race_scrapers, parse_mode)
+            elapsed_time = time.time() - start_time
+            
+            # 旧模式下每个爬虫各自下载一次，节省的字节数 = 下载量 × (爬虫数 - 1)
+            bytes_saved = bytes_downloaded * (len(race_scrapers) - 1)
+            logger.info(f"竞速任务下载完成: {bytes_downloaded}字节, 节省重复下载: {bytes_saved}字节")
+            self.redis_client.redis_client.hset(f'task:{task_id}', mapping={
+                'race_bytes_downloaded': bytes_downloaded,
+                'race_bytes_saved': bytes_saved
+            })
+            
+            success_count = sum(1 for r in results if r.get('success', False))
+            winners = {}
+            for r in results:
+                if r.get('success', False):
+                    winners[r['scraper_type']] = winners.get(r['scraper_type'], 0) + 1
+            
+            logger.info(f"竞速耗时: {elapsed_time:.2f}秒, 成功: {success_count}/{len(results)}, 各爬虫获胜次数: {winners}")
+            cache_stats = extraction_cache.get_stats()
+            logger.info(f"提取缓存统计: 命中{cache_stats['local_hits'] + cache_stats['redis_hits']}次, 未命中{cache_stats['misses']}次, 命中率{cache_stats['hit_rate']:.1%}")
             
             # 检查竞速结果
-            if first_success:
-                # 有爬虫成功，存储结果
-                self.redis_client.store_results(task_id, first_success)
+            if success_count > 0:
+                # 有URL成功，存储结果
+                self.redis_client.store_results(task_id, results)
                 self.redis_client.update_task_status(
                     task_id, 
                     TaskStatus.COMPLETED, 
                     progress=100
                 )
-                logger.info(f"✅ 竞速任务完成: {task_id}, 获胜爬虫: {winner_scraper}")
+                logger.info(f"✅ 竞速任务完成: {task_id}, 获胜爬虫: {winners}")
                 return True
             else:
                 # 所有爬虫都失败
@@ -133,38 +124,85 @@ class RaceWorker:
             )
             return False
     
-    def scrape_with_scraper(self, urls: List[str], scraper_type: str) -> List[Dict[str, Any]]:
-        """使用指定爬虫爬取URL列表"""
-        logger.info(f"[{scraper_type}] 开始批量爬取: {len(urls)}个URL")
+    def race_urls(self, urls: List[str], race_scrapers: List[str],
+                  parse_mode: str = PARSE_FULL) -> Tuple[List[Dict[str, Any]], int]:
+        """并发对每个URL竞速，返回按输入顺序排列的结果和总下载字节数"""
+        logger.info(f"开始按URL竞速: {len(urls)}个URL, 参赛爬虫: {race_scrapers}")
         
-        results = []
-        successful_count = 0
-        failed_count = 0
+        results = [None] * len(urls)
+        bytes_downloaded = 0
+        max_workers = max(1, min(len(urls), Config.URL_CONCURRENT_LIMIT))
         
-        for i, url in enumerate(urls):
-            try:
-                logger.info(f"[{scraper_type}] 爬取进度: {i+1}/{len(urls)} - {url}")
-                
-                result = scrape_with_scraper(url, scraper_type)
-                results.append(result)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            future_to_index = {
+                executor.submit(self.race_url, url, race_scrapers, parse_mode): i
+                for i, url in enumerate(urls)
+            }
+            
+            for future in as_completed(future_to_index):
+                index = future_to_index[future]
+                try:
+                    result, size = future.result()
+                    bytes_downloaded += size
+                except Exception as e:
+                    logger.error(f"URL竞速异常: {urls[index]} - {str(e)}")
+                    result = self._failure_result(urls[index], str(e))
+                results[index] = result
+        
+        return results, bytes_downloaded
+    
+    def race_url(self, url: str, race_scrapers: List[str], parse_mode: str = PARSE_FULL) -> Tuple[Dict[str, Any], int]:
+        """单个URL竞速：下载一次，多个提取器按任务的解析模式并发处理，第一个成功的结果获胜"""
+        deadline = time.time() + Config.RACE_URL_TIMEOUT
+        
+        try:
+            content = fetch_url(url, parse_mode)
+        except Exception as e:
+            logger.error(f"下载失败: {url} - {str(e)}")
+            return self._failure_result(url, str(e)), 0
+        
+        # 各提取器在解析进程池中并行执行，不受GIL限制；内容未变化时直接使用缓存结果
+        future_to_scraper = {
+            submit_extraction(url, content, scraper_type, parse_mode): scraper_type
+            for scraper_type in race_scrapers
+        }
+        
+        last_failure = None
+        try:
+            for future in as_completed(future_to_scraper, timeout=max(0, deadline - time.time())):
+                scraper_type = future_to_scraper[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    logger.error(f"[{scraper_type}] 提取异常: {url} - {e}")
+                    continue
                 
                 if result.get('success', False):
-                    successful_count += 1
-                else:
-                    failed_count += 1
-                    
-            except Exception as e:
-                failed_count += 1
-                logger.error(f"[{scraper_type}] 爬取异常: {url} - {str(e)}")
-                results.append({
-                    'url': url,
-                    'success': False,
-                    'error': str(e),
-                    'scraper_type': scraper_type
-                })
+                    logger.info(f"🎯 [{scraper_type}] 率先完成: {url}")
+                    return result, len(content)
+                last_failure = result
+                
+        except FuturesTimeoutError:
+            logger.warning(f"URL竞速超时({Config.RACE_URL_TIMEOUT}秒): {url}")
+            return self._failure_result(url, f"竞速超时({Config.RACE_URL_TIMEOUT}秒)"), len(content)
+        finally:
+            # 取消还在排队的落后提取器，已在执行的会自行结束
+            for future in future_to_scraper:
+                future.cancel()
         
-        logger.info(f"[{scraper_type}] 批量爬取完成: 成功{successful_count}个, 失败{failed_count}个")
-        return results
+        return last_failure or self._failure_result(url, "所有爬虫尝试均失败"), len(content)
+    
+    def _failure_result(self, url: str, error: str) -> Dict[str, Any]:
+        """构造竞速失败结果"""
+        return {
+            'url': url,
+            'success': False,
+            'title': None,
+            'content': None,
+            'publish_date': None,
+            'error': error,
+            'scraper_type': 'race'
+        }
     
     def get_next_race_task(self) -> Optional[str]:
         """从竞速队列获取任务"""
@@ -228,6 +266,8 @@ class RaceWorker:
                 )
             except Exception as e:
                 logger.error(f"清理任务状态时出错: {e}")
+        
+        extraction_pool.shutdown()
 
 def main():
     """主函数"""
@@ -0,0 +1,157 @@
+"""
+分布式域名限速 - 基于Redis Lua脚本的令牌桶，所有worker副本共享同一域名的访问配额
+"""
+
+import time
+import asyncio
+import logging
+import threading
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+import redis
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# 令牌桶：按Redis服务器时间补充令牌，并预约一个令牌。
+# 令牌不足时返回需要等待的毫秒数（令牌余额可以为负，表示已被预约）；
+# 等待时间超过上限时不预约，返回 granted=0。
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local max_wait_ms = tonumber(ARGV[3])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+
+local data = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(data[1])
+local ts = tonumber(data[2])
+if tokens == nil or ts == nil then
+    tokens = capacity
+    ts = now
+end
+tokens = math.min(capacity, tokens + (now - ts) * rate / 1000)
+
+local wait_ms = 0
+if tokens < 1 then
+    wait_ms = math.ceil((1 - tokens) * 1000 / rate)
+end
+if wait_ms > max_wait_ms then
+    redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', now)
+    return {0, wait_ms}
+end
+
+tokens = tokens - 1
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity * 1000 / rate) + max_wait_ms + 1000)
+return {1, wait_ms}
+"""
+
+class RateLimitExceeded(Exception):
+    """等待时间超过上限"""
+
+class DomainRateLimiter:
+    """按域名限速的分布式令牌桶
+
+    域名配置在 Config.DOMAIN_RATE_LIMITS 中，按后缀匹配（如 sohu.com 覆盖 www.sohu.com），
+    未配置的主机使用默认速率，每个主机一个桶。
+    """
+
+    def __init__(self):
+        self._redis: Optional[redis.Redis] = None
+        self._script = None
+        self._unavailable_until = 0.0
+        self.lock = threading.Lock()
+
+    def _get_redis(self) -> Optional[redis.Redis]:
+        """延迟创建Redis连接；连接失败时暂停限速一段时间（fail-open）"""
+        if self._redis is not None:
+            return self._redis
+        if time.time() < self._unavailable_until:
+            return None
+        with self.lock:
+            if self._redis is None:
+                try:
+                    client = redis.Redis(
+                        host=Config.REDIS_HOST,
+                        port=Config.REDIS_PORT,
+                        db=Config.REDIS_DB,
+                        decode_responses=True
+                    )
+                    client.ping()
+                    self._script = client.register_script(TOKEN_BUCKET_SCRIPT)
+                    self._redis = client
+                except redis.RedisError as e:
+                    logger.warning(f"域名限速不可用，Redis连接失败: {e}")
+                    self._unavailable_until = time.time() + 60
+                    return None
+        return self._redis
+
+    @staticmethod
+    def resolve(url: str) -> Tuple[str, Dict[str, float]]:
+        """返回 (限速域名, 限速配置)"""
+        host = (urlparse(url).hostname or '').lower()
+        parts = host.split('.')
+        for i in range(len(parts) - 1):
+            domain = '.'.join(parts[i:])
+            if domain in Config.DOMAIN_RATE_LIMITS:
+                return domain, Config.DOMAIN_RATE_LIMITS[domain]
+        return host, {'rate': Config.RATE_LIMIT_DEFAULT_RATE, 'burst': Config.RATE_LIMIT_DEFAULT_BURST}
+
+    def reserve(self, url: str) -> float:
+        """预约一个令牌，返回调用方需要等待的秒数"""
+        if not Config.RATE_LIMIT_ENABLED:
+            return 0.0
+        client = self._get_redis()
+        if client is None:
+            return 0.0
+
+        domain, limit = self.resolve(url)
+        try:
+            granted, wait_ms = self._script(
+                keys=[f'ratelimit:bucket:{domain}'],
+                args=[limit['rate'], limit['burst'], int(Config.RATE_LIMIT_MAX_WAIT * 1000)]
+            )
+        except redis.RedisError as e:
+            logger.warning(f"域名限速出错，跳过限速: {domain} - {e}")
+            return 0.0
+
+        wait_seconds = wait_ms / 1000
+        self._record(client, domain, wait_seconds if granted else 0.0, granted)
+        if not granted:
+            raise RateLimitExceeded(f"{domain} 限速等待 {wait_seconds:.1f}秒 超过上限 {Config.RATE_LIMIT_MAX_WAIT}秒")
+        if wait_seconds > 0:
+            logger.debug(f"域名限速: {domain} 等待 {wait_seconds:.2f}秒")
+        return wait_seconds
+
+    def _record(self, client: redis.Redis, domain: str, wait_seconds: float, granted: bool):
+        """记录各域名的请求数、被延迟次数和累计等待时间"""
+        try:
+            pipe = client.pipeline()
+            pipe.hincrby('ratelimit:stats', f'{domain}:requests', 1)
+            if wait_seconds > 0:
+                pipe.hincrby('ratelimit:stats', f'{domain}:delayed', 1)
+                pipe.hincrbyfloat('ratelimit:stats', f'{domain}:wait_seconds', wait_seconds)
+            if not granted:
+                pipe.hincrby('ratelimit:stats', f'{domain}:rejected', 1)
+            pipe.execute()
+        except redis.RedisError as e:
+            logger.debug(f"记录限速统计失败: {domain} - {e}")
+
+    def acquire(self, url: str):
+        """阻塞直到可以访问该URL所在域名"""
+        wait_seconds = self.reserve(url)
+        if wait_seconds > 0:
+            time.sleep(wait_seconds)
+
+    async def acquire_async(self, url: str):
+        """异步版本的acquire；Redis调用是同步的，放在线程中进行，不阻塞事件循环"""
+        loop = asyncio.get_running_loop()
+        wait_seconds = await loop.run_in_executor(None, self.reserve, url)
+        if wait_seconds > 0:
+            await asyncio.sleep(wait_seconds)
+
+# 创建全局限速器实例
+rate_limiter = DomainRateLimiter()
@@ -1,11 +1,28 @@
 import json
 import redis
+import hashlib
 import logging
 from typing import Optional, Dict, List, Any
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
 from config import Config, TaskStatus
 
 logger = logging.getLogger(__name__)
 
+def normalize_url(url: str) -> str:
+    """规范化URL，用作结果缓存的键（需与api_service保持一致）"""
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+    if parts.port and parts.port != {'http': 80, 'https': 443}.get(scheme):
+        host = f"{host}:{parts.port}"
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((scheme, host, parts.path or '/', query, ''))
+
+def url_cache_key(url: str, scraper_type: str) -> str:
+    """URL结果缓存键"""
+    digest = hashlib.sha1(normalize_url(url).encode('utf-8')).hexdigest()
+    return f'url_cache:{scraper_type}:{digest}'
+
 class RedisClient:
     def __init__(self):
         self.redis_client = redis.Redis(
@@ -41,6 +58,8 @@ class RedisClient:
         task_data['urls'] = json.loads(task_data['urls'])
         task_data['options'] = json.loads(task_data['options'])
         task_data['progress'] = int(task_data['progress'])
+        # 已命中结果缓存的URL不再爬取
+        task_data['pending_urls'] = json.loads(task_data['pending_urls']) if 'pending_urls' in task_data else task_data['urls']
         
         return task_data
     
@@ -64,9 +83,30 @@ class RedisClient:
         self.redis_client.hset(f'task:{task_id}', mapping=update_data)
         logger.info(f"更新任务状态: {task_id} -> {status.value}")
     
+    def _merge_cached_results(self, task_id: str, results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """把创建任务时命中的缓存结果按原始URL顺序合并进来，并缓存新的成功结果"""
+        urls, cached_results, cache_scraper_type = self.redis_client.hmget(
+            f'task:{task_id}', 'urls', 'cached_results', 'cache_scraper_type'
+        )
+        
+        if Config.URL_CACHE_ENABLED and cache_scraper_type:
+            pipe = self.redis_client.pipeline()
+            for result in results:
+                if result.get('success', False):
+                    pipe.setex(url_cache_key(result['url'], cache_scraper_type), Config.URL_CACHE_TTL_SECONDS, json.dumps(result))
+            pipe.execute()
+        
+        cached = json.loads(cached_results) if cached_results else {}
+        if not cached:
+            return results
+        
+        fresh = iter(results)
+        return [cached[str(i)] if str(i) in cached else next(fresh) for i in range(len(json.loads(urls)))]
+    
     def store_results(self, task_id: str, results: List[Dict[str, Any]]):
         """存储任务结果"""
         import datetime
+        results = self._merge_cached_results(task_id, results)
         result_data = {
             'task_id': task_id,
             'results': json.dumps(results),
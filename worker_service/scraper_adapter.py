@@ -10,6 +10,12 @@ from config import Config
 # 导入简单爬虫
 from simple_scraper import scrape_urls
 from simple_scrapers import scrape_urls_async, scrape_with_scraper
+from parsing import PARSE_FULL
+from hedging import hedging_policy
+from coalescer import single_flight
+from transport import transport
+from extraction_pool import extraction_pool
+from extraction_cache import extraction_cache
 
 logger = logging.getLogger(__name__)
 
@@ -32,7 +38,7 @@ class ScraperAdapter:
             # 阶段2只支持requests爬虫
             if scraper_type == 'requests':
                 # 使用并发处理URL列表
-                results = self._scrape_urls_concurrent(urls, scraper_type)
+                results = self._scrape_urls_concurrent(urls, scraper_type, options or {})
                 
                 successful_count = sum(1 for r in results if r.get('success', False))
                 failed_count = len(results) - successful_count
@@ -46,7 +52,14 @@ class ScraperAdapter:
             logger.error(f"爬虫适配器错误: {str(e)}")
             raise
     
-    def _scrape_urls_concurrent(self, urls: List[str], scraper_type: str) -> List[Dict[str, Any]]:
+    def _scrape_one(self, url: str, scraper_type: str, options: Dict[str, Any]) -> Dict[str, Any]:
+        """爬取单个URL，按需对冲；同一URL正在被其他任务下载时，由下载层合并等待"""
+        parse_mode = options.get('parse_mode', PARSE_FULL)
+        if options.get('hedge', Config.HEDGE_ENABLED):
+            return hedging_policy.scrape(url, scraper_type, options.get('hedge_backup'), parse_mode)
+        return scrape_with_scraper(url, scraper_type, parse_mode)
+    
+    def _scrape_urls_concurrent(self, urls: List[str], scraper_type: str, options: Dict[str, Any]) -> List[Dict[str, Any]]:
         """使用线程池并发爬取URL列表"""
         logger.info(f"使用并发模式爬取 {len(urls)} 个URL")
         
@@ -57,7 +70,7 @@ class ScraperAdapter:
         with ThreadPoolExecutor(max_workers=max_workers) as executor:
             # 提交所有任务
             future_to_index = {
-                executor.submit(scrape_with_scraper, url, scraper_type): i 
+                executor.submit(self._scrape_one, url, scraper_type, options): i 
                 for i, url in enumerate(urls)
             }
             
@@ -93,6 +106,21 @@ class ScraperAdapter:
             logger.error(f"发现 {len(none_results)} 个未处理的结果，索引: {none_results}")
         
         logger.info(f"并发爬取完成: 处理了 {completed_count} 个URL")
+        
+        hedge_stats = hedging_policy.get_stats()
+        logger.info(f"对冲统计: 请求{hedge_stats['requests']}个, 触发对冲{hedge_stats['hedged']}次, 备用获胜{hedge_stats['backup_wins']}次")
+        
+        flight_stats = single_flight.get_stats()
+        logger.info(f"请求合并统计: 实际下载{flight_stats['leader']}次, 合并{flight_stats['coalesced']}次, 等待超时{flight_stats['wait_timeouts']}次")
+        
+        transport_stats = transport.get_stats()
+        logger.info(f"连接池统计: 复用{transport_stats['pool_hits']}次, 新建{transport_stats['pool_misses']}次")
+        
+        extract_stats = extraction_pool.get_stats()
+        logger.info(f"解析进程池统计: 进程池提取{extract_stats['submitted']}次, 线程内提取{extract_stats['inline']}次")
+        
+        cache_stats = extraction_cache.get_stats()
+        logger.info(f"提取缓存统计: 本地命中{cache_stats['local_hits']}次, Redis命中{cache_stats['redis_hits']}次, 未命中{cache_stats['misses']}次, 命中率{cache_stats['hit_rate']:.1%}")
         return results
     
     def get_supported_scrapers(self) -> List[str]:
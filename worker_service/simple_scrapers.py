@@ -1,414 +1,408 @@
 import requests
-import aiohttp
 import asyncio
-from bs4 import BeautifulSoup
 import logging
-from typing import Dict, List
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Optional
 import json
 from urllib.parse import urlparse
 
+from config import Config
+from rate_limiter import rate_limiter
+from coalescer import single_flight
+from transport import transport
+from parsing import (
+    make_soup, SelectorPlan, IncrementalExtractor, head_end, parse_head, parse_region, publish_date_of,
+    PARSE_FULL, PARSE_HEAD, PARSE_REGION, PARSE_MODES
+)
+from extraction_pool import extraction_pool
+from extraction_cache import extraction_cache
+
 logger = logging.getLogger(__name__)
 
+class ContentRejectedError(requests.RequestException):
+    """响应不是可提取的页面（如PDF、视频），在读取正文前放弃"""
+
+def check_content_type(url: str, content_type: str):
+    """根据Content-Type决定是否读取正文，未声明类型时放行"""
+    mime = content_type.split(';', 1)[0].strip().lower()
+    if mime and mime not in Config.ALLOWED_CONTENT_TYPES:
+        raise ContentRejectedError(f"不支持的内容类型: {mime}")
+
+def _append_chunk(url: str, buffer: bytearray, chunk: bytes) -> bool:
+    """追加一个数据块，达到字节上限时截断并返回False"""
+    remaining = Config.MAX_CONTENT_BYTES - len(buffer)
+    buffer.extend(chunk[:remaining])
+    if len(buffer) >= Config.MAX_CONTENT_BYTES:
+        logger.warning(f"页面超过{Config.MAX_CONTENT_BYTES}字节，已截断: {url}")
+        return False
+    return True
+
+# 下载过程中每收到一个数据块调用一次 (已下载字节, 新数据块)，返回True时停止下载
+StopCondition = Callable[[bytearray, bytes], bool]
+
+def _head_complete(buffer: bytearray, chunk: bytes) -> bool:
+    """只需要<head>时，新数据块中出现</head>即可停止下载（向前多查几个字节，覆盖跨块的标签）"""
+    return head_end(buffer, max(0, len(buffer) - len(chunk) - 16)) is not None
+
+# 各提取器的候选选择器（按优先级），每组一次遍历完成匹配
+NEWSPAPER_TITLE_SELECTORS = SelectorPlan(['h1', 'title', '.title', '#title', 'h2'])
+NEWSPAPER_CONTENT_SELECTORS = SelectorPlan(['article', 'main', '.content', '#content', '.post', '.article'])
+READABILITY_CONTENT_SELECTORS = SelectorPlan(['article', 'main', '.article', '.post', '.content', '#content'])
+READABILITY_TITLE_SELECTORS = SelectorPlan(['h1', 'title'])
+TRAFILATURA_CONTENT_SELECTORS = SelectorPlan([
+    'article', 'main', '.article', '.post', '.content',
+    '#content', '.entry', '.post-content', '.article-content'
+])
+DEFAULT_REGION_SELECTORS = ['article', 'main', '.article', '.post', '.content', '#content']
+
 class BaseSimpleScraper:
     """基础简单爬虫"""
     
+    # 提取逻辑变化时递增，使旧的提取缓存失效
+    EXTRACTOR_VERSION = '1'
+    
+    # region模式下按优先级尝试的候选正文区域，以及区域内丢弃的标签
+    REGION_SELECTORS = DEFAULT_REGION_SELECTORS
+    REGION_DROP_TAGS = ('script', 'style')
+    
     def __init__(self, name):
         self.name = name
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5',
-            'Accept-Encoding': 'gzip, deflate',
-            'Connection': 'keep-alive',
-        })
-        # 异步会话缓存
-        self._async_session = None
+        self.parser_backend = Config.parser_backend(name)
+        self.session = transport.create_session()
+    
+    @property
+    def cache_version(self) -> str:
+        """提取缓存使用的版本号，解析后端不同的结果分开缓存"""
+        return f"{self.EXTRACTOR_VERSION}:{self.parser_backend}"
     
     async def _get_async_session(self):
-        """获取或创建异步会话"""
-        if self._async_session is None or self._async_session.closed:
-            self._async_session = aiohttp.ClientSession(
-                headers={
-                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-                    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-                    'Accept-Language': 'en-US,en;q=0.5',
-                    'Accept-Encoding': 'gzip, deflate',
-                    'Connection': 'keep-alive',
-                },
-                timeout=aiohttp.ClientTimeout(total=30)
-            )
-        return self._async_session
+        """获取共享的异步会话"""
+        return await transport.get_async_session()
     
     async def close_async_session(self):
         """关闭异步会话"""
-        if self._async_session and not self._async_session.closed:
-            await self._async_session.close()
+        await transport.close_async_session()
     
-    def scrape_url(self, url: str) -> Dict:
-        """基础爬取方法，子类可以重写"""
-        try:
-            logger.info(f"[{self.name}] 开始爬取: {url}")
-            
-            response = self.session.get(url, timeout=30)
+    def _failure_result(self, url: str, error: str) -> Dict:
+        """构造失败结果"""
+        return {
+            'url': url,
+            'success': False,
+            'title': None,
+            'content': None,
+            'publish_date': None,
+            'error': error,
+            'scraper_type': self.name
+        }
+    
+    def fetch(self, url: str, stop_when: Optional[StopCondition] = None, kind: str = PARSE_FULL,
+              coalesce: bool = True) -> bytes:
+        """下载页面，返回响应字节；stop_when 返回True时提前停止
+        
+        同一URL的同种下载（kind，提前停止的条件不同时必须区分）正在进行时，等待并共享其页面字节；
+        此时 stop_when 不会被调用。coalesce=False 时总是自己下载。
+        """
+        if not coalesce:
+            return self._download(url, stop_when)
+        return single_flight.run(url, kind, lambda: self._download(url, stop_when))
+    
+    def _download(self, url: str, stop_when: Optional[StopCondition] = None) -> bytes:
+        """实际下载页面（经过域名限速），stop_when 返回True时提前停止"""
+        rate_limiter.acquire(url)
+        with self.session.get(url, timeout=transport.timeout, stream=True) as response:
             response.raise_for_status()
+            check_content_type(url, response.headers.get('Content-Type', ''))
             
-            # 解析HTML
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # 提取标题
-            title = soup.find('title')
-            title_text = title.get_text().strip() if title else "无标题"
-            
-            # 提取正文内容
-            for script in soup(["script", "style"]):
-                script.decompose()
-            
-            content = soup.get_text()
-            lines = (line.strip() for line in content.splitlines())
-            chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-            content = ' '.join(chunk for chunk in chunks if chunk)
-            
-            # 限制内容长度
-            if len(content) > 5000:
-                content = content[:5000] + "..."
-            
-            result = {
-                'url': url,
-                'success': True,
-                'title': title_text,
-                'content': content,
-                'publish_date': None,
-                'error': None,
-                'scraper_type': self.name
-            }
+            buffer = bytearray()
+            for chunk in response.iter_content(chunk_size=Config.DOWNLOAD_CHUNK_SIZE):
+                if not _append_chunk(url, buffer, chunk):
+                    break
+                if stop_when and stop_when(buffer, chunk):
+                    break
+            return bytes(buffer)
+    
+    async def fetch_async(self, url: str, stop_when: Optional[StopCondition] = None) -> bytes:
+        """异步下载页面，返回响应字节；stop_when 返回True时提前停止"""
+        await rate_limiter.acquire_async(url)
+        session = await self._get_async_session()
+        async with session.get(url) as response:
+            response.raise_for_status()
+            check_content_type(url, response.headers.get('Content-Type', ''))
             
-            logger.info(f"[{self.name}] 爬取成功: {url}, 标题: {title_text}")
-            return result
+            buffer = bytearray()
+            async for chunk in response.content.iter_chunked(Config.DOWNLOAD_CHUNK_SIZE):
+                if not _append_chunk(url, buffer, chunk):
+                    break
+                if stop_when and stop_when(buffer, chunk):
+                    break
+            return bytes(buffer)
+    
+    def extract(self, url: str, content: bytes) -> Dict:
+        """从已下载的页面字节中提取内容，子类可以重写"""
+        # 解析HTML
+        soup = make_soup(content, self.parser_backend)
+        
+        # 提取标题
+        title = soup.find('title')
+        title_text = title.get_text().strip() if title else "无标题"
+        
+        # 提取正文内容
+        for script in soup(["script", "style"]):
+            script.decompose()
+        
+        content = soup.get_text()
+        lines = (line.strip() for line in content.splitlines())
+        chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
+        content = ' '.join(chunk for chunk in chunks if chunk)
+        
+        # 限制内容长度
+        if len(content) > 5000:
+            content = content[:5000] + "..."
+        
+        result = {
+            'url': url,
+            'success': True,
+            'title': title_text,
+            'content': content,
+            'publish_date': None,
+            'error': None,
+            'scraper_type': self.name
+        }
+        
+        logger.info(f"[{self.name}] 提取成功: {url}, 标题: {title_text}")
+        return result
+    
+    def extract_head(self, url: str, content: bytes) -> Dict:
+        """head模式：只解析<head>，返回标题、描述、发布时间和Open Graph/JSON-LD元数据"""
+        head = parse_head(content, self.parser_backend)
+        title = head['title'] or head['open_graph'].get('og:title', '')
+        description = head['description'] or head['open_graph'].get('og:description', '')
+        success = bool(title or description)
+        
+        result = {
+            'url': url,
+            'success': success,
+            'title': title or "无标题",
+            'description': description,
+            'content': None,
+            'publish_date': publish_date_of(head),
+            'metadata': {'open_graph': head['open_graph'], 'json_ld': head['json_ld']},
+            'error': None if success else "<head>中没有标题和描述",
+            'scraper_type': self.name,
+            'parse_mode': PARSE_HEAD
+        }
+        
+        logger.info(f"[{self.name}] 元数据提取{'成功' if success else '失败'}: {url}, 标题: {title}")
+        return result
+    
+    def extract_region(self, url: str, content: bytes) -> Dict:
+        """region模式：标题和描述取自<head>，正文只取第一个匹配的候选区域"""
+        head = parse_head(content, self.parser_backend)
+        selector, text = parse_region(content, self.REGION_SELECTORS, self.REGION_DROP_TAGS)
+        return self._region_result(url, head, selector, text)
+    
+    def _incremental_extractor(self) -> IncrementalExtractor:
+        return IncrementalExtractor(self.REGION_SELECTORS, self.REGION_DROP_TAGS)
+    
+    def _streamed_result(self, url: str, extractor: IncrementalExtractor) -> Dict:
+        """结束增量解析并构造region结果"""
+        extractor.close()
+        selector, text = extractor.result()
+        result = self._region_result(url, extractor.head(), selector, text)
+        result['bytes_read'] = extractor.bytes_fed
+        result['stopped_early'] = extractor.done
+        return result
+    
+    def stream_region(self, url: str, coalesce: bool = True) -> Dict:
+        """region模式的增量版本：下载线程边接收数据边解析，确定了正文区域后停止下载
+        
+        停止的位置取决于本爬虫的候选区域，合并下载按爬虫区分；合并到其他请求的下载时，
+        一次性解析共享的页面字节。
+        """
+        extractor = self._incremental_extractor()
+        content = self.fetch(url, lambda buffer, chunk: extractor.feed(chunk), f"{PARSE_REGION}:{self.name}", coalesce)
+        if extractor.bytes_fed == 0 and content:
+            extractor.feed(content)
+        return self._streamed_result(url, extractor)
+    
+    async def stream_region_async(self, url: str) -> Dict:
+        """异步的增量region提取，解析穿插在等待网络数据的间隙中"""
+        extractor = self._incremental_extractor()
+        await self.fetch_async(url, lambda buffer, chunk: extractor.feed(chunk))
+        return self._streamed_result(url, extractor)
+    
+    def _region_result(self, url: str, head: Dict, selector: Optional[str], text: str) -> Dict:
+        """构造region模式的结果"""
+        text = ' '.join(text.split())
+        if len(text) > 5000:
+            text = text[:5000] + "..."
+        
+        result = {
+            'url': url,
+            'success': bool(text),
+            'title': head['title'] or head['open_graph'].get('og:title') or "无标题",
+            'description': head['description'],
+            'content': text,
+            'publish_date': publish_date_of(head),
+            'content_selector': selector,
+            'error': None if text else "没有找到正文区域",
+            'scraper_type': self.name,
+            'parse_mode': PARSE_REGION
+        }
+        
+        logger.info(f"[{self.name}] 区域提取{'成功' if text else '失败'}: {url}, 区域: {selector}")
+        return result
+    
+    def scrape_url(self, url: str, parse_mode: str = PARSE_FULL, coalesce: bool = True) -> Dict:
+        """下载并提取单个URL；coalesce=False 时不合并到正在进行的同一URL下载"""
+        try:
+            logger.info(f"[{self.name}] 开始爬取: {url}")
+            if parse_mode == PARSE_REGION and Config.STREAM_EXTRACT_ENABLED:
+                return self.stream_region(url, coalesce)
+            content = fetch_page(self, url, parse_mode, coalesce)
+            # 下载在当前线程完成，提取交给解析进程池（内容未变化时直接使用缓存结果）
+            return submit_extraction(url, content, self.name, parse_mode).result()
             
         except Exception as e:
             logger.error(f"[{self.name}] 爬取失败: {url} - {str(e)}")
-            return {
-                'url': url,
-                'success': False,
-                'title': None,
-                'content': None,
-                'publish_date': None,
-                'error': str(e),
-                'scraper_type': self.name
-            }
+            return self._failure_result(url, str(e))
     
-    async def scrape_url_async(self, url: str) -> Dict:
-        """异步版本的基础爬取方法"""
+    async def scrape_url_async(self, url: str, parse_mode: str = PARSE_FULL) -> Dict:
+        """异步版本的爬取方法，下载异步进行，提取交给解析进程池"""
         try:
             logger.info(f"[{self.name}] 异步爬取: {url}")
-            
-            session = await self._get_async_session()
-            async with session.get(url) as response:
-                response.raise_for_status()
-                content = await response.read()
-                
-                # 解析HTML
-                soup = BeautifulSoup(content, 'html.parser')
-                
-                # 提取标题
-                title = soup.find('title')
-                title_text = title.get_text().strip() if title else "无标题"
-                
-                # 提取正文内容
-                for script in soup(["script", "style"]):
-                    script.decompose()
-                
-                content = soup.get_text()
-                lines = (line.strip() for line in content.splitlines())
-                chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-                content = ' '.join(chunk for chunk in chunks if chunk)
-                
-                # 限制内容长度
-                if len(content) > 5000:
-                    content = content[:5000] + "..."
-                
-                result = {
-                    'url': url,
-                    'success': True,
-                    'title': title_text,
-                    'content': content,
-                    'publish_date': None,
-                    'error': None,
-                    'scraper_type': self.name
-                }
-                
-                logger.info(f"[{self.name}] 异步爬取成功: {url}, 标题: {title_text}")
-                return result
+            if parse_mode == PARSE_REGION and Config.STREAM_EXTRACT_ENABLED:
+                return await self.stream_region_async(url)
+            content = await self.fetch_async(url, _head_complete if parse_mode == PARSE_HEAD else None)
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(None, lambda: submit_extraction(url, content, self.name, parse_mode).result())
             
         except Exception as e:
             logger.error(f"[{self.name}] 异步爬取失败: {url} - {str(e)}")
-            return {
-                'url': url,
-                'success': False,
-                'title': None,
-                'content': None,
-                'publish_date': None,
-                'error': str(e),
-                'scraper_type': self.name
-            }
+            return self._failure_result(url, str(e))
 
 class SimpleNewspaperScraper(BaseSimpleScraper):
     """Newspaper3k 简单实现"""
     
+    REGION_SELECTORS = NEWSPAPER_CONTENT_SELECTORS.selectors
+    
     def __init__(self):
         super().__init__("newspaper")
     
-    def scrape_url(self, url: str) -> Dict:
+    def extract(self, url: str, content: bytes) -> Dict:
         """使用newspaper3k逻辑"""
         try:
-            logger.info(f"[newspaper] 开始爬取: {url}")
-            
             # 模拟newspaper3k的提取逻辑
-            response = self.session.get(url, timeout=30)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
+            soup = make_soup(content, self.parser_backend)
             
             # 更智能的标题提取
             title = None
-            for selector in ['h1', 'title', '.title', '#title', 'h2']:
-                element = soup.select_one(selector)
-                if element:
-                    title = element.get_text().strip()
-                    break
+            for _, element in NEWSPAPER_TITLE_SELECTORS.iter_matches(soup):
+                title = element.get_text().strip()
+                break
             
             if not title:
                 title = "无标题"
             
             # 更智能的内容提取
-            content = ""
-            for selector in ['article', 'main', '.content', '#content', '.post', '.article']:
-                element = soup.select_one(selector)
-                if element:
-                    content = element.get_text().strip()
-                    break
+            text = ""
+            for _, element in NEWSPAPER_CONTENT_SELECTORS.iter_matches(soup):
+                text = element.get_text().strip()
+                break
             
-            if not content:
-                content = soup.get_text().strip()
+            if not text:
+                text = soup.get_text().strip()
             
             # 清理和限制长度
-            if len(content) > 5000:
-                content = content[:5000] + "..."
+            if len(text) > 5000:
+                text = text[:5000] + "..."
             
             result = {
                 'url': url,
                 'success': True,
                 'title': title,
-                'content': content,
+                'content': text,
                 'publish_date': None,
                 'error': None,
                 'scraper_type': self.name
             }
             
-            logger.info(f"[newspaper] 爬取成功: {url}, 标题: {title}")
+            logger.info(f"[newspaper] 提取成功: {url}, 标题: {title}")
             return result
             
         except Exception as e:
-            logger.error(f"[newspaper] 爬取失败: {url} - {str(e)}")
-            return super().scrape_url(url)  # 回退到基础方法
-    
-    async def scrape_url_async(self, url: str) -> Dict:
-        """异步版本的newspaper爬取方法"""
-        try:
-            logger.info(f"[newspaper] 异步爬取: {url}")
-            
-            session = await self._get_async_session()
-            async with session.get(url) as response:
-                response.raise_for_status()
-                content = await response.read()
-                
-                soup = BeautifulSoup(content, 'html.parser')
-                
-                # 更智能的标题提取
-                title = None
-                for selector in ['h1', 'title', '.title', '#title', 'h2']:
-                    element = soup.select_one(selector)
-                    if element:
-                        title = element.get_text().strip()
-                        break
-                
-                if not title:
-                    title = "无标题"
-                
-                # 更智能的内容提取
-                content = ""
-                for selector in ['article', 'main', '.content', '#content', '.post', '.article']:
-                    element = soup.select_one(selector)
-                    if element:
-                        content = element.get_text().strip()
-                        break
-                
-                if not content:
-                    content = soup.get_text().strip()
-                
-                # 清理和限制长度
-                if len(content) > 5000:
-                    content = content[:5000] + "..."
-                
-                result = {
-                    'url': url,
-                    'success': True,
-                    'title': title,
-                    'content': content,
-                    'publish_date': None,
-                    'error': None,
-                    'scraper_type': self.name
-                }
-                
-                logger.info(f"[newspaper] 异步爬取成功: {url}, 标题: {title}")
-                return result
-                
-        except Exception as e:
-            logger.error(f"[newspaper] 异步爬取失败: {url} - {str(e)}")
-            return await super().scrape_url_async(url)  # 回退到基础异步方法
+            logger.error(f"[newspaper] 提取失败: {url} - {str(e)}")
+            return super().extract(url, content)  # 回退到基础提取方法
 
 class SimpleReadabilityScraper(BaseSimpleScraper):
     """Readability 简单实现"""
     
+    REGION_SELECTORS = READABILITY_CONTENT_SELECTORS.selectors
+    REGION_DROP_TAGS = ('script', 'style', 'nav', 'header', 'footer', 'aside')
+    
     def __init__(self):
         super().__init__("readability")
     
-    def scrape_url(self, url: str) -> Dict:
+    def extract(self, url: str, content: bytes) -> Dict:
         """使用readability逻辑"""
         try:
-            logger.info(f"[readability] 开始爬取: {url}")
-            
-            response = self.session.get(url, timeout=30)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
+            soup = make_soup(content, self.parser_backend)
             
             # 移除不需要的元素
             for element in soup(['script', 'style', 'nav', 'header', 'footer', 'aside']):
                 element.decompose()
             
             # 寻找主要内容区域
-            content_area = None
-            for selector in ['article', 'main', '.article', '.post', '.content', '#content']:
-                content_area = soup.select_one(selector)
-                if content_area:
-                    break
+            content_area = next((element for _, element in READABILITY_CONTENT_SELECTORS.iter_matches(soup)), None)
             
             if not content_area:
                 content_area = soup.find('body')
             
             # 提取标题
             title = None
-            for selector in ['h1', 'title']:
-                element = content_area.select_one(selector) if content_area else soup.select_one(selector)
-                if element:
-                    title = element.get_text().strip()
-                    break
+            for _, element in READABILITY_TITLE_SELECTORS.iter_matches(content_area or soup):
+                title = element.get_text().strip()
+                break
             
             if not title:
                 title = "无标题"
             
             # 提取内容
-            content = content_area.get_text() if content_area else soup.get_text()
-            content = ' '.join(content.split())  # 清理空白字符
+            text = content_area.get_text() if content_area else soup.get_text()
+            text = ' '.join(text.split())  # 清理空白字符
             
-            if len(content) > 5000:
-                content = content[:5000] + "..."
+            if len(text) > 5000:
+                text = text[:5000] + "..."
             
             result = {
                 'url': url,
                 'success': True,
                 'title': title,
-                'content': content,
+                'content': text,
                 'publish_date': None,
                 'error': None,
                 'scraper_type': self.name
             }
             
-            logger.info(f"[readability] 爬取成功: {url}, 标题: {title}")
+            logger.info(f"[readability] 提取成功: {url}, 标题: {title}")
             return result
             
         except Exception as e:
-            logger.error(f"[readability] 爬取失败: {url} - {str(e)}")
-            return super().scrape_url(url)
-    
-    async def scrape_url_async(self, url: str) -> Dict:
-        """异步版本的readability爬取方法"""
-        try:
-            logger.info(f"[readability] 异步爬取: {url}")
-            
-            session = await self._get_async_session()
-            async with session.get(url) as response:
-                response.raise_for_status()
-                content = await response.read()
-                
-                soup = BeautifulSoup(content, 'html.parser')
-                
-                # 移除不需要的元素
-                for element in soup(['script', 'style', 'nav', 'header', 'footer', 'aside']):
-                    element.decompose()
-                
-                # 寻找主要内容区域
-                content_area = None
-                for selector in ['article', 'main', '.article', '.post', '.content', '#content']:
-                    content_area = soup.select_one(selector)
-                    if content_area:
-                        break
-                
-                if not content_area:
-                    content_area = soup.find('body')
-                
-                # 提取标题
-                title = None
-                for selector in ['h1', 'title']:
-                    element = content_area.select_one(selector) if content_area else soup.select_one(selector)
-                    if element:
-                        title = element.get_text().strip()
-                        break
-                
-                if not title:
-                    title = "无标题"
-                
-                # 提取内容
-                content = content_area.get_text() if content_area else soup.get_text()
-                content = ' '.join(content.split())  # 清理空白字符
-                
-                if len(content) > 5000:
-                    content = content[:5000] + "..."
-                
-                result = {
-                    'url': url,
-                    'success': True,
-                    'title': title,
-                    'content': content,
-                    'publish_date': None,
-                    'error': None,
-                    'scraper_type': self.name
-                }
-                
-                logger.info(f"[readability] 异步爬取成功: {url}, 标题: {title}")
-                return result
-                
-        except Exception as e:
-            logger.error(f"[readability] 异步爬取失败: {url} - {str(e)}")
-            return await super().scrape_url_async(url)
+            logger.error(f"[readability] 提取失败: {url} - {str(e)}")
+            return super().extract(url, content)
 
 class SimpleTrafilaturaScraper(BaseSimpleScraper):
     """Trafilatura 简单实现"""
     
+    REGION_SELECTORS = TRAFILATURA_CONTENT_SELECTORS.selectors
+    
     def __init__(self):
         super().__init__("trafilatura")
     
-    def scrape_url(self, url: str) -> Dict:
+    def extract(self, url: str, content: bytes) -> Dict:
         """使用trafilatura逻辑"""
         try:
-            logger.info(f"[trafilatura] 开始爬取: {url}")
-            
-            response = self.session.get(url, timeout=30)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
+            soup = make_soup(content, self.parser_backend)
             
             # 提取结构化数据
             title = soup.find('title')
@@ -418,16 +412,10 @@ class SimpleTrafilaturaScraper(BaseSimpleScraper):
             main_content = ""
             
             # 尝试不同的内容选择器
-            content_selectors = [
-                'article', 'main', '.article', '.post', '.content',
-                '#content', '.entry', '.post-content', '.article-content'
-            ]
-            
-            for selector in content_selectors:
-                elements = soup.select(selector)
-                if elements:
-                    main_content = ' '.join(elem.get_text() for elem in elements)
-                    break
+            # 一次遍历找到第一个有匹配的选择器，再取该选择器的全部匹配
+            for selector, _ in TRAFILATURA_CONTENT_SELECTORS.iter_matches(soup):
+                main_content = ' '.join(elem.get_text() for elem in soup.select(selector))
+                break
             
             if not main_content:
                 # 回退到body内容，但排除导航和侧边栏
@@ -453,74 +441,12 @@ class SimpleTrafilaturaScraper(BaseSimpleScraper):
                 'scraper_type': self.name
             }
             
-            logger.info(f"[trafilatura] 爬取成功: {url}, 标题: {title_text}")
+            logger.info(f"[trafilatura] 提取成功: {url}, 标题: {title_text}")
             return result
             
         except Exception as e:
-            logger.error(f"[trafilatura] 爬取失败: {url} - {str(e)}")
-            return super().scrape_url(url)
-    
-    async def scrape_url_async(self, url: str) -> Dict:
-        """异步版本的trafilatura爬取方法"""
-        try:
-            logger.info(f"[trafilatura] 异步爬取: {url}")
-            
-            session = await self._get_async_session()
-            async with session.get(url) as response:
-                response.raise_for_status()
-                content = await response.read()
-                
-                soup = BeautifulSoup(content, 'html.parser')
-                
-                # 提取结构化数据
-                title = soup.find('title')
-                title_text = title.get_text().strip() if title else "无标题"
-                
-                # 寻找主要内容
-                main_content = ""
-                
-                # 尝试不同的内容选择器
-                content_selectors = [
-                    'article', 'main', '.article', '.post', '.content',
-                    '#content', '.entry', '.post-content', '.article-content'
-                ]
-                
-                for selector in content_selectors:
-                    elements = soup.select(selector)
-                    if elements:
-                        main_content = ' '.join(elem.get_text() for elem in elements)
-                        break
-                
-                if not main_content:
-                    # 回退到body内容，但排除导航和侧边栏
-                    body = soup.find('body')
-                    if body:
-                        # 移除导航和侧边栏
-                        for nav in body.select('nav, .nav, .navigation, .menu, .sidebar'):
-                            nav.decompose()
-                        main_content = body.get_text()
-                
-                # 清理内容
-                main_content = ' '.join(main_content.split())
-                if len(main_content) > 5000:
-                    main_content = main_content[:5000] + "..."
-                
-                result = {
-                    'url': url,
-                    'success': True,
-                    'title': title_text,
-                    'content': main_content,
-                    'publish_date': None,
-                    'error': None,
-                    'scraper_type': self.name
-                }
-                
-                logger.info(f"[trafilatura] 异步爬取成功: {url}, 标题: {title_text}")
-                return result
-                
-        except Exception as e:
-            logger.error(f"[trafilatura] 异步爬取失败: {url} - {str(e)}")
-            return await super().scrape_url_async(url)
+            logger.error(f"[trafilatura] 提取失败: {url} - {str(e)}")
+            return super().extract(url, content)
 
 # 爬虫映射
 SCRAPERS = {
@@ -530,27 +456,93 @@ SCRAPERS = {
     'trafilatura': SimpleTrafilaturaScraper(),
 }
 
-def scrape_with_scraper(url: str, scraper_type: str) -> Dict:
-    """使用指定爬虫爬取URL"""
+def check_parse_mode(parse_mode: str):
+    """校验任务选项中的解析模式"""
+    if parse_mode not in PARSE_MODES:
+        raise ValueError(f"不支持的解析模式: {parse_mode}")
+
+def scrape_with_scraper(url: str, scraper_type: str, parse_mode: str = PARSE_FULL, coalesce: bool = True) -> Dict:
+    """使用指定爬虫爬取URL；coalesce=False 时不合并到正在进行的同一URL下载（对冲的备用请求）"""
+    if scraper_type not in SCRAPERS:
+        raise ValueError(f"不支持的爬虫类型: {scraper_type}")
+    check_parse_mode(parse_mode)
+    
+    scraper = SCRAPERS[scraper_type]
+    return scraper.scrape_url(url, parse_mode, coalesce)
+
+def fetch_page(scraper: BaseSimpleScraper, url: str, parse_mode: str = PARSE_FULL, coalesce: bool = True) -> bytes:
+    """按解析模式下载页面：head模式读到</head>即停止，其余模式下载完整页面
+
+    完整页面和只到</head>的页面分别合并，适配器和竞速模式对同一URL的下载共用同一份。
+    """
+    if parse_mode == PARSE_HEAD:
+        return scraper.fetch(url, _head_complete, PARSE_HEAD, coalesce)
+    return scraper.fetch(url, None, PARSE_FULL, coalesce)
+
+def fetch_url(url: str, parse_mode: str = PARSE_FULL) -> bytes:
+    """只下载一次页面，供多个提取器共享（竞速模式）；head模式读到</head>即停止"""
+    return fetch_page(SCRAPERS['requests'], url, parse_mode)
+
+def extract_with_scraper(url: str, content: bytes, scraper_type: str, parse_mode: str = PARSE_FULL) -> Dict:
+    """使用指定爬虫的提取逻辑处理已下载的页面字节"""
     if scraper_type not in SCRAPERS:
         raise ValueError(f"不支持的爬虫类型: {scraper_type}")
     
     scraper = SCRAPERS[scraper_type]
-    return scraper.scrape_url(url)
+    try:
+        if parse_mode == PARSE_HEAD:
+            return scraper.extract_head(url, content)
+        if parse_mode == PARSE_REGION:
+            return scraper.extract_region(url, content)
+        return scraper.extract(url, content)
+    except Exception as e:
+        logger.error(f"[{scraper_type}] 提取失败: {url} - {str(e)}")
+        return scraper._failure_result(url, str(e))
+
+def submit_extraction(url: str, content: bytes, scraper_type: str, parse_mode: str = PARSE_FULL) -> Future:
+    """先查提取缓存，未命中时提交到解析进程池，提取成功后写入缓存"""
+    if scraper_type not in SCRAPERS:
+        raise ValueError(f"不支持的爬虫类型: {scraper_type}")
+    
+    # 不同解析模式的结果分开缓存
+    version = SCRAPERS[scraper_type].cache_version
+    if parse_mode != PARSE_FULL:
+        version = f"{version}:{parse_mode}"
+    key = extraction_cache.make_key(content, scraper_type, version)
+    cached = extraction_cache.get(key)
+    if cached is not None:
+        logger.info(f"[{scraper_type}] 提取缓存命中: {url}")
+        cached['url'] = url
+        future = Future()
+        future.set_result(cached)
+        return future
+    
+    def store(done: Future):
+        # 提取异常或失败的结果不缓存
+        if done.cancelled() or done.exception() is not None:
+            return
+        result = done.result()
+        if result.get('success'):
+            extraction_cache.put(key, result)
+    
+    future = extraction_pool.submit(extract_with_scraper, url, content, scraper_type, parse_mode)
+    future.add_done_callback(store)
+    return future
 
-async def scrape_with_scraper_async(url: str, scraper_type: str) -> Dict:
+async def scrape_with_scraper_async(url: str, scraper_type: str, parse_mode: str = PARSE_FULL) -> Dict:
     """异步使用指定爬虫爬取URL"""
     if scraper_type not in SCRAPERS:
         raise ValueError(f"不支持的爬虫类型: {scraper_type}")
+    check_parse_mode(parse_mode)
     
     scraper = SCRAPERS[scraper_type]
-    return await scraper.scrape_url_async(url)
+    return await scraper.scrape_url_async(url, parse_mode)
 
-async def scrape_urls_async(urls: List[str], scraper_type: str) -> List[Dict]:
+async def scrape_urls_async(urls: List[str], scraper_type: str, parse_mode: str = PARSE_FULL) -> List[Dict]:
     """异步批量爬取URLs"""
     tasks = []
     for url in urls:
-        task = scrape_with_scraper_async(url, scraper_type)
+        task = scrape_with_scraper_async(url, scraper_type, parse_mode)
         tasks.append(task)
     
     results = await asyncio.gather(*tasks, return_exceptions=True)
@@ -580,22 +572,15 @@ async def close_all_scraper_sessions():
         await scraper.close_async_session()
 
 def scrape_with_all_scrapers(url: str) -> List[Dict]:
-    """使用所有爬虫爬取URL（用于竞速模式）"""
-    results = []
-    for scraper_type in ['requests', 'newspaper', 'readability', 'trafilatura']:
-        try:
-            result = scrape_with_scraper(url, scraper_type)
-            results.append(result)
-        except Exception as e:
-            logger.error(f"爬虫 {scraper_type} 失败: {e}")
-            results.append({
-                'url': url,
-                'success': False,
-                'error': str(e),
-                'scraper_type': scraper_type
-            })
+    """使用所有爬虫爬取URL（用于竞速模式），页面只下载一次"""
+    scraper_types = ['requests', 'newspaper', 'readability', 'trafilatura']
+    try:
+        content = fetch_url(url)
+    except Exception as e:
+        logger.error(f"下载失败: {url} - {e}")
+        return [SCRAPERS[scraper_type]._failure_result(url, str(e)) for scraper_type in scraper_types]
     
-    return results
+    return [extract_with_scraper(url, content, scraper_type) for scraper_type in scraper_types]
 
 async def main_async():
     """异步测试主函数"""
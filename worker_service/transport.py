@@ -0,0 +1,82 @@
+"""
+共享传输层 - 所有简单爬虫共用的连接池、重试策略、DNS缓存和超时配置
+
+同步请求直接使用 scraper_app 的传输层实现，按worker的配置创建；这里只增加异步请求共用的aiohttp会话。
+"""
+
+import sys
+import asyncio
+import logging
+from pathlib import Path
+from typing import Optional
+
+import aiohttp
+
+from config import Config
+
+# 容器中 /app/src 已在PYTHONPATH中；在仓库中直接运行时从src目录导入
+sys.path.append(str(Path(__file__).resolve().parent.parent / 'src'))
+
+from scraper_app.utils.transport import DEFAULT_HEADERS, Transport as BaseTransport, pool_stats
+
+logger = logging.getLogger(__name__)
+
+async def _on_connection_reuse(session, context, params):
+    pool_stats.count('checkouts')
+
+async def _on_connection_create(session, context, params):
+    pool_stats.count('checkouts')
+    pool_stats.count('new_connections')
+
+class Transport(BaseTransport):
+    """所有简单爬虫共享的HTTP传输层
+
+    同步请求共用一个HTTPAdapter（每主机 TRANSPORT_POOL_MAXSIZE 个连接），
+    异步请求在每个事件循环内共用一个aiohttp会话，连接在任务之间保持keep-alive复用。
+    """
+
+    def __init__(self):
+        super().__init__(
+            pool_maxsize=Config.TRANSPORT_POOL_MAXSIZE,
+            connect_timeout=Config.CONNECT_TIMEOUT,
+            read_timeout=Config.READ_TIMEOUT,
+            retries=Config.TRANSPORT_RETRIES,
+            dns_ttl=Config.DNS_CACHE_TTL,
+            pool_hosts=Config.TRANSPORT_POOL_HOSTS,
+            max_retry_after=Config.TRANSPORT_MAX_RETRY_AFTER,
+            dns_max_entries=Config.DNS_CACHE_MAX_ENTRIES
+        )
+        self._async_session: Optional[aiohttp.ClientSession] = None
+        self._async_loop = None
+
+    async def get_async_session(self) -> aiohttp.ClientSession:
+        """获取当前事件循环共享的aiohttp会话（DNS缓存由aiohttp的连接器管理）"""
+        loop = asyncio.get_running_loop()
+        if self._async_session is None or self._async_session.closed or self._async_loop is not loop:
+            trace_config = aiohttp.TraceConfig()
+            trace_config.on_connection_reuseconn.append(_on_connection_reuse)
+            trace_config.on_connection_create_end.append(_on_connection_create)
+            connector = aiohttp.TCPConnector(
+                limit=Config.TRANSPORT_POOL_MAXSIZE * Config.TRANSPORT_POOL_HOSTS,
+                limit_per_host=Config.TRANSPORT_POOL_MAXSIZE,
+                ttl_dns_cache=int(Config.DNS_CACHE_TTL) or None,
+                use_dns_cache=Config.DNS_CACHE_TTL > 0
+            )
+            self._async_session = aiohttp.ClientSession(
+                headers=DEFAULT_HEADERS,
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(sock_connect=Config.CONNECT_TIMEOUT, sock_read=Config.READ_TIMEOUT),
+                trace_configs=[trace_config]
+            )
+            self._async_loop = loop
+        return self._async_session
+
+    async def close_async_session(self):
+        """关闭异步会话"""
+        if self._async_session and not self._async_session.closed:
+            await self._async_session.close()
+        self._async_session = None
+        self._async_loop = None
+
+# 创建全局传输层实例
+transport = Transport()
@@ -14,6 +14,7 @@ from concurrent.futures import ThreadPoolExecutor, as_completed
 from config import Config, TaskStatus
 from redis_client import RedisClient
 from scraper_adapter import scraper_adapter
+from extraction_pool import extraction_pool
 
 def setup_logging():
     """设置日志"""
@@ -70,7 +71,7 @@ class Worker:
             )
             
             # 执行爬取任务
-            urls = task_data['urls']
+            urls = task_data['pending_urls']
             options = task_data.get('options', {})
             
             logger.info(f"任务详情: {len(urls)}个URL, 类型: {scraper_type}")
@@ -221,6 +222,8 @@ class Worker:
                 )
             except Exception as e:
                 logger.error(f"清理任务状态时出错: {e}")
+        
+        extraction_pool.shutdown()
 
 def main():
     """主函数"""